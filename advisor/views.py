@@ -193,17 +193,16 @@ def generate_ai_response(user, message, session):
     message_lower = message.lower()
 
     from portfolio.models import Portfolio
-    from prediction.models import Prediction
+    from prediction import user_stats
 
     holdings = Portfolio.objects.filter(user=user) if user and user.is_authenticated else []
     portfolio_value = sum(h.current_value for h in holdings) if holdings else 0
 
-    predictions = Prediction.objects.filter(user=user) if user and user.is_authenticated else []
+    # Precomputed counters: they include archived predictions and cost one row read
+    stats = user_stats.get_stats(user) if user and user.is_authenticated else None
     prediction_accuracy = 0
-    if predictions:
-        correct = predictions.filter(is_correct=True).count()
-        total = predictions.count()
-        prediction_accuracy = round((correct / total) * 100, 2) if total > 0 else 0
+    if stats is not None and stats.total > 0:
+        prediction_accuracy = round((stats.correct / stats.total) * 100, 2)
 
     holdings_symbols = [h.stock.symbol for h in holdings] if holdings else []
     holdings_summary = ", ".join(holdings_symbols)
@@ -0,0 +1,59 @@
+"""
+ASGI config for FinanceAI project.
+
+Serves the async price stream (prediction/stream/) without tying up a worker
+thread per open connection.
+"""
+
+import asyncio
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finance_ai.settings')
+
+# Long-lived streaming responses that must stop when their client disconnects
+STREAMING_PATHS = ('/api/prediction/stream/',)
+
+
+class CancelOnDisconnect:
+    """
+    Cancel a streaming response when the client disconnects. Django 4.2 keeps
+    iterating an async StreamingHttpResponse after the client has gone, so
+    without this every closed tab would leave its stream polling until it
+    times out. Only this wrapper reads the server's receive channel; the app
+    gets the messages through a queue.
+    """
+
+    def __init__(self, app, paths=STREAMING_PATHS):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] not in self.paths:
+            return await self.app(scope, receive, send)
+        messages = asyncio.Queue()
+        app_task = asyncio.ensure_future(self.app(scope, messages.get, send))
+        disconnected = False
+
+        async def watch():
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message['type'] == 'http.disconnect':
+                    disconnected = True
+                    app_task.cancel()
+                    return
+
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            if not disconnected:
+                raise
+        finally:
+            watcher.cancel()
+
+
+application = CancelOnDisconnect(get_asgi_application())
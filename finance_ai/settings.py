@@ -105,6 +105,40 @@ except ImportError:
         }
     }
 
+# Cache
+# Both caches must be shared by every process. 'default' holds data that can be
+# recomputed (cached signals, the quote table); 'versions' holds the version
+# tokens that management commands bump to invalidate the in-memory stores of
+# the web workers, so it must never evict them. Redis when REDIS_URL is set
+# (required when processes run on several hosts; use a noeviction or volatile-*
+# maxmemory policy, as tokens have no expiry). Otherwise 'default' is a file
+# cache on this host and 'versions' a database table (run createcachetable),
+# which only holds a few tokens per stock, far below its cull threshold.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        },
+        'versions': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', str(BASE_DIR / '.cache')),
+            'OPTIONS': {'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '100000'))},
+        },
+        'versions': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'cache_versions',
+            'OPTIONS': {'MAX_ENTRIES': 10_000_000},
+        },
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -156,6 +190,7 @@ REST_FRAMEWORK = {
     'DEFAULT_THROTTLE_RATES': {
         'anon': '30/hour',
         'user': '120/hour',
+        'quotes': '7200/hour',
     },
     'EXCEPTION_HANDLER': 'users.exceptions.custom_exception_handler',
 }
@@ -198,6 +233,30 @@ FINANCE_AI_API_KEY = os.getenv('FINANCE_AI_API_KEY', '')
 LLM_API_KEY = os.getenv('LLM_API_KEY', '')
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
 
+# Prediction: max symbols held as NumPy arrays per process by the price store
+PRICE_STORE_MAX_SYMBOLS = int(os.getenv('PRICE_STORE_MAX_SYMBOLS', '2000'))
+# Max bars per chart response; longer ranges are rolled up to weekly / monthly bars
+CHART_MAX_POINTS = int(os.getenv('CHART_MAX_POINTS', '500'))
+# Threads per web process running async backtests (0 = leave them to run_backtest_jobs)
+BACKTEST_JOB_THREADS = int(os.getenv('BACKTEST_JOB_THREADS', '2'))
+# Seconds a backtest job may stay running before it is presumed lost and queued again
+BACKTEST_JOB_TIMEOUT = int(os.getenv('BACKTEST_JOB_TIMEOUT', '600'))
+# Risk analytics: beta is measured against this symbol, over this many daily bars
+RISK_BENCHMARK_SYMBOL = os.getenv('RISK_BENCHMARK_SYMBOL', 'SPY')
+RISK_WINDOW = int(os.getenv('RISK_WINDOW', '252'))
+# Live quotes: provider class polled by the quote worker, and its keyword arguments
+QUOTE_PROVIDER = os.getenv('QUOTE_PROVIDER', 'prediction.quotes.StockTableQuoteProvider')
+QUOTE_PROVIDER_OPTIONS = {}
+# Trading session: the quote ingest worker writes the day's bar once feed time passes the close
+MARKET_TIMEZONE = os.getenv('MARKET_TIMEZONE', 'America/New_York')
+MARKET_CLOSE = os.getenv('MARKET_CLOSE', '16:00')
+# Intraday bars: sessions older than this are compacted into daily bars and deleted
+INTRADAY_RETENTION_DAYS = int(os.getenv('INTRADAY_RETENTION_DAYS', '30'))
+# Resolved predictions older than this (by resolution date) are moved to the archive table
+PREDICTION_ARCHIVE_DAYS = int(os.getenv('PREDICTION_ARCHIVE_DAYS', '90'))
+# Price stream (SSE): seconds between quote table reads per open stream
+STREAM_POLL_SECONDS = float(os.getenv('STREAM_POLL_SECONDS', '0.5'))
+
 # WalletConnect (for QR login; get project ID from https://cloud.walletconnect.com/)
 WALLETCONNECT_PROJECT_ID = os.getenv('WALLETCONNECT_PROJECT_ID', '')
 
@@ -7,7 +7,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Sum, Avg
 from portfolio.models import Portfolio
-from prediction.models import Prediction
+from prediction.user_stats import get_stats
 from news.models import NewsArticle
 from users.models import UserProfile
 
@@ -36,13 +36,11 @@ def dashboard_summary(request):
     except:
         risk_score = 68
     
-    # Prediction accuracy
-    predictions = Prediction.objects.filter(user=user)
-    total_predictions = predictions.count()
-    correct_predictions = predictions.filter(is_correct=True).count()
+    # Prediction accuracy (precomputed stats row)
+    stats = get_stats(user)
     prediction_accuracy = round(
-        (correct_predictions / total_predictions) * 100, 2
-    ) if total_predictions > 0 else 0
+        (stats.correct / stats.total) * 100, 2
+    ) if stats.total > 0 else 0
     
     # News sentiment
     recent_news = NewsArticle.objects.order_by('-published_at')[:50]
@@ -0,0 +1,54 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from prediction import risk
+from prediction.tests.base import PredictionTestCase, make_stock, random_walk
+
+from .models import Portfolio
+
+
+class PortfolioAnalyticsTests(PredictionTestCase):
+    url = '/api/portfolio/analytics/'
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('alice', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def hold(self, stock, shares=10):
+        Portfolio.objects.create(user=self.user, stock=stock, shares=shares, average_buy_price=Decimal('50'))
+
+    def test_volatility_from_weighted_returns(self):
+        walk = random_walk(80, seed=21, scale=0.02)
+        aaa = make_stock('AAA', walk, sector='Tech')
+        bbb = make_stock('BBB', [c * 2 for c in walk], sector='Energy')
+        self.hold(aaa, 20)
+        self.hold(bbb, 10)
+        risk.run_risk_batch()
+
+        metrics = self.client.get(self.url).json()['data']['additional_metrics']
+        self.assertEqual(metrics['volatility_basis'], 'returns')
+        # Two holdings moving together are no less volatile than either one
+        single = risk.stored_metrics([aaa.id])[aaa.id].volatility
+        self.assertAlmostEqual(float(metrics['volatility'].rstrip('%')), single, delta=0.1)
+
+    def test_short_history_reports_upper_bound(self):
+        aaa = make_stock('AAA', random_walk(80, seed=22))
+        bbb = make_stock('BBB', random_walk(80, seed=23))
+        self.hold(aaa)
+        self.hold(bbb)
+        risk.run_risk_batch()
+        expected = round(
+            (risk.stored_metrics([aaa.id])[aaa.id].volatility * float(aaa.current_price)
+             + risk.stored_metrics([bbb.id])[bbb.id].volatility * float(bbb.current_price))
+            / float(aaa.current_price + bbb.current_price),
+            2,
+        )
+        ccc = make_stock('CCC', random_walk(5, seed=24))  # too little shared history
+        self.hold(ccc, 0.0001)
+        metrics = self.client.get(self.url).json()['data']['additional_metrics']
+        self.assertEqual(metrics['volatility_basis'], 'upper_bound')
+        self.assertEqual(metrics['volatility'], f'<= {expected}%')
@@ -199,16 +199,32 @@ def portfolio_analytics_view(request):
     analytics.sector_allocation = sector_allocation
     analytics.diversification_score = round(diversification, 2)
     
-    # Calculate volatility (mock)
-    analytics.volatility = round(18.5, 2)
-    analytics.beta = round(1.12, 2)
+    # Beta is linear in the weights, so the value-weighted nightly per-stock betas are exact.
+    # Volatility is not: it comes from the weighted daily returns (correlations included);
+    # without enough shared history the weighted per-stock volatility is reported as an upper bound.
+    from prediction.risk import portfolio_volatility, stored_metrics
+    metrics = stored_metrics([h.stock_id for h in holdings])
+    weighted = [(float(h.current_value), metrics.get(h.stock_id)) for h in holdings]
+    for field in ('volatility', 'beta'):
+        pairs = [(w, getattr(m, field)) for w, m in weighted if m is not None and getattr(m, field) is not None]
+        weight = sum(w for w, _ in pairs)
+        if weight > 0:
+            setattr(analytics, field, round(sum(w * v for w, v in pairs) / weight, 2))
+    values = {}
+    for holding in holdings:
+        values[holding.stock_id] = values.get(holding.stock_id, 0) + float(holding.current_value)
+    volatility = portfolio_volatility(values)
+    volatility_basis = 'upper_bound'
+    if volatility is not None:
+        analytics.volatility, volatility_basis = volatility, 'returns'
     analytics.sharpe_ratio = round(1.45, 2)
     
     analytics.save()
     
     # Additional metrics
     additional_metrics = {
-        'volatility': f"{analytics.volatility}%",
+        'volatility': f"{analytics.volatility}%" if volatility_basis == 'returns' else f"<= {analytics.volatility}%",
+        'volatility_basis': volatility_basis,
         'diversification': f"Good ({len(sector_allocation)} sectors)" if len(sector_allocation) >= 5 else f"Fair ({len(sector_allocation)} sectors)",
         'beta': analytics.beta,
         'sharpe_ratio': analytics.sharpe_ratio
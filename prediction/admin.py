@@ -2,7 +2,11 @@
 Prediction admin configuration
 """
 from django.contrib import admin
-from .models import Stock, Prediction, StockPriceHistory, AIPredictionModel, MarketIndicator
+from .models import (
+    Stock, Prediction, StockPriceHistory, AIPredictionModel, MarketIndicator, LatestIndicator,
+    BacktestResult, LeaderboardEntry, UserPredictionStats, StockRiskMetrics, IntradayBar,
+    ArchivedPrediction
+)
 
 
 @admin.register(Stock)
@@ -21,6 +25,15 @@ class PredictionAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
 
 
+@admin.register(ArchivedPrediction)
+class ArchivedPredictionAdmin(admin.ModelAdmin):
+    list_display = ['user', 'stock', 'user_prediction', 'ai_prediction', 'is_correct', 'created_at', 'archived_at']
+    list_filter = ['is_correct']
+    search_fields = ['user__username', 'stock__symbol']
+    raw_id_fields = ['user', 'stock']
+    readonly_fields = ['created_at', 'resolved_at', 'archived_at']
+
+
 @admin.register(StockPriceHistory)
 class StockPriceHistoryAdmin(admin.ModelAdmin):
     list_display = ['stock', 'date', 'close_price', 'volume']
@@ -31,7 +44,7 @@ class StockPriceHistoryAdmin(admin.ModelAdmin):
 
 @admin.register(AIPredictionModel)
 class AIPredictionModelAdmin(admin.ModelAdmin):
-    list_display = ['name', 'version', 'accuracy_percentage', 'is_active', 'created_at']
+    list_display = ['name', 'version', 'accuracy_percentage', 'total_predictions', 'is_active', 'evaluated_at']
     list_filter = ['is_active']
 
 
@@ -40,3 +53,48 @@ class MarketIndicatorAdmin(admin.ModelAdmin):
     list_display = ['stock', 'indicator_type', 'value', 'calculated_at']
     list_filter = ['indicator_type']
     search_fields = ['stock__symbol']
+
+
+@admin.register(LatestIndicator)
+class LatestIndicatorAdmin(admin.ModelAdmin):
+    list_display = ['stock', 'indicator_type', 'value', 'as_of', 'calculated_at']
+    list_filter = ['indicator_type']
+    search_fields = ['stock__symbol']
+
+
+@admin.register(BacktestResult)
+class BacktestResultAdmin(admin.ModelAdmin):
+    list_display = ['id', 'status', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status']
+    readonly_fields = ['cache_key', 'created_at', 'started_at', 'finished_at', 'claim_token']
+
+
+@admin.register(LeaderboardEntry)
+class LeaderboardEntryAdmin(admin.ModelAdmin):
+    list_display = ['user', 'window', 'period_start', 'total', 'correct', 'accuracy']
+    list_filter = ['window']
+    search_fields = ['user__username']
+
+
+@admin.register(UserPredictionStats)
+class UserPredictionStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'total', 'resolved', 'correct', 'accuracy', 'current_streak', 'best_streak']
+    search_fields = ['user__username']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(StockRiskMetrics)
+class StockRiskMetricsAdmin(admin.ModelAdmin):
+    list_display = ['stock', 'window', 'benchmark', 'as_of', 'beta', 'volatility', 'var_95', 'max_drawdown']
+    list_filter = ['window', 'benchmark']
+    search_fields = ['stock__symbol']
+    readonly_fields = ['computed_at']
+
+
+@admin.register(IntradayBar)
+class IntradayBarAdmin(admin.ModelAdmin):
+    list_display = ['stock', 'interval', 'start', 'close_price', 'volume']
+    list_filter = ['interval']
+    search_fields = ['stock__symbol']
+    raw_id_fields = ['stock']
+    show_full_result_count = False  # counting tens of millions of rows per page view is slow
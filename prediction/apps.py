@@ -8,3 +8,6 @@ class PredictionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'prediction'
     verbose_name = 'Prediction'
+
+    def ready(self):
+        import prediction.signals
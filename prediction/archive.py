@@ -0,0 +1,89 @@
+"""
+Prediction archive for FinanceAI
+
+Resolved predictions older than PREDICTION_ARCHIVE_DAYS (by resolved_at) are
+moved from the active prediction table into ArchivedPrediction, in batches
+that copy and delete in one transaction, so the active table holds only open
+and recently resolved predictions. Per-user stats rows, leaderboard entries
+and profile counters are counters maintained at resolution time and are not
+touched by archiving.
+
+Reads go through this module: recent() serves history from the active table
+and only reads the archive when include_archive is set; scan() and
+sources() are for rebuild jobs, which must see both tables.
+"""
+import heapq
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ArchivedPrediction, Prediction
+
+
+DEFAULT_ARCHIVE_DAYS = 90
+# Columns copied to the archive (original id included)
+FIELDS = [f.attname for f in Prediction._meta.concrete_fields]
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def archive_days():
+    return getattr(settings, 'PREDICTION_ARCHIVE_DAYS', DEFAULT_ARCHIVE_DAYS)
+
+
+def archive_resolved(days=None, batch_size=5000, now=None):
+    """Move resolved predictions older than `days` into the archive; returns how many moved"""
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=archive_days() if days is None else days)
+    moved = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Prediction.objects.select_for_update(skip_locked=True)
+                .filter(is_correct__isnull=False, resolved_at__lt=cutoff)
+                .order_by('id')
+                .values(*FIELDS)[:batch_size]
+            )
+            if not batch:
+                break
+            ArchivedPrediction.objects.bulk_create(
+                [ArchivedPrediction(archived_at=now, **row) for row in batch], ignore_conflicts=True
+            )
+            Prediction.objects.filter(id__in=[row['id'] for row in batch]).delete()
+        moved += len(batch)
+    return moved
+
+
+def sources(include_archive=True):
+    """Managers of the tables a read should cover: active, then archive"""
+    return [Prediction.objects, ArchivedPrediction.objects] if include_archive else [Prediction.objects]
+
+
+def recent(user, limit=50, include_archive=False):
+    """The user's latest predictions, newest first (stock loaded), merging in the archive only when asked"""
+    per_table = [
+        list(manager.filter(user=user).select_related('stock').order_by('-created_at', '-id')[:limit])
+        for manager in sources(include_archive)
+    ]
+    merged = heapq.merge(*per_table, key=lambda p: (p.created_at, p.id), reverse=True)
+    return list(merged)[:limit]
+
+
+def scan(fields, user_ids=None, include_archive=True, chunk_size=5000):
+    """
+    Predictions of both tables (model instances with only `fields` loaded)
+    in resolution order: resolved ones by (resolved_at, id), then unresolved.
+    """
+    def rows(manager):
+        qs = manager.all()
+        if user_ids is not None:
+            qs = qs.filter(user_id__in=user_ids)
+        qs = qs.order_by(F('resolved_at').asc(nulls_last=True), 'id').only(*fields)
+        return qs.iterator(chunk_size=chunk_size)
+
+    return heapq.merge(
+        *(rows(manager) for manager in sources(include_archive)),
+        key=lambda p: (p.resolved_at is None, p.resolved_at or _EPOCH, p.id),
+    )
@@ -0,0 +1,192 @@
+"""
+Vectorized backtesting engine for FinanceAI
+
+Strategies map a (symbols x bars) close matrix to a target-position matrix
+(1 = long, 0 = flat). Positions are applied on the bar after the signal, so a
+whole universe backtests in a handful of NumPy operations. Parameter sweeps
+fan grid points out over a process pool; workers receive the close matrix once
+via the pool initializer.
+
+Rows are right-aligned price series (see price_store.align_right); metrics
+are per row and only count bars where the row has data.
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .kernels import drawdown, ffill, pct_change, rolling_mean, rsi
+
+
+TRADING_DAYS = 252
+
+
+# --- strategies ---------------------------------------------------------------
+
+def ma_crossover(close, fast=10, slow=20):
+    """Long while the fast SMA is above the slow SMA"""
+    fast_ma = rolling_mean(close, fast)
+    slow_ma = rolling_mean(close, slow)
+    return np.where(np.isnan(slow_ma) | np.isnan(fast_ma), 0.0, (fast_ma > slow_ma).astype(np.float64))
+
+
+def rsi_reversion(close, period=14, lower=30.0, upper=70.0):
+    """Buy when RSI drops below `lower`, hold until it rises above `upper`"""
+    r = rsi(close, period)
+    signal = np.where(r < lower, 1.0, np.where(r > upper, 0.0, np.nan))
+    return np.nan_to_num(ffill(signal), nan=0.0)
+
+
+def momentum(close, lookback=20, threshold=0.0):
+    """Long while the trailing `lookback`-bar return exceeds `threshold`"""
+    return np.where(pct_change(close, lookback) > threshold, 1.0, 0.0)
+
+
+def buy_and_hold(close):
+    """Long on every bar with data"""
+    return np.where(np.isnan(np.atleast_2d(close)), 0.0, 1.0)
+
+
+STRATEGIES = {
+    'ma_crossover': ma_crossover,
+    'rsi_reversion': rsi_reversion,
+    'momentum': momentum,
+    'buy_and_hold': buy_and_hold,
+}
+
+DEFAULT_PARAMS = {
+    'ma_crossover': {'fast': 10, 'slow': 20},
+    'rsi_reversion': {'period': 14, 'lower': 30.0, 'upper': 70.0},
+    'momentum': {'lookback': 20, 'threshold': 0.0},
+    'buy_and_hold': {},
+}
+
+
+def normalize_params(strategy, params=None):
+    """Defaults merged with `params`, cast to the default's type; ValueError on bad input"""
+    if strategy not in STRATEGIES:
+        raise ValueError(f'Unknown strategy: {strategy}')
+    defaults = DEFAULT_PARAMS[strategy]
+    params = params or {}
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameter(s) for {strategy}: {', '.join(sorted(unknown))}")
+    out = dict(defaults)
+    for key, value in params.items():
+        try:
+            out[key] = type(defaults[key])(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'Invalid value for {key}: {value!r}')
+    for key in ('fast', 'slow', 'period', 'lookback'):
+        if key in out and out[key] < 1:
+            raise ValueError(f'{key} must be at least 1')
+    return out
+
+
+# --- engine -------------------------------------------------------------------
+
+def run_backtest(close, strategy, params=None, cost_bps=0.0, initial_capital=100000.0):
+    """
+    Backtest one strategy over every row of `close`.
+    Returns {'position', 'equity', 'metrics'}; metrics are per-row arrays.
+    """
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    params = normalize_params(strategy, params)
+    valid = ~np.isnan(close)
+    target = STRATEGIES[strategy](close, **params)
+
+    # Trade on the bar after the signal to avoid look-ahead
+    position = np.zeros(close.shape)
+    position[:, 1:] = target[:, :-1]
+    position[~valid] = 0.0
+
+    bar_returns = np.nan_to_num(pct_change(close), nan=0.0, posinf=0.0, neginf=0.0)
+    trades = np.abs(np.diff(position, axis=1, prepend=0.0))
+    returns = position * bar_returns - trades * (cost_bps / 10000.0)
+    equity = initial_capital * np.cumprod(1.0 + returns, axis=1)
+    return {
+        'position': position,
+        'equity': equity,
+        'metrics': compute_metrics(returns, equity, trades, valid, initial_capital),
+    }
+
+
+def compute_metrics(returns, equity, trades, valid, initial_capital):
+    """Per-row total return, max drawdown, Sharpe, Sortino, turnover and trade count"""
+    n_bars = valid.sum(axis=1)
+    r = np.where(valid, returns, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.nanmean(r, axis=1)
+        std = np.nanstd(r, axis=1)
+        downside = np.sqrt(np.nanmean(np.minimum(r, 0.0) ** 2, axis=1))
+        sharpe = np.where(std > 0, mean / std * np.sqrt(TRADING_DAYS), 0.0)
+        sortino = np.where(downside > 0, mean / downside * np.sqrt(TRADING_DAYS), 0.0)
+        turnover = np.where(n_bars > 0, trades.sum(axis=1) / n_bars * TRADING_DAYS, 0.0)
+    return {
+        'total_return': equity[:, -1] / initial_capital - 1.0 if equity.shape[1] else np.zeros(len(equity)),
+        'max_drawdown': drawdown(equity).max(axis=1, initial=0.0),
+        'sharpe_ratio': np.nan_to_num(sharpe),
+        'sortino_ratio': np.nan_to_num(sortino),
+        'turnover': turnover,
+        'trades': trades.sum(axis=1),
+    }
+
+
+# --- parameter sweeps ----------------------------------------------------------
+
+def param_grid(grid):
+    """{'fast': [5, 10], 'slow': [20, 50]} -> [{'fast': 5, 'slow': 20}, ...]"""
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+_worker_close = None
+
+
+def _init_worker(close):
+    global _worker_close
+    _worker_close = close
+
+
+def _run_chunk(strategy, param_list, cost_bps, close=None):
+    close = _worker_close if close is None else close
+    return [
+        (params, run_backtest(close, strategy, params, cost_bps)['metrics'])
+        for params in param_list
+    ]
+
+
+def sweep(close, strategy, grid, cost_bps=0.0, processes=None, chunk_size=None):
+    """
+    Run every grid point over every row of `close`.
+    Returns [{'params': {...}, 'metrics': {name: per-row array}}] in grid order.
+    processes=1 runs inline; otherwise grid points are spread over a process pool.
+    """
+    combos = [normalize_params(strategy, p) for p in param_grid(grid)]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(combos) == 1:
+        chunks_out = [_run_chunk(strategy, combos, cost_bps, close=close)]
+    else:
+        chunk_size = chunk_size or max(1, len(combos) // (processes * 4))
+        chunks = [combos[i:i + chunk_size] for i in range(0, len(combos), chunk_size)]
+        with ProcessPoolExecutor(
+            max_workers=processes, initializer=_init_worker, initargs=(close,)
+        ) as pool:
+            futures = [pool.submit(_run_chunk, strategy, chunk, cost_bps) for chunk in chunks]
+            chunks_out = [f.result() for f in futures]
+    return [
+        {'params': params, 'metrics': metrics}
+        for chunk in chunks_out for params, metrics in chunk
+    ]
+
+
+# --- data ----------------------------------------------------------------------
+
+def load_close_matrix(stock_ids, start=None, end=None):
+    """(dates, close) right-aligned matrices for the stocks, from the price store"""
+    from .price_store import align_right, price_store
+
+    series = price_store.get_many(stock_ids)
+    dates, close, _ = align_right([series[sid].between(start, end) for sid in stock_ids])
+    return dates, close
@@ -0,0 +1,194 @@
+"""
+Backtest jobs and result cache for FinanceAI
+
+Every backtest request is hashed together with the price-store version token
+of each symbol, so an identical request returns the stored result, and any new
+StockPriceHistory row for one of its symbols changes the key (and forces a
+fresh run). Async requests are queued as BacktestResult rows and executed on a
+small in-process thread pool; the run_backtest_jobs command drains anything
+left queued (e.g. after a restart, or with BACKTEST_JOB_THREADS = 0).
+
+A job running for longer than BACKTEST_JOB_TIMEOUT seconds is assumed lost
+(its worker died mid-run) and is queued again, both by run_backtest_jobs and
+when an identical request attaches to it. A worker stores its result only
+while it still holds the claim it took, so a job requeued from under a slow
+worker is finished by whoever claimed it last. Results are keyed by request and
+price data only, so one job and its result are shared by every user who
+submits the same backtest.
+"""
+import hashlib
+import json
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections
+from django.utils import timezone
+
+from .backtest import run_backtest
+from .models import BacktestResult, Stock
+from .price_store import price_store
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+DEFAULT_JOB_TIMEOUT = 600
+
+
+def _get_executor():
+    global _executor
+    threads = getattr(settings, 'BACKTEST_JOB_THREADS', 2)
+    if threads <= 0:
+        return None
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='backtest')
+    return _executor
+
+
+def job_request(opts, params, symbols):
+    """JSON-safe, canonical form of a validated backtest request"""
+    return {
+        'strategy': opts['strategy'],
+        'params': params,
+        'symbols': symbols,
+        'multi': bool(opts.get('symbols')),
+        'initial_capital': opts['initial_capital'],
+        'cost_bps': opts['cost_bps'],
+        'start_date': opts['start_date'].isoformat() if opts.get('start_date') else None,
+        'end_date': opts['end_date'].isoformat() if opts.get('end_date') else None,
+    }
+
+
+def cache_key(request, stock_ids):
+    """sha256 of the request plus the current price-history version of every symbol"""
+    versions = price_store.versions(stock_ids)
+    payload = dict(request, versions=[versions[sid] for sid in stock_ids])
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def compute(request):
+    """Run a backtest request against the price store; returns the response payload"""
+    stocks = dict(Stock.objects.filter(symbol__in=request['symbols']).values_list('symbol', 'id'))
+    series = price_store.get_many([stocks[sym] for sym in request['symbols']])
+    strategy, params = request['strategy'], request['params']
+    results = []
+    for sym in request['symbols']:
+        history = series[stocks[sym]].between(request['start_date'], request['end_date'])
+        if len(history) < 50:
+            results.append({'symbol': sym, 'equity_curve': [], 'labels': [], 'total_return': 0,
+                            'max_drawdown': 0, 'sharpe_ratio': 0, 'sortino_ratio': 0, 'turnover': 0, 'trades': 0})
+            continue
+        bt = run_backtest(history.close, strategy, params, request['cost_bps'], request['initial_capital'])
+        m = {name: float(values[0]) for name, values in bt['metrics'].items()}
+        results.append({
+            'symbol': sym,
+            'equity_curve': np.round(bt['equity'][0], 2).tolist(),
+            'labels': history.date_strings('%b %d'),
+            'total_return': round(m['total_return'] * 100, 2),
+            'max_drawdown': round(m['max_drawdown'] * 100, 2),
+            'sharpe_ratio': round(m['sharpe_ratio'], 2),
+            'sortino_ratio': round(m['sortino_ratio'], 2),
+            'turnover': round(m['turnover'], 2),
+            'trades': int(m['trades']),
+        })
+    if request['multi']:
+        return {'strategy': strategy, 'params': params, 'results': results}
+    return {'strategy': strategy, 'params': params, **results[0]}
+
+
+def job_timeout():
+    return getattr(settings, 'BACKTEST_JOB_TIMEOUT', DEFAULT_JOB_TIMEOUT)
+
+
+def _stale_running():
+    """Running jobs started longer ago than the job timeout"""
+    cutoff = timezone.now() - timedelta(seconds=job_timeout())
+    return BacktestResult.objects.filter(status='running', started_at__lt=cutoff)
+
+
+def requeue_stale():
+    """Queue again every job whose run outlived the timeout; returns how many"""
+    return _stale_running().update(status='queued', started_at=None, claim_token='')
+
+
+def get_or_queue(request, key, user=None):
+    """Existing job for `key`, or a new queued one; failed and stale running jobs are queued again"""
+    job = BacktestResult.objects.filter(cache_key=key).first()
+    if job is None:
+        try:
+            job = BacktestResult.objects.create(cache_key=key, request=request, created_by=user)
+        except IntegrityError:
+            job = BacktestResult.objects.get(cache_key=key)
+    elif job.status == 'failed':
+        BacktestResult.objects.filter(id=job.id, status='failed').update(status='queued', error='')
+        job.status = 'queued'
+    elif job.status == 'running' and _stale_running().filter(id=job.id).update(
+        status='queued', started_at=None, claim_token='',
+    ):
+        job.status = 'queued'
+    return job
+
+
+def submit(job):
+    """Hand a queued job to the in-process pool (no-op when the pool is disabled)"""
+    executor = _get_executor()
+    if executor is not None and job.status == 'queued':
+        executor.submit(_run_in_thread, job.id)
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        execute(job_id)
+    finally:
+        close_old_connections()
+
+
+def execute(job_id):
+    """
+    Claim and run one queued job; returns False if another worker already took
+    it, or took it over (after a requeue) before this run finished.
+    """
+    token = uuid.uuid4().hex
+    claimed = BacktestResult.objects.filter(id=job_id, status='queued').update(
+        status='running', started_at=timezone.now(), claim_token=token,
+    )
+    if not claimed:
+        return False
+    request = BacktestResult.objects.values_list('request', flat=True).get(id=job_id)
+    outcome = {'result': None, 'error': ''}
+    try:
+        outcome.update(result=compute(request), status='done')
+    except Exception as e:
+        logger.exception('Backtest job %s failed', job_id)
+        outcome.update(status='failed', error=str(e))
+    finished = BacktestResult.objects.filter(id=job_id, status='running', claim_token=token).update(
+        finished_at=timezone.now(), claim_token='', **outcome,
+    )
+    if not finished:
+        logger.warning('Backtest job %s was requeued while running; result discarded', job_id)
+    return bool(finished)
+
+
+def run_sync(request, key, user=None):
+    """Return the cached result for `key`, computing and storing it if needed"""
+    job = BacktestResult.objects.filter(cache_key=key, status='done').only('result').first()
+    if job is not None:
+        return job.result
+    started_at = timezone.now()
+    result = compute(request)
+    job, _ = BacktestResult.objects.update_or_create(
+        cache_key=key,
+        defaults={
+            'request': request, 'result': result, 'status': 'done', 'error': '',
+            'created_by': user, 'started_at': started_at, 'claim_token': '',
+        },
+    )
+    # Stamped after the write, so it is never earlier than the created_at of a new row
+    BacktestResult.objects.filter(id=job.id).update(finished_at=timezone.now())
+    return result
@@ -0,0 +1,104 @@
+"""
+Multi-symbol comparison for FinanceAI
+
+Aligns up to MAX_SYMBOLS price series from the columnar store on one shared
+date index and computes per-symbol stats plus the full pairwise correlation
+and covariance matrices of daily returns in NumPy. Results are cached by
+(symbols, range, price-store version of every symbol), so any new bar for one
+of the symbols produces a new key.
+"""
+import hashlib
+import json
+import math
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from .kernels import pairwise_cov_corr, pct_change, rolling_mean
+from .price_store import CHART_RANGES, align_dates, price_store
+
+
+MAX_SYMBOLS = 100
+CACHE_KEY = 'prediction:compare:{digest}'
+CACHE_TIMEOUT = 60 * 60
+
+
+def _floats(values, digits=2):
+    """Array -> list of rounded floats with None for NaN"""
+    return [None if math.isnan(v) else round(v, digits) for v in values.tolist()]
+
+
+def align(series_list, range_param='1M'):
+    """(dates, close matrix) on the union of the series' dates within the range"""
+    span, resolution = CHART_RANGES.get(range_param, CHART_RANGES['1M'])
+    dates = np.unique(np.concatenate([s.dates for s in series_list])) if series_list else np.empty(0, 'datetime64[D]')
+    if span is not None and len(dates):
+        if resolution == 'daily':
+            dates = dates[-span:]
+        else:
+            dates = dates[dates >= dates[-1] - np.timedelta64(span, 'D')]
+    return dates, align_dates(series_list, dates)
+
+
+def compute(stocks, range_param='1M', max_points=None):
+    """Comparison payload for [(stock_id, symbol, name)]"""
+    series = price_store.get_many([sid for sid, _, _ in stocks])
+    dates, close = align([series[sid] for sid, _, _ in stocks], range_param)
+    returns = pct_change(close) * 100
+    ma7 = rolling_mean(close, 7)
+    ma14 = rolling_mean(close, 14)
+    cov, corr = pairwise_cov_corr(returns)
+
+    n_symbols, n_dates = close.shape
+    first = np.full(n_symbols, np.nan)
+    last = np.full(n_symbols, np.nan)
+    if n_dates:
+        valid = ~np.isnan(close)
+        has_data = valid.any(axis=1)
+        rows = np.flatnonzero(has_data)
+        first[rows] = close[rows, valid[rows].argmax(axis=1)]
+        last[rows] = close[rows, n_dates - 1 - valid[rows, ::-1].argmax(axis=1)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normalized = 100 * close / first[:, None]
+        total_return = (last / first - 1) * 100
+        volatility = np.nanstd(returns, axis=1, ddof=1) if n_dates > 2 else np.full(n_symbols, np.nan)
+
+    # Long ranges: keep every step-th date (always including the newest) in the per-date series
+    max_points = max_points or getattr(settings, 'CHART_MAX_POINTS', 500)
+    step = max(1, math.ceil(n_dates / max_points))
+    idx = np.arange(n_dates - 1, -1, -step)[::-1]
+
+    return {
+        'range': range_param,
+        'labels': np.datetime_as_string(dates[idx], unit='D').tolist(),
+        'symbols': [symbol for _, symbol, _ in stocks],
+        'stocks': [
+            {
+                'symbol': symbol,
+                'name': name,
+                'prices': _floats(close[i, idx]),
+                'normalized': _floats(normalized[i, idx]),
+                'ma7': _floats(ma7[i, idx]),
+                'ma14': _floats(ma14[i, idx]),
+                'daily_returns': _floats(returns[i, idx]),
+                'return_percent': _floats(total_return[i:i + 1])[0] or 0,
+                'volatility': _floats(volatility[i:i + 1])[0] or 0,
+            }
+            for i, (_, symbol, name) in enumerate(stocks)
+        ],
+        'correlation': [_floats(row, 4) for row in corr],
+        'covariance': [_floats(row, 4) for row in cov],
+    }
+
+
+def cached_compare(stocks, range_param='1M'):
+    """compute() memoized on (symbols, range, price versions)"""
+    versions = price_store.versions([sid for sid, _, _ in stocks])
+    payload = json.dumps([range_param, [(sid, versions[sid]) for sid, _, _ in stocks]])
+    key = CACHE_KEY.format(digest=hashlib.sha256(payload.encode()).hexdigest())
+    result = cache.get(key)
+    if result is None:
+        result = compute(stocks, range_param)
+        cache.set(key, result, CACHE_TIMEOUT)
+    return result
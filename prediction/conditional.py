@@ -0,0 +1,81 @@
+"""
+Conditional GET for FinanceAI price endpoints
+
+Chart, detail and indicator responses change at most once per bar (or when the
+stock row or its indicators are rewritten), so they carry an ETag and a
+Last-Modified computed from one indexed lookup: the stock row's last_updated
+plus a MAX() subquery over its price bars or indicators, and the price store's
+version token (one cache read) so corrected bars also change the tag. Clients
+sending If-None-Match / If-Modified-Since get a 304 with no body before any
+price data is loaded or serialized.
+
+The decorators go below @api_view (or on the class view's method), so DRF
+authenticates and throttles the request before the validator runs.
+"""
+import hashlib
+from datetime import datetime, time as dt_time, timezone as dt_timezone
+
+from django.db.models import Max, OuterRef, Subquery
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from .models import LatestIndicator, Stock, StockPriceHistory
+from .price_store import price_store
+
+
+def _max_of(model, field):
+    return Subquery(
+        model.objects.filter(stock=OuterRef('pk')).order_by().values('stock').annotate(last=Max(field)).values('last')
+    )
+
+
+def _as_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.combine(value, dt_time.min, tzinfo=dt_timezone.utc)
+
+
+def _validators(request, symbol, bars, indicators):
+    """(etag, last_modified) for the stock, or (None, None) if it does not exist; memoized on the request"""
+    memo = getattr(request, '_stock_validators', None)
+    if memo is None:
+        annotations = {}
+        if bars:
+            annotations['last_bar'] = _max_of(StockPriceHistory, 'date')
+        if indicators:
+            annotations['last_indicator'] = _max_of(LatestIndicator, 'calculated_at')
+        row = Stock.objects.filter(symbol=symbol).values('id', 'last_updated', **annotations).first()
+        if row is None:
+            memo = (None, None)
+        else:
+            parts = [symbol, request.get_full_path(), request.headers.get('Accept', '')]
+            stamps = []
+            if bars:
+                parts += [row['last_updated'], row['last_bar'], price_store.version(row['id'])]
+                stamps += [row['last_updated'], _as_datetime(row['last_bar'])]
+            if indicators:
+                parts.append(row['last_indicator'])
+                stamps.append(row['last_indicator'])
+            digest = hashlib.md5('|'.join(map(str, parts)).encode(), usedforsecurity=False).hexdigest()
+            memo = (f'W/"{digest}"', max((s for s in stamps if s is not None), default=None))
+        request._stock_validators = memo
+    return memo
+
+
+def _conditional(bars=False, indicators=False):
+    def etag(request, *args, symbol=None, **kwargs):
+        return _validators(request, symbol, bars, indicators)[0]
+
+    def last_modified(request, *args, symbol=None, **kwargs):
+        return _validators(request, symbol, bars, indicators)[1]
+
+    def decorator(view):
+        # no-cache: browsers must revalidate instead of guessing freshness from Last-Modified
+        return cache_control(private=True, no_cache=True)(condition(etag, last_modified)(view))
+    return decorator
+
+
+# Responses built from the stock row and its price bars (chart, detail)
+conditional_on_bars = _conditional(bars=True)
+# Responses built from the stock's latest indicators
+conditional_on_indicators = _conditional(indicators=True)
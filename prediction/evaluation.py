@@ -0,0 +1,268 @@
+"""
+Offline evaluation of the AI prediction signal for FinanceAI
+
+Replays ai_signal.build_signal point-in-time over every stored daily bar of
+every stock. At each bar the signal sees only what it would have seen live:
+the 10 closes up to that bar, the indicators the indicator engine computes for
+that bar (rounded to stored precision) and the last news-sentiment value
+recorded on or before it. Each call is scored the way a prediction is
+resolved: 'up' is correct when the close `horizon` bars later is at or above
+the close the call was made at.
+
+Signals are computed as (stocks x bars) matrices, so a chunk of symbols takes
+a few dozen NumPy operations; chunks of symbols run in a process pool and
+return per-confidence tallies that are summed into one report: directional
+accuracy, calibration by confidence bucket and throughput. Bars where the live
+signal would flip a coin (small score, flat momentum) are counted, not scored.
+verify() checks sampled bars against build_signal itself, so a rule changed
+in one place but not the other shows up as mismatches.
+"""
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from .ai_signal import BARS, SIGNAL_VERSION, build_signal
+from .indicators import price_indicators
+from .kernels import rolling_mean
+from .models import AIPredictionModel, LatestIndicator, MarketIndicator
+from .price_store import align_right, price_store
+
+
+MODEL_NAME = 'AI Signal'
+# Confidence buckets reported for calibration; served confidence is 55-90
+CALIBRATION_BUCKETS = [(55, 59), (60, 69), (70, 79), (80, 90)]
+INDICATOR_DECIMALS = 4
+
+
+def _lag(x, k):
+    """x shifted `k` bars later along axis 1 (x[t - k] at t); negative k looks ahead"""
+    if k == 0:
+        return x
+    out = np.full(x.shape, np.nan)
+    if abs(k) < x.shape[1]:
+        if k > 0:
+            out[:, k:] = x[:, :-k]
+        else:
+            out[:, :k] = x[:, -k:]
+    return out
+
+
+def _steps(x, lower, upper, below, above):
+    """`above` where x > upper, `below` where x < lower, else 0 (NaN counts as neither)"""
+    return np.where(x > upper, above, np.where(x < lower, below, 0.0))
+
+
+def signal_matrix(close, indicators, sentiment):
+    """
+    (direction, confidence) of build_signal at every bar, as int matrices.
+    Direction is 1 (up), -1 (down) or 0 where the live signal flips a coin or
+    fewer than BARS closes are available; confidence is the served value.
+    `indicators` is {indicator_type: matrix} as stored (see indicator_inputs).
+    """
+    close = np.atleast_2d(close)
+    valid = ~np.isnan(rolling_mean(close, BARS))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        recent_avg = (close + _lag(close, 1) + _lag(close, 2)) / 3
+        older_avg = (_lag(close, BARS - 3) + _lag(close, BARS - 2) + _lag(close, BARS - 1)) / 3
+        first = _lag(close, BARS - 1)
+        momentum = (close - first) / first
+
+        score = np.where(recent_avg > older_avg * 1.01, 1.0, np.where(recent_avg < older_avg * 0.99, -1.0, 0.0))
+        score += np.where(
+            np.abs(momentum) > 0.03, 2.0 * np.sign(momentum),
+            np.where(np.abs(momentum) > 0.01, np.sign(momentum), 0.0),
+        )
+        score += _steps(indicators['rsi'], 30.0, 70.0, 1.5, -1.5)
+        score += _steps(indicators['macd'], 0.0, 0.0, -1.0, 1.0)
+        ma = np.where(np.isnan(indicators['ema']), indicators['sma'], indicators['ema'])
+        score += np.where(close > ma * 1.01, 1.0, np.where(close < ma * 0.99, -1.0, 0.0))
+        score += np.where(indicators['volume'] > 1.2, 0.5, 0.0)
+        score += _steps(sentiment, -0.2, 0.2, -1.0, 1.0)
+
+        direction = np.where(score >= 2.0, 1, np.where(score <= -2.0, -1, np.sign(momentum)))
+    direction = np.where(valid, np.nan_to_num(direction), 0).astype(np.int8)
+    strength = np.clip(np.abs(score), 0.5, 4.0)
+    confidence = np.clip(55 + np.floor(strength / 4.0 * 30), 55, 90)
+    return direction, np.where(valid, confidence, 0).astype(np.int16)
+
+
+def indicator_inputs(close, volume):
+    """Bar-based indicators for every bar, rounded as MarketIndicator stores them"""
+    return {
+        name: np.round(values, INDICATOR_DECIMALS)
+        for name, values in price_indicators(close, volume).items()
+    }
+
+
+def score_chunk(close, volume, sentiment, horizon=1):
+    """Tallies for one block of rows: per-confidence scored / correct counts and totals"""
+    direction, confidence = signal_matrix(close, indicator_inputs(close, volume), sentiment)
+    future = _lag(close, -horizon)
+    with np.errstate(invalid='ignore'):
+        went_up = future >= close
+    resolvable = (confidence > 0) & ~np.isnan(future)
+    scored = resolvable & (direction != 0)
+    correct = scored & ((direction == 1) == went_up)
+    return {
+        'signals': int((confidence > 0).sum()),
+        'coin_flips': int((resolvable & (direction == 0)).sum()),
+        'up_calls': int((scored & (direction == 1)).sum()),
+        'up_outcomes': int((scored & went_up).sum()),
+        'scored': np.bincount(confidence[scored], minlength=101),
+        'correct': np.bincount(confidence[correct], minlength=101),
+    }
+
+
+def _merge(tallies):
+    total = dict(tallies[0])
+    for t in tallies[1:]:
+        for key, value in t.items():
+            total[key] = total[key] + value
+    return total
+
+
+def _pct(part, whole):
+    return round(part / whole * 100, 2) if whole else 0
+
+
+def evaluate(close, volume, sentiment, horizon=1, processes=None, chunk_size=None):
+    """
+    Report dict for the signal over every row of the (stocks x bars) matrices.
+    processes=1 runs inline; otherwise chunks of rows are spread over a process pool.
+    The indicator recursions loop over bars, so chunks default to one per worker.
+    """
+    processes = processes or os.cpu_count() or 1
+    rows = close.shape[0]
+    t0 = time.perf_counter()
+    if processes == 1 or rows <= 1:
+        tallies = [score_chunk(close, volume, sentiment, horizon)]
+    else:
+        chunk_size = chunk_size or -(-rows // processes)
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [
+                pool.submit(
+                    score_chunk, close[i:i + chunk_size], volume[i:i + chunk_size],
+                    sentiment[i:i + chunk_size], horizon,
+                )
+                for i in range(0, rows, chunk_size)
+            ]
+            tallies = [f.result() for f in futures]
+    elapsed = time.perf_counter() - t0
+    return report(_merge(tallies), horizon, rows, elapsed)
+
+
+def report(tallies, horizon, symbols, elapsed):
+    """Accuracy, calibration and throughput from merged tallies (JSON-serializable)"""
+    scored, correct = tallies['scored'], tallies['correct']
+    levels = np.arange(len(scored))
+    calibration = []
+    for low, high in CALIBRATION_BUCKETS:
+        n = int(scored[low:high + 1].sum())
+        calibration.append({
+            'bucket': f'{low}-{high}',
+            'scored': n,
+            'mean_confidence': round(float((scored * levels)[low:high + 1].sum()) / n, 2) if n else 0,
+            'accuracy': _pct(int(correct[low:high + 1].sum()), n),
+        })
+    total, hits = int(scored.sum()), int(correct.sum())
+    return {
+        'horizon': horizon,
+        'symbols': symbols,
+        'signals': tallies['signals'],
+        'scored': total,
+        'correct': hits,
+        'accuracy': _pct(hits, total),
+        'coin_flips': tallies['coin_flips'],
+        'up_call_rate': _pct(tallies['up_calls'], total),
+        'up_rate': _pct(tallies['up_outcomes'], total),
+        'calibration': calibration,
+        'seconds': round(elapsed, 3),
+        'signals_per_second': round(tallies['signals'] / elapsed) if elapsed else 0,
+    }
+
+
+# --- data ----------------------------------------------------------------------
+
+def load_inputs(stock_ids):
+    """(dates, close, volume, sentiment) right-aligned matrices; sentiment is the last value on or before each bar"""
+    series = price_store.get_many(stock_ids)
+    dates, close, volume = align_right([series[sid] for sid in stock_ids])
+    sentiment = np.full(close.shape, np.nan)
+    history = {}
+    rows = (
+        MarketIndicator.objects.filter(stock_id__in=stock_ids, indicator_type='sentiment', as_of__isnull=False)
+        .order_by('as_of', 'calculated_at').values_list('stock_id', 'as_of', 'value')
+    )
+    for sid, as_of, value in rows:
+        history.setdefault(sid, {})[as_of] = float(value)
+    for row, sid in enumerate(stock_ids):
+        if sid not in history:
+            continue
+        as_of = np.array(list(history[sid]), dtype='datetime64[D]')
+        values = np.array(list(history[sid].values()))
+        pos = np.searchsorted(as_of, dates[row], side='right') - 1
+        has = (pos >= 0) & ~np.isnat(dates[row])
+        sentiment[row, has] = values[pos[has]]
+    return dates, close, volume, sentiment
+
+
+def verify(stock_ids, symbols, dates, close, volume, sentiment, samples, seed=0):
+    """
+    Compare signal_matrix with build_signal at `samples` random bars with a full
+    window. Returns (bars checked, [mismatch description]).
+    """
+    indicators = indicator_inputs(close, volume)
+    direction, confidence = signal_matrix(close, indicators, sentiment)
+    points = np.argwhere(confidence > 0)
+    if not len(points):
+        return 0, []
+    picks = random.Random(seed).sample(range(len(points)), min(samples, len(points)))
+    mismatches = []
+    for row, t in points[picks].tolist():
+        latest = {
+            name: LatestIndicator(indicator_type=name, value=Decimal(str(values[row, t])))
+            for name, values in indicators.items() if not np.isnan(values[row, t])
+        }
+        if not np.isnan(sentiment[row, t]):
+            latest['sentiment'] = LatestIndicator(indicator_type='sentiment', value=Decimal(str(sentiment[row, t])))
+        prices = close[row, t - BARS + 1:t + 1][::-1].tolist()
+        signal = build_signal(symbols[stock_ids[row]], prices, latest)
+        expected = 1 if signal['prediction'] == 'up' else -1
+        if signal['confidence'] != confidence[row, t] or direction[row, t] not in (0, expected):
+            mismatches.append(
+                f"{symbols[stock_ids[row]]} {dates[row, t]}: build_signal {signal['prediction']} "
+                f"{signal['confidence']}%, replay {direction[row, t]:+d} {confidence[row, t]}%"
+            )
+    return len(picks), mismatches
+
+
+def save(result, version=SIGNAL_VERSION):
+    """Store the report on the AI model row for this signal version and make it the active one"""
+    with transaction.atomic():
+        model, _ = AIPredictionModel.objects.select_for_update().get_or_create(
+            name=MODEL_NAME, version=version,
+            defaults={'description': 'Rule-based signal over recent closes, technical indicators and news sentiment'},
+        )
+        model.accuracy_score = result['accuracy']
+        model.total_predictions = result['scored']
+        model.correct_predictions = result['correct']
+        model.evaluation = result
+        model.evaluated_at = timezone.now()
+        model.is_active = True
+        model.save()
+        AIPredictionModel.objects.filter(name=MODEL_NAME, is_active=True).exclude(pk=model.pk).update(is_active=False)
+    return model
+
+
+def active_model():
+    """The AI model row with the latest evaluation of the signal being served, or None"""
+    return (
+        AIPredictionModel.objects.filter(name=MODEL_NAME, is_active=True, evaluated_at__isnull=False)
+        .order_by('-evaluated_at').first()
+    )
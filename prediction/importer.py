@@ -0,0 +1,220 @@
+"""
+Streaming OHLCV importer for FinanceAI
+
+Reads CSV or Parquet files of daily bars in fixed-size chunks and upserts each
+chunk into StockPriceHistory with one bulk statement, so memory stays flat
+whatever the file size. Unknown symbols are created as Stock rows in bulk.
+bulk_create skips model signals, so the price store and search index are
+invalidated here for every chunk written.
+"""
+import csv
+import itertools
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from .models import Stock, StockPriceHistory
+from .price_store import price_store
+from .search import StockSearchIndex
+
+
+# Accepted header names (lower-cased, spaces/underscores removed) per field
+COLUMNS = {
+    'symbol': ('symbol', 'ticker'),
+    'date': ('date', 'day', 'timestamp'),
+    'open': ('open', 'openprice'),
+    'high': ('high', 'highprice'),
+    'low': ('low', 'lowprice'),
+    'close': ('close', 'closeprice'),
+    'volume': ('volume', 'vol'),
+}
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+CENT = Decimal('0.01')
+MAX_PRICE = Decimal('1e13')  # max_digits=15, decimal_places=2
+
+
+class ImportFileError(ValueError):
+    """The file cannot be imported at all (missing columns, unsupported format)"""
+
+
+def _key(header):
+    return str(header).strip().lower().replace(' ', '').replace('_', '')
+
+
+def map_columns(headers, default_symbol=None):
+    """{field: header} for the file's headers; ImportFileError if a required field is missing"""
+    by_key = {_key(h): h for h in headers}
+    mapping = {}
+    for field, aliases in COLUMNS.items():
+        for alias in aliases:
+            if alias in by_key:
+                mapping[field] = by_key[alias]
+                break
+    required = set(COLUMNS) - ({'symbol'} if default_symbol else set())
+    missing = required - set(mapping)
+    if missing:
+        raise ImportFileError(f"Missing column(s): {', '.join(sorted(missing))}")
+    return mapping
+
+
+# --- readers -------------------------------------------------------------
+
+def read_csv_chunks(path, chunk_size, default_symbol=None):
+    """Yield lists of {field: raw value} dicts, chunk_size rows at a time"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        mapping = map_columns(reader.fieldnames or [], default_symbol)
+        rows = ({field: raw.get(header) for field, header in mapping.items()} for raw in reader)
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def read_parquet_chunks(path, chunk_size, default_symbol=None):
+    """Yield lists of {field: raw value} dicts from Parquet row batches (needs pyarrow)"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportFileError('Parquet import needs pyarrow (pip install pyarrow)')
+    parquet = pq.ParquetFile(path)
+    mapping = map_columns(parquet.schema_arrow.names, default_symbol)
+    for batch in parquet.iter_batches(batch_size=chunk_size, columns=list(mapping.values())):
+        columns = {field: batch.column(header).to_pylist() for field, header in mapping.items()}
+        yield [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def read_chunks(path, chunk_size, default_symbol=None):
+    if str(path).lower().endswith(('.parquet', '.pq')):
+        return read_parquet_chunks(path, chunk_size, default_symbol)
+    return read_csv_chunks(path, chunk_size, default_symbol)
+
+
+# --- validation ----------------------------------------------------------
+
+def parse_row(raw, default_symbol=None, date_format='%Y-%m-%d'):
+    """(symbol, date, open, high, low, close, volume) or ValueError with the reason"""
+    symbol = str(raw.get('symbol') or default_symbol or '').strip().upper()
+    if not symbol or len(symbol) > Stock._meta.get_field('symbol').max_length:
+        raise ValueError(f'bad symbol {symbol!r}')
+
+    day = raw['date']
+    if isinstance(day, datetime):
+        day = day.date()
+    elif not isinstance(day, date):
+        text = str(day or '').strip()
+        try:
+            day = datetime.strptime(text, date_format).date()
+        except ValueError:
+            try:
+                # ISO timestamps such as 2024-01-02T00:00:00Z
+                day = date.fromisoformat(text[:10])
+            except ValueError:
+                raise ValueError(f"bad date {raw['date']!r}")
+
+    prices = []
+    for field in PRICE_FIELDS:
+        try:
+            value = Decimal(str(raw[field]).strip()).quantize(CENT)
+            in_range = 0 < value < MAX_PRICE
+        except (InvalidOperation, TypeError):
+            raise ValueError(f'bad {field} {raw[field]!r}')
+        if not in_range:
+            raise ValueError(f'{field} out of range: {value}')
+        prices.append(value)
+    o, h, l, c = prices
+    if h < max(o, c, l) or l > min(o, c):
+        raise ValueError('high/low do not bracket open/close')
+
+    try:
+        volume = int(float(raw['volume'] or 0))
+    except (TypeError, ValueError):
+        raise ValueError(f"bad volume {raw['volume']!r}")
+    if volume < 0:
+        raise ValueError('negative volume')
+    return symbol, day, o, h, l, c, volume
+
+
+# --- writes --------------------------------------------------------------
+
+class PriceImporter:
+    """Validates and upserts chunks of raw rows; keeps running totals"""
+
+    def __init__(self, default_symbol=None, date_format='%Y-%m-%d', skip_existing=False,
+                 dry_run=False, max_errors=20):
+        self.default_symbol = default_symbol
+        self.date_format = date_format
+        self.skip_existing = skip_existing
+        self.dry_run = dry_run
+        self.max_errors = max_errors
+        self.stock_ids = {}     # symbol -> id, grows with the number of tickers only
+        self.rows_read = 0
+        self.rows_written = 0
+        self.rows_invalid = 0
+        self.stocks_created = 0
+        self.errors = []        # first max_errors (row number, reason)
+
+    def _resolve_symbols(self, parsed):
+        """Fill stock_ids for every symbol in `parsed`, creating missing stocks in bulk"""
+        wanted = {row[0] for row in parsed} - set(self.stock_ids)
+        if not wanted:
+            return
+        self.stock_ids.update(Stock.objects.filter(symbol__in=wanted).values_list('symbol', 'id'))
+        missing = wanted - set(self.stock_ids)
+        if not missing or self.dry_run:
+            return
+        last_close = {}
+        for symbol, day, _, _, _, close, _ in parsed:
+            if symbol in missing and (symbol not in last_close or day >= last_close[symbol][0]):
+                last_close[symbol] = (day, close)
+        Stock.objects.bulk_create([
+            Stock(symbol=s, name=s, current_price=last_close[s][1], previous_close=last_close[s][1])
+            for s in missing
+        ], ignore_conflicts=True)
+        self.stock_ids.update(Stock.objects.filter(symbol__in=missing).values_list('symbol', 'id'))
+        self.stocks_created += len(missing)
+        StockSearchIndex.invalidate()
+
+    def import_chunk(self, chunk):
+        """Validate and upsert one chunk; returns rows written"""
+        parsed = []
+        for raw in chunk:
+            self.rows_read += 1
+            try:
+                parsed.append(parse_row(raw, self.default_symbol, self.date_format))
+            except (KeyError, ValueError) as e:
+                self.rows_invalid += 1
+                if len(self.errors) < self.max_errors:
+                    self.errors.append((self.rows_read, str(e)))
+        if not parsed:
+            return 0
+
+        with transaction.atomic():
+            self._resolve_symbols(parsed)
+            # Last row wins for a (stock, date) repeated within the chunk
+            bars = {}
+            for symbol, day, o, h, l, c, volume in parsed:
+                sid = self.stock_ids.get(symbol)
+                if sid is None:  # dry run, stock not created
+                    continue
+                bars[(sid, day)] = StockPriceHistory(
+                    stock_id=sid, date=day, open_price=o, high_price=h,
+                    low_price=l, close_price=c, volume=volume,
+                )
+            if self.dry_run:
+                return len(parsed)
+            if self.skip_existing:
+                StockPriceHistory.objects.bulk_create(bars.values(), ignore_conflicts=True)
+            else:
+                StockPriceHistory.objects.bulk_create(
+                    bars.values(),
+                    update_conflicts=True,
+                    unique_fields=['stock', 'date'],
+                    update_fields=['open_price', 'high_price', 'low_price', 'close_price', 'volume'],
+                )
+            touched = {sid for sid, _ in bars}
+            transaction.on_commit(lambda: price_store.invalidate(touched))
+        self.rows_written += len(bars)
+        return len(bars)
@@ -0,0 +1,256 @@
+"""
+Vectorized technical-indicator engine for FinanceAI
+
+Computes the MarketIndicator types read by the AI signal (RSI, MACD, SMA, EMA,
+volume ratio, news sentiment) for many stocks at once. Price series from the
+columnar store are right-aligned into one (stocks x bars) matrix so every
+kernel is a NumPy operation over the whole batch; the EWMA recursions loop over
+the time axis only, never over stocks. By default only bars newer than a
+stock's last stored indicators are written, and stocks without such bars are
+not computed at all.
+"""
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from django.db import connection, transaction
+from django.db.models import Avg, Max
+from django.utils import timezone
+
+from .kernels import ema, macd, rolling_mean, rsi, volume_ratio, warmed_up
+from .models import LatestIndicator, MarketIndicator, Stock
+from .price_store import align_right, price_store, version_cache
+
+
+# Per-stock token bumped whenever the stock's LatestIndicator snapshot changes
+SNAPSHOT_VERSION_KEY = 'prediction:indicator_version:{stock_id}'
+
+# indicator_type -> period stored on the MarketIndicator row
+PERIODS = {
+    'rsi': 14,
+    'macd': 26,
+    'sma': 20,
+    'ema': 20,
+    'volume': 20,
+    'sentiment': 7,
+}
+# Types computed from price bars (sentiment comes from news)
+PRICE_TYPES = ('rsi', 'macd', 'sma', 'ema', 'volume')
+
+
+def price_indicators(close, volume):
+    """{indicator_type: 2D array} for every bar-based indicator"""
+    return {
+        'rsi': rsi(close, PERIODS['rsi']),
+        'macd': macd(close, slow=PERIODS['macd']),
+        'sma': rolling_mean(close, PERIODS['sma']),
+        'ema': warmed_up(ema(close, PERIODS['ema']), close, PERIODS['ema']),
+        'volume': volume_ratio(volume, PERIODS['volume']),
+    }
+
+
+# --- universe batches --------------------------------------------------------
+
+def sentiment_scores(stock_ids, days=PERIODS['sentiment']):
+    """{stock_id: mean related-news sentiment over the last `days` days} in one query"""
+    from news.models import NewsArticle
+
+    # The news app ships without migrations; until its tables exist there is no sentiment
+    if NewsArticle._meta.db_table not in connection.introspection.table_names():
+        return {}
+    since = timezone.now() - timedelta(days=days)
+    rows = (
+        NewsArticle.objects.filter(
+            related_stocks__in=stock_ids, is_active=True, published_at__gte=since
+        )
+        .values('related_stocks')
+        .annotate(score=Avg('sentiment_score'))
+    )
+    return {r['related_stocks']: float(r['score']) for r in rows if r['score'] is not None}
+
+
+def stored_through(stock_ids):
+    """{stock_id: newest as_of of its stored price indicators} (stocks without any are left out)"""
+    return dict(
+        MarketIndicator.objects.filter(
+            stock_id__in=stock_ids, indicator_type__in=PRICE_TYPES, as_of__isnull=False,
+        )
+        .values('stock_id').annotate(last=Max('as_of')).values_list('stock_id', 'last')
+    )
+
+
+def compute_indicator_rows(stock_ids, since=None, full=False):
+    """
+    MarketIndicator instances (unsaved) for the given stocks: by default for
+    bars newer than each stock's last stored indicators, with `since` for bars
+    dated on or after it, with full=True for every bar. Earlier bars still feed
+    the kernels; stocks with nothing to write are skipped before computing.
+    """
+    series_by_id = price_store.get_many(stock_ids)
+    if full:
+        starts = {}
+    elif since is not None:
+        starts = dict.fromkeys(stock_ids, since)
+    else:
+        starts = {sid: last + timedelta(days=1) for sid, last in stored_through(stock_ids).items()}
+    pending = [
+        sid for sid in stock_ids
+        if len(series_by_id[sid]) and (sid not in starts or series_by_id[sid].last_date >= starts[sid])
+    ]
+    rows = _price_rows(pending, [series_by_id[sid] for sid in pending], starts)
+
+    today = timezone.now().date()
+    if since is None or since <= today:
+        for sid, score in sentiment_scores(stock_ids).items():
+            rows.append(MarketIndicator(
+                stock_id=sid, indicator_type='sentiment', period=PERIODS['sentiment'],
+                as_of=today, value=round(score, 4),
+            ))
+    return rows
+
+
+def _price_rows(stock_ids, series_list, starts):
+    """Price-indicator rows for bars on or after starts[stock_id] (every bar when absent)"""
+    dates, close, volume = align_right(series_list)
+    if not dates.size:
+        return []
+    values = price_indicators(close, volume)
+
+    emit = ~np.isnat(dates)
+    if starts:
+        start = np.array([starts.get(sid) or date.min for sid in stock_ids], dtype='datetime64[D]')
+        emit &= dates >= start[:, None]
+
+    sid_arr = np.asarray(stock_ids, dtype=np.int64)
+    rows = []
+    for indicator_type, matrix in values.items():
+        mask = emit & ~np.isnan(matrix)
+        r, c = np.nonzero(mask)
+        period = PERIODS[indicator_type]
+        for sid, as_of, value in zip(
+            sid_arr[r].tolist(), dates[r, c].astype(object), np.round(matrix[r, c], 4).tolist()
+        ):
+            rows.append(MarketIndicator(
+                stock_id=sid, indicator_type=indicator_type, period=period,
+                as_of=as_of, value=value,
+            ))
+    return rows
+
+
+def write_indicator_rows(rows, chunk_size=5000):
+    """Upsert rows on (stock, indicator_type, period, as_of) in chunks and refresh the snapshot"""
+    with transaction.atomic():
+        for i in range(0, len(rows), chunk_size):
+            MarketIndicator.objects.bulk_create(
+                rows[i:i + chunk_size],
+                update_conflicts=True,
+                unique_fields=['stock', 'indicator_type', 'period', 'as_of'],
+                update_fields=['value', 'calculated_at'],
+            )
+        refresh_latest_indicators(rows)
+    return len(rows)
+
+
+# --- latest-per-type snapshot ------------------------------------------------
+
+def snapshot_versions(stock_ids):
+    """Current snapshot version token per stock id (creates tokens that are missing)"""
+    keys = {sid: SNAPSHOT_VERSION_KEY.format(stock_id=sid) for sid in stock_ids}
+    found = version_cache.get_many(list(keys.values()))
+    out = {}
+    for sid, key in keys.items():
+        token = found.get(key)
+        if token is None:
+            token = str(time.time_ns())
+            if not version_cache.add(key, token, timeout=None):
+                token = version_cache.get(key) or token
+        out[sid] = token
+    return out
+
+
+def _bump_snapshot_versions(stock_ids):
+    token = str(time.time_ns())
+    version_cache.set_many({SNAPSHOT_VERSION_KEY.format(stock_id=sid): token for sid in stock_ids}, timeout=None)
+
+
+def _recency(as_of, calculated_at):
+    """
+    Sort key for "newer" between indicator rows. Rows without as_of (admin or
+    legacy writers) count as computed for the bar of the day they were saved.
+    """
+    if calculated_at is None:
+        return (as_of or date.min, timezone.now())
+    return (as_of or timezone.localdate(calculated_at), calculated_at)
+
+
+def refresh_latest_indicators(rows):
+    """Fold saved MarketIndicator rows into LatestIndicator, keeping whichever value is newer"""
+    newest = {}
+    for row in rows:
+        key = (row.stock_id, row.indicator_type)
+        best = newest.get(key)
+        if best is None or _recency(row.as_of, row.calculated_at) >= _recency(best.as_of, best.calculated_at):
+            newest[key] = row
+    if not newest:
+        return 0
+    current = {
+        (sid, indicator_type): _recency(as_of, calculated_at)
+        for sid, indicator_type, as_of, calculated_at in LatestIndicator.objects.filter(
+            stock_id__in={sid for sid, _ in newest}
+        ).values_list('stock_id', 'indicator_type', 'as_of', 'calculated_at')
+    }
+    snapshot = [
+        LatestIndicator(
+            stock_id=row.stock_id, indicator_type=row.indicator_type, value=row.value,
+            period=row.period, as_of=row.as_of, calculated_at=row.calculated_at,
+        )
+        for key, row in newest.items()
+        if key not in current or _recency(row.as_of, row.calculated_at) >= current[key]
+    ]
+    LatestIndicator.objects.bulk_create(
+        snapshot,
+        update_conflicts=True,
+        unique_fields=['stock', 'indicator_type'],
+        update_fields=['value', 'period', 'as_of', 'calculated_at'],
+    )
+    stock_ids = {row.stock_id for row in snapshot}
+    transaction.on_commit(lambda: _bump_snapshot_versions(stock_ids))
+    return len(snapshot)
+
+
+def rebuild_latest_indicator(stock_id, indicator_type):
+    """Recompute one snapshot row from history (used after a history row is deleted)"""
+    transaction.on_commit(lambda: _bump_snapshot_versions([stock_id]))
+    history = MarketIndicator.objects.filter(stock_id=stock_id, indicator_type=indicator_type)
+    # Newest dated row vs newest undated one (history ordering puts undated rows last)
+    candidates = [
+        row for row in (
+            history.filter(as_of__isnull=False).first(),
+            history.filter(as_of__isnull=True).order_by('-calculated_at').first(),
+        ) if row is not None
+    ]
+    latest = max(candidates, key=lambda row: _recency(row.as_of, row.calculated_at), default=None)
+    if latest is None:
+        LatestIndicator.objects.filter(stock_id=stock_id, indicator_type=indicator_type).delete()
+        return
+    LatestIndicator.objects.update_or_create(
+        stock_id=stock_id, indicator_type=indicator_type,
+        defaults={
+            'value': latest.value, 'period': latest.period,
+            'as_of': latest.as_of, 'calculated_at': latest.calculated_at,
+        },
+    )
+
+
+def run_indicator_engine(stock_ids=None, since=None, full=False, batch_stocks=500, chunk_size=5000):
+    """
+    Compute and store indicators for the universe (or the given stocks); returns
+    rows written. `since` and `full` choose the bars as in compute_indicator_rows.
+    """
+    if stock_ids is None:
+        stock_ids = list(Stock.objects.order_by('id').values_list('id', flat=True))
+    written = 0
+    for i in range(0, len(stock_ids), batch_stocks):
+        batch = stock_ids[i:i + batch_stocks]
+        written += write_indicator_rows(compute_indicator_rows(batch, since=since, full=full), chunk_size)
+    return written
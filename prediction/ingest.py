@@ -0,0 +1,124 @@
+"""
+Quote ingest worker for FinanceAI
+
+Each cycle pulls a batch of ticks from the quote provider and folds them into
+the shared quote table (many ticks per symbol coalesce into one entry), then
+persists the result in one transaction: a single bulk_update of every Stock
+whose price, previous close or volume changed, and an upsert of the daily
+StockPriceHistory bar of each session that has closed (feed time past
+MARKET_CLOSE, or a tick from the next session). The same transaction upserts
+the 1- and 5-minute intraday bars the cycle's ticks touched. After the commit
+prices_changed is sent with the stock ids involved so price-dependent caches
+invalidate only what moved. When a session closes, indicators are computed
+for the new daily bars only, and intraday sessions past their retention are
+compacted (see prediction.intraday).
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import intraday, quotes
+from .indicators import run_indicator_engine
+from .models import Stock, StockPriceHistory
+from .signals import prices_changed
+
+
+CENT = Decimal('0.01')
+
+
+def _money(value):
+    return Decimal(str(value)).quantize(CENT)
+
+
+class QuoteIngestor:
+    """Runs ingest cycles against one provider; keeps running totals"""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.written = {}        # symbol -> (price, previous_close, volume) last written to Stock
+        self.aggregator = intraday.BarAggregator()
+        self.cycles = 0
+        self.ticks = 0
+        self.stocks_written = 0
+        self.bars_written = 0
+        self.intraday_written = 0
+        self.indicators_written = 0
+
+    def _stock_updates(self, quote_table, symbols, now):
+        rows = []
+        for symbol in symbols:
+            q = quote_table[symbol]
+            state = (_money(q['price']), _money(q['previous_close'] or 0), q['volume'])
+            if self.written.get(symbol) == state:
+                continue
+            self.written[symbol] = state
+            price, previous_close, volume = state
+            rows.append(Stock(
+                id=q['stock_id'], current_price=price, previous_close=previous_close,
+                volume=volume, last_updated=now,
+            ))
+        return rows
+
+    def _closing_bars(self, quote_table, now):
+        """Bars of sessions whose close has passed in feed time, marking them rolled"""
+        bars = []
+        for q in quote_table.values():
+            session = q['session']
+            if session and q.get('rolled') != session and now >= quotes.session_close(session):
+                bars.append(quotes.roll_session(q))
+        return bars
+
+    def cycle(self):
+        """One fetch / coalesce / write pass; returns (ticks, stocks written, bars written)"""
+        ticks = self.provider.fetch()
+        now = self.provider.now()
+        table = quotes.load_table()
+        seeded = quotes.seed_missing(table, {t.symbol for t in ticks})
+        quote_table = table['quotes']
+        bars = []
+        changed = quotes.apply_ticks(quote_table, ticks, closed=bars)
+        bars += self._closing_bars(quote_table, now)
+        stocks = self._stock_updates(quote_table, sorted(changed), now)
+        self.aggregator.add(ticks, quote_table)
+        intraday_bars = self.aggregator.drain()
+
+        if stocks or bars or intraday_bars:
+            with transaction.atomic():
+                intraday.write_bars(intraday_bars)
+                Stock.objects.bulk_update(stocks, ['current_price', 'previous_close', 'volume', 'last_updated'])
+                StockPriceHistory.objects.bulk_create(
+                    [
+                        StockPriceHistory(
+                            stock_id=b['stock_id'], date=date.fromisoformat(b['date']),
+                            open_price=_money(b['open']), high_price=_money(b['high']),
+                            low_price=_money(b['low']), close_price=_money(b['close']),
+                            volume=b['volume'],
+                        )
+                        for b in bars
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['stock', 'date'],
+                    update_fields=['open_price', 'high_price', 'low_price', 'close_price', 'volume'],
+                )
+                stock_ids = [s.id for s in stocks]
+                bar_stock_ids = sorted({b['stock_id'] for b in bars})
+                transaction.on_commit(lambda: prices_changed.send(
+                    sender=QuoteIngestor, stock_ids=stock_ids, bar_stock_ids=bar_stock_ids,
+                ))
+        if changed or seeded or bars:
+            quotes.save_table(table, changed)
+        if bars:
+            self.indicators_written += run_indicator_engine(
+                stock_ids=sorted({b['stock_id'] for b in bars}),
+                since=min(date.fromisoformat(b['date']) for b in bars),
+            )
+            intraday.compact(today=timezone.localdate(now, quotes.market_timezone()))
+
+        self.cycles += 1
+        self.ticks += len(ticks)
+        self.stocks_written += len(stocks)
+        self.bars_written += len(bars)
+        self.intraday_written += len(intraday_bars)
+        return len(ticks), len(stocks), len(bars)
@@ -0,0 +1,234 @@
+"""
+Intraday bars for FinanceAI
+
+The quote ingest worker folds every tick into open 1- and 5-minute bars per
+symbol (BarAggregator) and upserts the bars touched in each cycle alongside
+its Stock updates, so the 1D chart shows the minute in progress. Bars are
+keyed by (stock, interval, session, start): the trading day leads the key, so
+reading a stock's latest sessions is a range scan however many minute bars the
+table holds, and old sessions are dropped as a unit.
+
+Sessions older than INTRADAY_RETENTION_DAYS are compacted: their 1-minute bars
+fill in any missing daily StockPriceHistory bar, then the session's intraday
+rows are deleted. The ingest worker runs this whenever a session closes;
+compact_intraday runs it by hand.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from . import quotes
+from .models import IntradayBar, StockPriceHistory
+from .price_store import PriceSeries
+from .signals import prices_changed
+
+
+INTERVALS = (1, 5)
+RESOLUTIONS = {'1m': 1, '5m': 5}
+# Chart range -> (sessions shown, default resolution); 1W is intraday only when asked for
+CHART_RANGES = {'1D': (1, '1m'), '1W': (5, None)}
+# Regular-session minutes, for sizing a chart before reading it
+SESSION_MINUTES = 390
+DEFAULT_RETENTION_DAYS = 30
+CENT = Decimal('0.01')
+
+
+def _money(value):
+    return Decimal(str(value)).quantize(CENT)
+
+
+def _bar_start(timestamp, interval):
+    minute = int(timestamp.timestamp() // 60)
+    return datetime.fromtimestamp((minute - minute % interval) * 60, tz=dt_timezone.utc)
+
+
+class BarAggregator:
+    """Streaming tick -> bar aggregation; keeps each symbol's open bar per interval"""
+
+    def __init__(self):
+        self.bars = {}          # (symbol, interval) -> open bar
+        self.dirty = set()      # keys of open bars changed since the last drain
+        self.finished = []      # bars closed since the last drain
+        self.started = None     # first tick seen: bars open at that time may already be stored
+
+    def add(self, ticks, quote_table):
+        """Fold ticks (oldest first) into bars; symbols missing from the quote table are skipped"""
+        tz = quotes.market_timezone()
+        for tick in ticks:
+            quote = quote_table.get(tick.symbol)
+            if quote is None:
+                continue
+            if self.started is None:
+                self.started = tick.timestamp
+            for interval in INTERVALS:
+                key = (tick.symbol, interval)
+                bar = self.bars.get(key)
+                if bar is not None and tick.timestamp < bar['last']:
+                    continue  # late tick
+                start = _bar_start(tick.timestamp, interval)
+                if bar is None or start > bar['start']:
+                    if key in self.dirty:
+                        self.finished.append(bar)
+                    bar = self.bars[key] = {
+                        'stock_id': quote['stock_id'], 'interval': interval,
+                        'session': timezone.localdate(tick.timestamp, tz), 'start': start,
+                        'open': tick.price, 'high': tick.price, 'low': tick.price, 'close': tick.price,
+                        'volume': 0, 'last': tick.timestamp, 'resume': start <= self.started,
+                    }
+                bar['high'] = max(bar['high'], tick.price)
+                bar['low'] = min(bar['low'], tick.price)
+                bar['close'] = tick.price
+                bar['volume'] += tick.volume
+                bar['last'] = tick.timestamp
+                self.dirty.add(key)
+
+    def drain(self):
+        """Bars changed since the previous drain (closed ones first), merged with stored partial bars"""
+        bars = self.finished + [self.bars[key] for key in self.dirty]
+        self.finished, self.dirty = [], set()
+        self._merge_stored([bar for bar in bars if bar['resume']])
+        return bars
+
+    def _merge_stored(self, bars):
+        """Fold in what a previous worker stored for bars that were open when this one started"""
+        if not bars:
+            return
+        stored = {
+            (row.stock_id, row.interval, row.start): row
+            for row in IntradayBar.objects.filter(
+                stock_id__in={b['stock_id'] for b in bars},
+                interval__in={b['interval'] for b in bars},
+                start__in={b['start'] for b in bars},
+            )
+        }
+        for bar in bars:
+            bar['resume'] = False
+            row = stored.get((bar['stock_id'], bar['interval'], bar['start']))
+            if row is not None:
+                bar['open'] = float(row.open_price)
+                bar['high'] = max(bar['high'], float(row.high_price))
+                bar['low'] = min(bar['low'], float(row.low_price))
+                bar['volume'] += row.volume
+
+
+def write_bars(bars):
+    """Upsert drained bars; call inside the ingest transaction"""
+    IntradayBar.objects.bulk_create(
+        [
+            IntradayBar(
+                stock_id=b['stock_id'], interval=b['interval'], session=b['session'], start=b['start'],
+                open_price=_money(b['open']), high_price=_money(b['high']),
+                low_price=_money(b['low']), close_price=_money(b['close']), volume=b['volume'],
+            )
+            for b in bars
+        ],
+        update_conflicts=True,
+        unique_fields=['stock', 'interval', 'session', 'start'],
+        update_fields=['open_price', 'high_price', 'low_price', 'close_price', 'volume'],
+    )
+
+
+def retention_days():
+    return getattr(settings, 'INTRADAY_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+
+
+def _session_edge(field, order):
+    """Price of the first / last 1-minute bar of the outer row's (stock, session)"""
+    return Subquery(
+        IntradayBar.objects.filter(stock=OuterRef('stock'), interval=1, session=OuterRef('session'))
+        .order_by(order).values(field)[:1]
+    )
+
+
+def compact(today=None, retention=None):
+    """
+    Fold sessions older than the retention period into daily bars (kept where a
+    daily bar already exists) and delete their intraday rows, one session per
+    transaction. Returns (daily bars written, intraday rows deleted).
+    """
+    retention = retention_days() if retention is None else retention
+    today = today or timezone.localdate(timezone.now(), quotes.market_timezone())
+    cutoff = today - timedelta(days=retention)
+    sessions = list(
+        IntradayBar.objects.filter(session__lt=cutoff).values_list('session', flat=True).distinct().order_by('session')
+    )
+    written = deleted = 0
+    for session in sessions:
+        days = list(
+            IntradayBar.objects.filter(session=session, interval=1)
+            .values('stock_id', 'session')
+            .annotate(
+                open=_session_edge('open_price', 'start'), high=Max('high_price'), low=Min('low_price'),
+                close=_session_edge('close_price', '-start'), volume=Sum('volume'),
+            )
+            .order_by()
+        )
+        with transaction.atomic():
+            StockPriceHistory.objects.bulk_create(
+                [
+                    StockPriceHistory(
+                        stock_id=d['stock_id'], date=session, open_price=d['open'], high_price=d['high'],
+                        low_price=d['low'], close_price=d['close'], volume=d['volume'],
+                    )
+                    for d in days
+                ],
+                ignore_conflicts=True,
+                batch_size=1000,
+            )
+            deleted += IntradayBar.objects.filter(session=session).delete()[0]
+            bar_stock_ids = sorted({d['stock_id'] for d in days})
+            transaction.on_commit(lambda ids=bar_stock_ids: prices_changed.send(
+                sender=IntradayBar, stock_ids=[], bar_stock_ids=ids,
+            ))
+        written += len(days)
+    return written, deleted
+
+
+def chart_bars(stock_id, range_param, resolution=None, max_points=None):
+    """
+    (bars, resolution) of stored intraday bars for an intraday chart range, or
+    (None, None) when the range is daily or the stock has no intraday bars.
+    Bars are a PriceSeries whose dates are datetime64[m] (UTC bar open times).
+    """
+    if range_param not in CHART_RANGES:
+        return None, None
+    sessions, default = CHART_RANGES[range_param]
+    resolution = resolution if resolution in RESOLUTIONS else default
+    if resolution is None:
+        return None, None
+    max_points = max_points or getattr(settings, 'CHART_MAX_POINTS', 500)
+    # Coarser bars when a full window of the requested ones would not fit
+    if sessions * SESSION_MINUTES // RESOLUTIONS[resolution] > max_points:
+        resolution = '5m'
+    qs = IntradayBar.objects.filter(stock_id=stock_id, interval=RESOLUTIONS[resolution])
+    first = qs.values_list('session', flat=True).distinct().order_by('-session')[sessions - 1:sessions]
+    first = list(first) or list(qs.values_list('session', flat=True).order_by('session')[:1])
+    if not first:
+        return None, None
+    rows = list(
+        qs.filter(session__gte=first[0]).order_by('start')
+        .values_list('start', 'open_price', 'high_price', 'low_price', 'close_price', 'volume')
+    )
+    starts, o, h, l, c, v = zip(*rows)
+    minutes = np.array([int(s.timestamp()) // 60 for s in starts], dtype=np.int64).astype('datetime64[m]')
+    bars = PriceSeries(
+        stock_id, None, minutes,
+        np.asarray(o, dtype=np.float64), np.asarray(h, dtype=np.float64),
+        np.asarray(l, dtype=np.float64), np.asarray(c, dtype=np.float64), np.asarray(v, dtype=np.int64),
+    )
+    return bars.tail(max_points), resolution
+
+
+def labels(bars, range_param):
+    """Chart labels for intraday bars in market time"""
+    tz = quotes.market_timezone()
+    fmt = '%H:%M' if range_param == '1D' else '%b %d %H:%M'
+    return [
+        datetime.fromtimestamp(int(m) * 60, tz=tz).strftime(fmt)
+        for m in bars.dates.astype(np.int64).tolist()
+    ]
@@ -0,0 +1,155 @@
+"""
+NumPy kernels shared by the indicator, backtest and analytics engines
+
+Every kernel takes 1D or 2D arrays (one row per stock, bars along axis 1, NaN
+where a stock has no bar) and returns a 2D float array of the same shape.
+This module has no Django imports so process-pool workers can load it.
+"""
+import numpy as np
+
+
+def rolling_mean(x, window):
+    """Simple moving average; NaN until a full window of bars is available"""
+    x = np.atleast_2d(np.asarray(x, dtype=np.float64))
+    valid = ~np.isnan(x)
+    filled = np.where(valid, x, 0.0)
+    zeros = np.zeros((x.shape[0], 1))
+    csum = np.concatenate((zeros, np.cumsum(filled, axis=1)), axis=1)
+    ccount = np.concatenate((zeros, np.cumsum(valid, axis=1)), axis=1)
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= window:
+        total = csum[:, window:] - csum[:, :-window]
+        count = ccount[:, window:] - ccount[:, :-window]
+        out[:, window - 1:] = np.where(count == window, total / window, np.nan)
+    return out
+
+
+def rolling_std(x, window):
+    """Rolling sample standard deviation (ddof=1); NaN until a full window of bars is available"""
+    x = np.atleast_2d(np.asarray(x, dtype=np.float64))
+    mean = rolling_mean(x, window)
+    mean_sq = rolling_mean(x * x, window)
+    with np.errstate(invalid='ignore'):
+        var = (mean_sq - mean * mean) * window / (window - 1)
+    # Cancellation can leave tiny negative variances for flat windows
+    return np.sqrt(np.clip(var, 0.0, None))
+
+
+def ewma(x, alpha):
+    """Exponentially weighted mean (adjust=False), seeded with each row's first bar"""
+    x = np.atleast_2d(np.asarray(x, dtype=np.float64))
+    out = np.full(x.shape, np.nan)
+    prev = np.full(x.shape[0], np.nan)
+    for t in range(x.shape[1]):
+        col = x[:, t]
+        step = prev + alpha * (col - prev)
+        prev = np.where(np.isnan(prev), col, np.where(np.isnan(col), prev, step))
+        out[:, t] = prev
+    return out
+
+
+def ema(x, span):
+    return ewma(x, 2.0 / (span + 1.0))
+
+
+def warmed_up(values, x, bars):
+    """Blank out values until `bars` non-NaN inputs have been seen in each row"""
+    seen = np.cumsum(~np.isnan(np.atleast_2d(x)), axis=1)
+    return np.where(seen >= bars, values, np.nan)
+
+
+def rsi(close, period=14):
+    """Wilder RSI (0-100)"""
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    delta = np.diff(close, axis=1, prepend=np.nan)
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    gains[np.isnan(delta)] = np.nan
+    losses[np.isnan(delta)] = np.nan
+    avg_gain = ewma(gains, 1.0 / period)
+    avg_loss = ewma(losses, 1.0 / period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        out = 100.0 - 100.0 / (1.0 + rs)
+    out = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, 50.0), out)
+    # Wilder averages need a full period of changes before they mean anything
+    return warmed_up(out, delta, period)
+
+
+def macd(close, fast=12, slow=26):
+    """MACD line: fast EMA minus slow EMA"""
+    return warmed_up(ema(close, fast) - ema(close, slow), close, slow)
+
+
+def volume_ratio(volume, period=20):
+    """Volume relative to its moving average (1.0 = average)"""
+    volume = np.atleast_2d(np.asarray(volume, dtype=np.float64))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = volume / rolling_mean(volume, period)
+    return np.where(np.isfinite(out), out, np.nan)
+
+
+def ffill(x):
+    """Carry the last non-NaN value forward along each row"""
+    x = np.atleast_2d(np.asarray(x, dtype=np.float64))
+    idx = np.where(~np.isnan(x), np.arange(x.shape[1]), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    return x[np.arange(x.shape[0])[:, None], idx]
+
+
+def pct_change(x, periods=1):
+    """Simple returns x[t] / x[t - periods] - 1; NaN for the first `periods` bars"""
+    x = np.atleast_2d(np.asarray(x, dtype=np.float64))
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] > periods:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[:, periods:] = x[:, periods:] / x[:, :-periods] - 1.0
+    return out
+
+
+def drawdown(equity):
+    """Fractional drawdown from the running peak (0 at new highs)"""
+    equity = np.atleast_2d(np.asarray(equity, dtype=np.float64))
+    peak = np.fmax.accumulate(equity, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(peak > 0, (peak - equity) / peak, 0.0)
+
+
+def pairwise_cov_corr(x, min_periods=2):
+    """
+    Covariance and correlation matrices of the rows of x, each pair using only
+    the bars where both rows have data (NaN where fewer than min_periods overlap).
+    """
+    x = np.atleast_2d(np.asarray(x, dtype=np.float64))
+    mask = (~np.isnan(x)).astype(np.float64)
+    x0 = np.where(mask > 0, x, 0.0)
+    n = mask @ mask.T
+    sx = x0 @ mask.T           # sum of row i over bars shared with row j
+    sxx = (x0 * x0) @ mask.T
+    sxy = x0 @ x0.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = (sxy - sx * sx.T / n) / (n - 1)
+        var_i = (sxx - sx * sx / n) / (n - 1)
+        corr = cov / np.sqrt(var_i * var_i.T)
+    enough = n >= min_periods
+    cov = np.where(enough, cov, np.nan)
+    corr = np.where(enough, np.clip(corr, -1.0, 1.0), np.nan)
+    return cov, corr
+
+
+def beta(returns, benchmark, min_periods=2):
+    """
+    Beta of each row of `returns` against the 1D `benchmark` returns, each row
+    using only the bars where both have data (NaN below min_periods).
+    """
+    x = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+    b = np.asarray(benchmark, dtype=np.float64)
+    mask = ~np.isnan(x) & ~np.isnan(b)
+    n = mask.sum(axis=1)
+    x0 = np.where(mask, x, 0.0)
+    b0 = np.where(mask, b, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = ((x0 * b0).sum(axis=1) - x0.sum(axis=1) * b0.sum(axis=1) / n) / (n - 1)
+        var_b = ((b0 * b0).sum(axis=1) - b0.sum(axis=1) ** 2 / n) / (n - 1)
+        out = cov / var_b
+    return np.where((n >= min_periods) & (var_b > 0), out, np.nan)
@@ -0,0 +1,110 @@
+"""
+Incrementally maintained prediction leaderboard for FinanceAI
+
+Resolved predictions are counted into LeaderboardEntry rows for the daily,
+weekly, monthly and all-time period containing their predicted_for_date.
+The resolver calls record_resolutions() inside its batch transaction, so the
+leaderboard endpoint is an indexed top-K read whatever the prediction count.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from . import archive
+from .models import LeaderboardEntry
+
+
+ALL_TIME = date(1970, 1, 1)
+WINDOWS = ['daily', 'weekly', 'monthly', 'all']
+
+
+def period_start(window, day):
+    """First day of the `window` period containing `day`"""
+    if window == 'daily':
+        return day
+    if window == 'weekly':
+        return day - timedelta(days=day.weekday())
+    if window == 'monthly':
+        return day.replace(day=1)
+    return ALL_TIME
+
+
+def _accuracy(correct, total):
+    return round(correct / total * 100, 1) if total else 0
+
+
+def record_resolutions(predictions):
+    """Add newly resolved predictions to every window; call inside a transaction"""
+    deltas = defaultdict(lambda: [0, 0])
+    for p in predictions:
+        for window in WINDOWS:
+            delta = deltas[(p.user_id, window, period_start(window, p.predicted_for_date))]
+            delta[0] += 1
+            delta[1] += 1 if p.is_correct else 0
+    if not deltas:
+        return
+    LeaderboardEntry.objects.bulk_create(
+        [LeaderboardEntry(user_id=u, window=w, period_start=d) for u, w, d in deltas],
+        ignore_conflicts=True,
+    )
+    user_ids = {u for u, _, _ in deltas}
+    starts = {d for _, _, d in deltas}
+    entries = [
+        e for e in LeaderboardEntry.objects.select_for_update().filter(
+            user_id__in=user_ids, period_start__in=starts
+        )
+        if (e.user_id, e.window, e.period_start) in deltas
+    ]
+    for e in entries:
+        total, correct = deltas[(e.user_id, e.window, e.period_start)]
+        e.total += total
+        e.correct += correct
+        e.accuracy = _accuracy(e.correct, e.total)
+    LeaderboardEntry.objects.bulk_update(entries, ['total', 'correct', 'accuracy'])
+
+
+def top(window='all', day=None, limit=20, min_total=5):
+    """Top entries for the period of `window` containing `day` (default: today)"""
+    return (
+        LeaderboardEntry.objects.filter(
+            window=window, period_start=period_start(window, day or timezone.localdate()), total__gte=min_total
+        )
+        .select_related('user')
+        .order_by('-accuracy', '-correct')[:limit]
+    )
+
+
+def rebuild():
+    """Recompute every entry from resolved predictions, archived ones included (one aggregate query per window and table)"""
+    truncs = {'daily': TruncDay, 'weekly': TruncWeek, 'monthly': TruncMonth}
+    counts = defaultdict(lambda: [0, 0])
+    for manager in archive.sources(include_archive=True):
+        resolved = manager.filter(is_correct__isnull=False)
+        for window in WINDOWS:
+            qs = resolved
+            fields = ['user_id']
+            if window in truncs:
+                qs = qs.annotate(period=truncs[window]('predicted_for_date'))
+                fields.append('period')
+            rows = qs.values(*fields).annotate(
+                total=Count('id'), correct=Count('id', filter=Q(is_correct=True))
+            ).order_by()
+            for row in rows:
+                key = (row['user_id'], window, row.get('period', ALL_TIME))
+                counts[key][0] += row['total']
+                counts[key][1] += row['correct']
+    entries = [
+        LeaderboardEntry(
+            user_id=user_id, window=window, period_start=period,
+            total=total, correct=correct, accuracy=_accuracy(correct, total),
+        )
+        for (user_id, window, period), (total, correct) in counts.items()
+    ]
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+    return len(entries)
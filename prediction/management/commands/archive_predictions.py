@@ -0,0 +1,33 @@
+"""
+Move resolved predictions past PREDICTION_ARCHIVE_DAYS into the archive table.
+
+Meant to run nightly (cron / scheduler); counters and the leaderboard are unaffected:
+
+    python manage.py archive_predictions              # PREDICTION_ARCHIVE_DAYS
+    python manage.py archive_predictions --days 30 --batch-size 10000
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from prediction.archive import archive_days, archive_resolved
+from prediction.models import ArchivedPrediction, Prediction
+
+
+class Command(BaseCommand):
+    help = 'Move old resolved predictions from the active table to the archive, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Archive predictions resolved more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Predictions moved per transaction')
+
+    def handle(self, *args, **options):
+        days = archive_days() if options['days'] is None else options['days']
+        if days < 0:
+            raise CommandError('--days must not be negative')
+        t0 = time.perf_counter()
+        moved = archive_resolved(days=days, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {moved} predictions in {time.perf_counter() - t0:.1f}s '
+            f'({Prediction.objects.count()} active, {ArchivedPrediction.objects.count()} archived)'
+        ))
@@ -0,0 +1,64 @@
+"""
+Parameter sweep of one backtest strategy across many symbols, in a process pool.
+
+    python manage.py backtest_sweep --strategy ma_crossover --grid fast=5,10,20 slow=50,100,200
+    python manage.py backtest_sweep --strategy momentum --grid lookback=10,20,60 --symbols AAPL MSFT
+"""
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from prediction.backtest import STRATEGIES, load_close_matrix, sweep
+from prediction.models import Stock
+
+
+class Command(BaseCommand):
+    help = 'Backtest every parameter combination of a strategy across the stock universe'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='ma_crossover')
+        parser.add_argument('--grid', nargs='*', default=[], help='name=v1,v2,... per parameter')
+        parser.add_argument('--symbols', nargs='+', help='Limit to these symbols (default: all)')
+        parser.add_argument('--start', help='YYYY-MM-DD')
+        parser.add_argument('--end', help='YYYY-MM-DD')
+        parser.add_argument('--cost-bps', type=float, default=0.0)
+        parser.add_argument('--processes', type=int, default=None)
+        parser.add_argument('--top', type=int, default=10, help='Rows to print, ranked by median Sharpe')
+
+    def handle(self, *args, **options):
+        grid = {}
+        for item in options['grid']:
+            name, sep, values = item.partition('=')
+            if not sep or not values:
+                raise CommandError(f'Bad --grid entry: {item!r} (expected name=v1,v2)')
+            grid[name] = values.split(',')
+
+        stocks = Stock.objects.order_by('id')
+        if options['symbols']:
+            stocks = stocks.filter(symbol__in=[s.upper() for s in options['symbols']])
+        stock_ids = list(stocks.values_list('id', flat=True))
+        if not stock_ids:
+            raise CommandError('No matching stocks')
+
+        _, close = load_close_matrix(stock_ids, options['start'], options['end'])
+        t0 = time.perf_counter()
+        try:
+            results = sweep(close, options['strategy'], grid, options['cost_bps'], options['processes'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - t0
+        runs = len(results) * len(stock_ids)
+        self.stdout.write(
+            f'{len(results)} parameter sets x {len(stock_ids)} symbols = {runs} backtests '
+            f'in {elapsed:.2f}s ({runs / elapsed if elapsed else 0:,.0f}/s)'
+        )
+
+        ranked = sorted(results, key=lambda r: np.median(r['metrics']['sharpe_ratio']), reverse=True)
+        for r in ranked[:options['top']]:
+            m = r['metrics']
+            self.stdout.write(
+                f"{r['params']}: median sharpe {np.median(m['sharpe_ratio']):.2f}, "
+                f"median return {np.median(m['total_return']) * 100:.2f}%, "
+                f"median max DD {np.median(m['max_drawdown']) * 100:.2f}%"
+            )
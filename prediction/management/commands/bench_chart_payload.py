@@ -0,0 +1,71 @@
+"""
+Benchmark chart payload formats: per-bar objects vs columnar JSON vs packed arrays.
+
+Runs on synthetic in-memory bars (no database). For each bar count it builds the
+chart and stock detail payloads the views return and encodes them with the
+same renderers, reporting size (raw and gzipped) and build + encode time.
+
+    python manage.py bench_chart_payload --bars 21 252 1260 2520
+"""
+import gzip
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from prediction.price_store import PriceSeries
+from prediction.renderers import ColumnarJSONRenderer, PackedColumnsRenderer
+
+
+def _series(n_bars, rng):
+    dates = np.arange(np.datetime64('2000-01-03'), np.datetime64('2000-01-03') + n_bars)
+    close = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars))), 2)
+    open_ = np.round(close * (1 + rng.normal(0, 0.005, n_bars)), 2)
+    high = np.round(np.maximum(open_, close) * 1.01, 2)
+    low = np.round(np.minimum(open_, close) * 0.99, 2)
+    volume = rng.integers(1_000_000, 10_000_000, n_bars)
+    return PriceSeries(0, 'bench', dates, open_, high, low, close, volume)
+
+
+def _chart_rows(bars):
+    return {'status': 'success', 'data': {
+        'labels': bars.date_strings('%b %d'), 'prices': bars.close.tolist(), 'ohlc': bars.ohlc(),
+    }}
+
+
+def _detail_rows(bars):
+    return {'status': 'success', 'data': {'price_history': bars.price_history(), 'ohlc': bars.ohlc()}}
+
+
+def _columns(bars):
+    return {'status': 'success', 'data': {'columns': bars.columns()}}
+
+
+class Command(BaseCommand):
+    help = 'Compare chart payload size and encode time across response formats'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bars', type=int, nargs='+', default=[21, 252, 1260, 2520])
+        parser.add_argument('--repeat', type=int, default=200, help='Encodes timed per variant')
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(42)
+        variants = (
+            ('chart rows (json)', _chart_rows, JSONRenderer()),
+            ('detail rows (json)', _detail_rows, JSONRenderer()),
+            ('columnar (json)', _columns, ColumnarJSONRenderer()),
+            ('packed (float32)', _columns, PackedColumnsRenderer()),
+        )
+        for n_bars in options['bars']:
+            bars = _series(n_bars, rng)
+            self.stdout.write(f'{n_bars} bars:')
+            for label, build, renderer in variants:
+                t0 = time.perf_counter()
+                for _ in range(options['repeat']):
+                    body = renderer.render(build(bars))
+                elapsed = (time.perf_counter() - t0) / options['repeat']
+                self.stdout.write(
+                    f'  {label:>20}: {len(body):>9,} bytes, {len(gzip.compress(body)):>9,} gzipped, '
+                    f'{elapsed * 1000:7.3f} ms/encode'
+                )
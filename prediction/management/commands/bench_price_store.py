@@ -0,0 +1,104 @@
+"""
+Benchmark the columnar price store against the per-row StockPriceHistory querysets.
+
+Synthetic bars are written inside a transaction that is rolled back at the end,
+so the command can be pointed at a development database without leaving data.
+
+    python manage.py bench_price_store --symbols 1000 --years 10
+"""
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from prediction.models import Stock, StockPriceHistory
+from prediction.price_store import PriceStore
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare chart reads from the columnar price store with the ORM querysets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--symbols', type=int, default=1000)
+        parser.add_argument('--years', type=int, default=10)
+        parser.add_argument('--range-days', type=int, default=365, help='Bars read per request (1Y = 365)')
+        parser.add_argument('--requests', type=int, default=2000, help='Chart requests to time per variant')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                stock_ids = self._seed(options)
+                self._run(stock_ids, options)
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write('Synthetic data rolled back.')
+
+    def _seed(self, options):
+        n_symbols, n_days = options['symbols'], options['years'] * 252
+        rng = np.random.default_rng(42)
+        stocks = Stock.objects.bulk_create([
+            Stock(symbol=f'BX{i:05d}', name=f'Bench {i}', current_price=100, previous_close=100)
+            for i in range(n_symbols)
+        ])
+        if any(s.pk is None for s in stocks):
+            stocks = list(Stock.objects.filter(symbol__startswith='BX').order_by('symbol'))
+        start = date.today() - timedelta(days=n_days)
+        dates = [start + timedelta(days=d) for d in range(n_days)]
+        t0 = time.perf_counter()
+        for stock in stocks:
+            closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_days)))
+            opens = closes * (1 + rng.normal(0, 0.005, n_days))
+            highs = np.maximum(opens, closes) * 1.01
+            lows = np.minimum(opens, closes) * 0.99
+            vols = rng.integers(1_000_000, 10_000_000, n_days)
+            StockPriceHistory.objects.bulk_create([
+                StockPriceHistory(
+                    stock=stock, date=d, open_price=round(o, 2), high_price=round(h, 2),
+                    low_price=round(l, 2), close_price=round(c, 2), volume=int(v),
+                )
+                for d, o, h, l, c, v in zip(dates, opens.tolist(), highs.tolist(), lows.tolist(), closes.tolist(), vols)
+            ], batch_size=options['batch_size'])
+        self.stdout.write(
+            f'Seeded {n_symbols} symbols x {n_days} bars in {time.perf_counter() - t0:.1f}s'
+        )
+        return [s.pk for s in stocks]
+
+    def _run(self, stock_ids, options):
+        range_days, n_requests = options['range_days'], options['requests']
+        rng = np.random.default_rng(7)
+        targets = rng.choice(stock_ids, size=n_requests).tolist()
+
+        def queryset_read(sid):
+            history = list(reversed(StockPriceHistory.objects.filter(stock_id=sid).order_by('-date')[:range_days]))
+            return [
+                {'date': ph.date.strftime('%Y-%m-%d'), 'o': float(ph.open_price), 'h': float(ph.high_price),
+                 'l': float(ph.low_price), 'c': float(ph.close_price), 'v': ph.volume}
+                for ph in history
+            ]
+
+        store = PriceStore(max_symbols=len(stock_ids))
+
+        def store_read(sid):
+            return store.get(sid).tail(range_days).ohlc()
+
+        t0 = time.perf_counter()
+        store.get_many(stock_ids)
+        load_s = time.perf_counter() - t0
+        self.stdout.write(f'Store cold load, whole universe: {load_s:.2f}s')
+
+        for label, fn in (('queryset', queryset_read), ('price store', store_read)):
+            t0 = time.perf_counter()
+            for sid in targets:
+                fn(sid)
+            elapsed = time.perf_counter() - t0
+            self.stdout.write(
+                f'{label:>12}: {n_requests} reads of {range_days} bars in {elapsed:.2f}s '
+                f'({elapsed / n_requests * 1000:.2f} ms/read)'
+            )
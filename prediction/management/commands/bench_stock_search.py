@@ -0,0 +1,93 @@
+"""
+Benchmark stock typeahead: the in-memory search index vs. icontains querysets.
+
+Synthetic stocks are written inside a transaction that is rolled back at the end,
+so the command can be pointed at a development database without leaving data.
+
+    python manage.py bench_stock_search --symbols 50000
+"""
+import string
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from prediction.models import Stock
+from prediction.search import StockSearchIndex
+
+
+WORDS = [
+    'global', 'american', 'pacific', 'united', 'first', 'national', 'digital', 'energy',
+    'health', 'capital', 'systems', 'networks', 'motors', 'pharma', 'foods', 'bank',
+    'financial', 'technologies', 'resources', 'industries', 'holdings', 'solar', 'mining',
+]
+SUFFIXES = ['Inc', 'Corp', 'Ltd', 'Group', 'PLC', 'Co']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare typeahead latency of the stock search index with icontains querysets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--symbols', type=int, default=50000)
+        parser.add_argument('--queries', type=int, default=2000, help='Queries to time per variant')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                names = self._seed(options)
+                self._run(names, options)
+                raise _Rollback
+        except _Rollback:
+            StockSearchIndex.invalidate()
+            self.stdout.write('Synthetic data rolled back.')
+
+    def _seed(self, options):
+        rng = np.random.default_rng(42)
+        letters = np.array(list(string.ascii_uppercase))
+        stocks = {}
+        while len(stocks) < options['symbols']:
+            symbol = ''.join(rng.choice(letters, size=rng.integers(2, 6)))
+            name = ' '.join(rng.choice(WORDS, size=2)).title() + ' ' + rng.choice(SUFFIXES)
+            stocks[f'{symbol}{len(stocks) % 10}'] = name
+        t0 = time.perf_counter()
+        Stock.objects.bulk_create([
+            Stock(symbol=symbol, name=name, current_price=100, previous_close=100)
+            for symbol, name in stocks.items()
+        ], batch_size=options['batch_size'], ignore_conflicts=True)
+        self.stdout.write(f'Seeded {len(stocks)} stocks in {time.perf_counter() - t0:.1f}s')
+        return list(stocks.items())
+
+    def _run(self, names, options):
+        rng = np.random.default_rng(7)
+        queries = []
+        for i in rng.integers(0, len(names), size=options['queries']).tolist():
+            symbol, name = names[i]
+            word = name.split()[i % 2].lower()
+            # Mix of symbol prefixes, name prefixes and misspelt names
+            queries.append((symbol[:2], word[:4], word[:3] + word[4:])[i % 3])
+
+        index = StockSearchIndex()
+        StockSearchIndex.invalidate()
+        t0 = time.perf_counter()
+        index.search('warmup')
+        self.stdout.write(f'Index build: {time.perf_counter() - t0:.2f}s')
+
+        def queryset_search(q):
+            return list(Stock.objects.filter(Q(symbol__icontains=q) | Q(name__icontains=q))[:20])
+
+        for label, fn in (('icontains', queryset_search), ('index', index.search)):
+            t0 = time.perf_counter()
+            for q in queries:
+                fn(q)
+            elapsed = time.perf_counter() - t0
+            self.stdout.write(
+                f'{label:>10}: {len(queries)} queries in {elapsed:.2f}s '
+                f'({elapsed / len(queries) * 1000:.3f} ms/query)'
+            )
@@ -0,0 +1,32 @@
+"""
+Compact intraday bars: fold sessions past their retention into daily bars and delete them.
+
+The ingest worker does this whenever a session closes; run it by hand (or from cron
+when no ingest worker is running):
+
+    python manage.py compact_intraday                 # INTRADAY_RETENTION_DAYS
+    python manage.py compact_intraday --days 7
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from prediction.intraday import compact, retention_days
+
+
+class Command(BaseCommand):
+    help = 'Fold old 1-minute bars into daily bars and delete the intraday rows of those sessions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Sessions to keep (default: INTRADAY_RETENTION_DAYS)')
+
+    def handle(self, *args, **options):
+        days = retention_days() if options['days'] is None else options['days']
+        if days < 0:
+            raise CommandError('--days must not be negative')
+        t0 = time.perf_counter()
+        written, deleted = compact(retention=days)
+        self.stdout.write(self.style.SUCCESS(
+            f'Compacted {written} stock sessions into daily bars, deleted {deleted} intraday bars '
+            f'in {time.perf_counter() - t0:.1f}s'
+        ))
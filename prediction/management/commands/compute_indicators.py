@@ -0,0 +1,62 @@
+"""
+Compute MarketIndicator rows (RSI, MACD, SMA, EMA, volume, sentiment) for the stock universe.
+
+    python manage.py compute_indicators                    # bars newer than the stored indicators
+    python manage.py compute_indicators --since 2026-10-01 # only bars on/after a date
+    python manage.py compute_indicators --full             # every bar of every stock
+    python manage.py compute_indicators --symbols AAPL MSFT
+
+After backfilling or correcting older bars, pass --since (or --full) so they are recomputed.
+"""
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from prediction.ai_signal import warm_signals
+from prediction.indicators import run_indicator_engine
+from prediction.models import Stock
+
+
+class Command(BaseCommand):
+    help = 'Compute technical indicators for all stocks with vectorized NumPy kernels'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only write indicators for bars dated on/after YYYY-MM-DD')
+        parser.add_argument('--full', action='store_true', help='Recompute every bar, not just new ones')
+        parser.add_argument('--symbols', nargs='+', help='Limit to these symbols')
+        parser.add_argument('--batch-stocks', type=int, default=500, help='Stocks computed per matrix')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per bulk_create')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since must be YYYY-MM-DD')
+            if options['full']:
+                raise CommandError('--since and --full are exclusive')
+
+        stock_ids = None
+        if options['symbols']:
+            symbols = [s.upper() for s in options['symbols']]
+            stock_ids = list(Stock.objects.filter(symbol__in=symbols).values_list('id', flat=True))
+            if not stock_ids:
+                raise CommandError('No matching stocks')
+
+        t0 = time.perf_counter()
+        written = run_indicator_engine(
+            stock_ids=stock_ids, since=since, full=options['full'],
+            batch_stocks=options['batch_stocks'], chunk_size=options['chunk_size'],
+        )
+        elapsed = time.perf_counter() - t0
+        rate = written / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} indicator rows in {elapsed:.2f}s ({rate:,.0f} rows/s)'
+        ))
+
+        # New snapshots invalidate the memoized AI signals; recompute them now rather than on first request
+        t0 = time.perf_counter()
+        warmed = warm_signals(stock_ids)
+        self.stdout.write(f'Warmed AI signals for {warmed} stocks in {time.perf_counter() - t0:.2f}s')
@@ -0,0 +1,49 @@
+"""
+Compute StockRiskMetrics (beta, VaR/CVaR, volatility, max drawdown) for the stock universe.
+
+Meant to run nightly after the day's bars are in (cron / scheduler):
+
+    python manage.py compute_risk                       # RISK_WINDOW bars vs RISK_BENCHMARK_SYMBOL
+    python manage.py compute_risk --window 63 --benchmark QQQ
+    python manage.py compute_risk --symbols AAPL MSFT
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from prediction.models import Stock
+from prediction.risk import MAX_WINDOW, MIN_OBSERVATIONS, benchmark_symbol, default_window, run_risk_batch
+
+
+class Command(BaseCommand):
+    help = 'Compute and store risk metrics for all stocks with vectorized NumPy reductions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window', type=int, help='Trailing daily bars (default: RISK_WINDOW)')
+        parser.add_argument('--benchmark', help='Benchmark symbol for beta (default: RISK_BENCHMARK_SYMBOL)')
+        parser.add_argument('--symbols', nargs='+', help='Limit to these symbols')
+        parser.add_argument('--batch-stocks', type=int, default=500, help='Stocks computed per matrix')
+
+    def handle(self, *args, **options):
+        window = options['window'] or default_window()
+        if not MIN_OBSERVATIONS < window <= MAX_WINDOW:
+            raise CommandError(f'--window must be between {MIN_OBSERVATIONS + 1} and {MAX_WINDOW}')
+        benchmark = (options['benchmark'] or benchmark_symbol()).upper()
+        if not Stock.objects.filter(symbol=benchmark).exists():
+            self.stdout.write(self.style.WARNING(f'Benchmark {benchmark} has no stock row; beta will be empty'))
+
+        stock_ids = None
+        if options['symbols']:
+            symbols = [s.upper() for s in options['symbols']]
+            stock_ids = list(Stock.objects.filter(symbol__in=symbols).values_list('id', flat=True))
+            if not stock_ids:
+                raise CommandError('No matching stocks')
+
+        t0 = time.perf_counter()
+        written = run_risk_batch(
+            window=window, benchmark=benchmark, stock_ids=stock_ids, batch_stocks=options['batch_stocks'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote risk metrics for {written} stocks ({window} bars vs {benchmark}) '
+            f'in {time.perf_counter() - t0:.2f}s'
+        ))
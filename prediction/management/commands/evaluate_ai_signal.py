@@ -0,0 +1,97 @@
+"""
+Replay the AI prediction signal point-in-time over all stored bars, in a process pool.
+
+Reports directional accuracy, calibration by confidence bucket and throughput,
+and stores the result on the AI model row for the current signal version (the
+accuracy the prediction stats show). Runs limited to --symbols are a subset,
+so they need --no-save. --verify checks sampled bars against the live
+build_signal; --max-drop fails the run if accuracy falls below the active
+evaluation at the same horizon, so signal changes can be regression-tested.
+
+    python manage.py evaluate_ai_signal
+    python manage.py evaluate_ai_signal --horizon 5 --symbols AAPL MSFT --no-save
+    python manage.py evaluate_ai_signal --verify 500 --max-drop 0.5
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from prediction import evaluation
+from prediction.ai_signal import SIGNAL_VERSION
+from prediction.models import Stock
+
+
+class Command(BaseCommand):
+    help = 'Backtest the AI signal over historical bars and store its accuracy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--symbols', nargs='+', help='Limit to these symbols (default: all)')
+        parser.add_argument('--horizon', type=int, default=1, help='Bars ahead each call is scored at')
+        parser.add_argument('--processes', type=int, default=None)
+        parser.add_argument('--verify', type=int, default=0, metavar='N',
+                            help='Check N sampled bars against build_signal')
+        parser.add_argument('--max-drop', type=float, default=None, metavar='POINTS',
+                            help='Fail if accuracy is more than POINTS below the active evaluation (same horizon)')
+        parser.add_argument('--no-save', action='store_true', help='Report only; leave the AI model row alone')
+
+    def handle(self, *args, **options):
+        if options['horizon'] < 1:
+            raise CommandError('--horizon must be at least 1')
+        if options['symbols'] and not options['no_save']:
+            raise CommandError('--symbols evaluates a subset of the universe; add --no-save')
+        stocks = Stock.objects.order_by('id')
+        if options['symbols']:
+            stocks = stocks.filter(symbol__in=[s.upper() for s in options['symbols']])
+        symbols = dict(stocks.values_list('id', 'symbol'))
+        stock_ids = list(symbols)
+        if not stock_ids:
+            raise CommandError('No matching stocks')
+
+        t0 = time.perf_counter()
+        dates, close, volume, sentiment = evaluation.load_inputs(stock_ids)
+        self.stdout.write(f'Loaded {close.shape[0]} symbols x {close.shape[1]} bars in {time.perf_counter() - t0:.2f}s')
+
+        if options['verify']:
+            checked, mismatches = evaluation.verify(
+                stock_ids, symbols, dates, close, volume, sentiment, options['verify'],
+            )
+            for line in mismatches[:10]:
+                self.stdout.write(f'  {line}')
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} of {checked} sampled bars differ from build_signal')
+            self.stdout.write(f'Verified {checked} sampled bars against build_signal')
+
+        result = evaluation.evaluate(close, volume, sentiment, options['horizon'], options['processes'])
+        self.stdout.write(
+            f"{result['signals']:,} signals over {result['symbols']} symbols in {result['seconds']:.2f}s "
+            f"({result['signals_per_second']:,} signals/s)"
+        )
+        self.stdout.write(
+            f"Directional accuracy at {result['horizon']} bar(s): {result['accuracy']:.2f}% of "
+            f"{result['scored']:,} calls ({result['coin_flips']:,} coin flips not scored; "
+            f"{result['up_call_rate']:.2f}% called up, {result['up_rate']:.2f}% went up)"
+        )
+        for bucket in result['calibration']:
+            self.stdout.write(
+                f"  confidence {bucket['bucket']}: {bucket['scored']:>9,} calls, "
+                f"mean {bucket['mean_confidence']:.1f}%, hit rate {bucket['accuracy']:.2f}%"
+            )
+
+        baseline = evaluation.active_model()
+        if baseline is not None:
+            change = result['accuracy'] - baseline.accuracy_percentage
+            same_horizon = baseline.evaluation.get('horizon') == options['horizon']
+            self.stdout.write(
+                f'Active evaluation {baseline} ({baseline.evaluation.get("horizon", "?")} bar horizon): '
+                f'{baseline.accuracy_percentage:.2f}% ({change:+.2f} points)'
+            )
+            if options['max_drop'] is not None and not same_horizon:
+                self.stdout.write(self.style.WARNING('Horizons differ; --max-drop not applied'))
+            elif options['max_drop'] is not None and change < -options['max_drop']:
+                raise CommandError(
+                    f'Accuracy fell {-change:.2f} points below {baseline} (allowed {options["max_drop"]:.2f})'
+                )
+
+        if not options['no_save']:
+            model = evaluation.save(result, SIGNAL_VERSION)
+            self.stdout.write(self.style.SUCCESS(f'Saved evaluation to {model}'))
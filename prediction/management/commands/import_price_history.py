@@ -0,0 +1,63 @@
+"""
+Stream OHLCV bars from CSV or Parquet files into StockPriceHistory.
+
+Files need date, open, high, low, close and volume columns, plus symbol (or
+ticker) unless --symbol is given. Rows are validated and upserted on
+(stock, date) in chunks; unknown symbols are created as stocks.
+
+    python manage.py import_price_history bars.csv
+    python manage.py import_price_history AAPL.csv --symbol AAPL --date-format %m/%d/%Y
+    python manage.py import_price_history history/*.parquet --chunk-size 50000 --skip-existing
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from prediction.ai_signal import warm_signals
+from prediction.importer import ImportFileError, PriceImporter, read_chunks
+
+
+class Command(BaseCommand):
+    help = 'Bulk import historical OHLCV bars from CSV or Parquet files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='CSV or Parquet (.parquet) files')
+        parser.add_argument('--symbol', help='Symbol for files without a symbol column')
+        parser.add_argument('--date-format', default='%Y-%m-%d', help='strptime format of the date column')
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Rows per bulk upsert')
+        parser.add_argument('--skip-existing', action='store_true', help='Keep existing bars instead of overwriting')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; write nothing')
+
+    def handle(self, *args, **options):
+        importer = PriceImporter(
+            default_symbol=options['symbol'], date_format=options['date_format'],
+            skip_existing=options['skip_existing'], dry_run=options['dry_run'],
+        )
+        t0 = time.perf_counter()
+        for path in options['paths']:
+            try:
+                for chunk in read_chunks(path, options['chunk_size'], options['symbol']):
+                    importer.import_chunk(chunk)
+                    if options['verbosity'] > 1:
+                        elapsed = time.perf_counter() - t0
+                        self.stdout.write(
+                            f'{path}: {importer.rows_read:,} rows read '
+                            f'({importer.rows_read / elapsed:,.0f} rows/s)'
+                        )
+            except (OSError, ImportFileError) as e:
+                raise CommandError(f'{path}: {e}')
+
+        elapsed = time.perf_counter() - t0
+        for row_number, reason in importer.errors:
+            self.stderr.write(f'row {row_number}: {reason}')
+        verb = 'Validated' if options['dry_run'] else 'Upserted'
+        count = importer.rows_read - importer.rows_invalid if options['dry_run'] else importer.rows_written
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {count:,} bars from {importer.rows_read:,} rows in {elapsed:.2f}s '
+            f'({importer.rows_read / elapsed if elapsed else 0:,.0f} rows/s); '
+            f'{importer.rows_invalid:,} invalid, {importer.stocks_created} stocks created'
+        ))
+        if importer.rows_written:
+            t0 = time.perf_counter()
+            warmed = warm_signals(list(importer.stock_ids.values()))
+            self.stdout.write(f'Warmed AI signals for {warmed} stocks in {time.perf_counter() - t0:.2f}s')
@@ -0,0 +1,53 @@
+"""
+Quote ingest worker: write provider quotes to Stock rows and 1/5-minute bars, and roll
+daily bars at the close.
+
+    python manage.py ingest_quotes --loop --interval 1        # QUOTE_PROVIDER
+    python manage.py ingest_quotes --replay ticks.csv --step 60 --loop --interval 0
+
+Also keeps the quote cache current, so it replaces refresh_quotes when a real feed is configured.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from prediction.ingest import QuoteIngestor
+from prediction.quotes import ReplayQuoteProvider, StockTableQuoteProvider, cache_is_shared, get_provider
+
+
+class Command(BaseCommand):
+    help = 'Coalesce provider ticks into Stock prices (one bulk_update per cycle), intraday and daily bars'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--replay', help='Replay ticks from this CSV (timestamp,symbol,price[,volume])')
+        parser.add_argument('--step', type=float, default=1.0, help='Seconds of feed time replayed per cycle')
+        parser.add_argument('--loop', action='store_true', help='Keep running, one cycle every --interval seconds')
+        parser.add_argument('--interval', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        if not cache_is_shared():
+            raise CommandError('The quote table needs a cache shared with the web processes (set REDIS_URL)')
+        if options['replay']:
+            # A replay runs once through the file; --loop keeps cycling until it is exhausted
+            provider = ReplayQuoteProvider(options['replay'], step=options['step'])
+        else:
+            provider = get_provider()
+            if isinstance(provider, StockTableQuoteProvider):
+                raise CommandError('QUOTE_PROVIDER reads Stock rows; ingesting it would write them back')
+        ingestor = QuoteIngestor(provider)
+        while True:
+            t0 = time.perf_counter()
+            ticks, stocks, bars = ingestor.cycle()
+            if ticks or stocks or bars:
+                self.stdout.write(
+                    f'{ticks} ticks -> {stocks} stocks, {bars} daily bars '
+                    f'in {(time.perf_counter() - t0) * 1000:.1f} ms'
+                )
+            if not options['loop'] or getattr(provider, 'exhausted', False):
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{ingestor.cycles} cycles: {ingestor.ticks} ticks, {ingestor.stocks_written} stock writes, '
+            f'{ingestor.intraday_written} intraday bar writes, {ingestor.bars_written} daily bars, '
+            f'{ingestor.indicators_written} indicator rows'
+        ))
@@ -0,0 +1,24 @@
+"""
+Rebuild the prediction leaderboard from resolved predictions.
+
+The resolver keeps the leaderboard current and migration 0005 backfills it;
+run this after editing or deleting predictions by hand.
+
+    python manage.py rebuild_leaderboard
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from prediction.leaderboard import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute every leaderboard entry from resolved predictions'
+
+    def handle(self, *args, **options):
+        t0 = time.perf_counter()
+        written = rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} leaderboard entries in {time.perf_counter() - t0:.2f}s'
+        ))
@@ -0,0 +1,35 @@
+"""
+Rebuild the per-user prediction stats rows from the prediction table.
+
+Creating and resolving predictions keeps the rows current and migration 0006
+backfills them; run this after editing or deleting predictions by hand.
+
+    python manage.py rebuild_prediction_stats
+    python manage.py rebuild_prediction_stats --users alice bob
+"""
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from prediction.user_stats import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-user prediction stats (totals, accuracy, streaks, breakdowns)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', nargs='+', help='Only rebuild these usernames')
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['users']:
+            user_ids = list(User.objects.filter(username__in=options['users']).values_list('id', flat=True))
+            if not user_ids:
+                raise CommandError('No matching users')
+
+        t0 = time.perf_counter()
+        written = rebuild(user_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} prediction stats rows in {time.perf_counter() - t0:.2f}s'
+        ))
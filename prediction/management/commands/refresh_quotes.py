@@ -0,0 +1,40 @@
+"""
+Quote worker: pull ticks from the quote provider into the shared quote table.
+
+    python manage.py refresh_quotes                          # one pass (QUOTE_PROVIDER)
+    python manage.py refresh_quotes --loop --interval 1
+    python manage.py refresh_quotes --replay ticks.csv --step 5 --loop --interval 0.5
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from prediction.quotes import ReplayQuoteProvider, cache_is_shared, get_provider, publish
+
+
+class Command(BaseCommand):
+    help = 'Publish provider quote ticks to the quote cache read by the quotes endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--replay', help='Replay ticks from this CSV (timestamp,symbol,price[,volume])')
+        parser.add_argument('--step', type=float, default=1.0, help='Seconds of feed time replayed per pass')
+        parser.add_argument('--loop', action='store_true', help='Keep running, one pass every --interval seconds')
+        parser.add_argument('--interval', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        if not cache_is_shared():
+            raise CommandError('The quote table needs a cache shared with the web processes (set REDIS_URL)')
+        if options['replay']:
+            provider = ReplayQuoteProvider(options['replay'], step=options['step'], loop=options['loop'])
+        else:
+            provider = get_provider()
+        while True:
+            t0 = time.perf_counter()
+            ticks = provider.fetch()
+            changed = publish(ticks)
+            self.stdout.write(
+                f'{len(ticks)} ticks, {len(changed)} quotes updated in {(time.perf_counter() - t0) * 1000:.1f} ms'
+            )
+            if not options['loop'] or getattr(provider, 'exhausted', False):
+                break
+            time.sleep(options['interval'])
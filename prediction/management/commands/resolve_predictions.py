@@ -0,0 +1,29 @@
+"""
+Resolve due predictions in bulk.
+
+    python manage.py resolve_predictions                 # one pass (cron)
+    python manage.py resolve_predictions --loop --interval 300
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from prediction.resolver import resolve_due_predictions
+
+
+class Command(BaseCommand):
+    help = 'Resolve predictions whose predicted_for_date has passed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--loop', action='store_true', help='Keep running, one pass every --interval seconds')
+        parser.add_argument('--interval', type=int, default=300)
+
+    def handle(self, *args, **options):
+        while True:
+            t0 = time.perf_counter()
+            resolved = resolve_due_predictions(batch_size=options['batch_size'])
+            self.stdout.write(f'Resolved {resolved} predictions in {time.perf_counter() - t0:.2f}s')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,44 @@
+"""
+Run queued backtest jobs and prune stale results. Jobs left running longer than
+BACKTEST_JOB_TIMEOUT seconds (their worker died) are queued again first.
+
+    python manage.py run_backtest_jobs --loop
+    python manage.py run_backtest_jobs --prune-days 7
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from prediction import backtest_jobs
+from prediction.models import BacktestResult
+
+
+class Command(BaseCommand):
+    help = 'Execute queued BacktestResult jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling for queued jobs')
+        parser.add_argument('--interval', type=float, default=2.0)
+        parser.add_argument('--prune-days', type=int, default=None,
+                            help='Delete results older than this many days, then exit')
+
+    def handle(self, *args, **options):
+        if options['prune_days'] is not None:
+            cutoff = timezone.now() - timedelta(days=options['prune_days'])
+            deleted, _ = BacktestResult.objects.filter(created_at__lt=cutoff).exclude(status='running').delete()
+            self.stdout.write(f'Pruned {deleted} backtest results')
+            return
+        while True:
+            requeued = backtest_jobs.requeue_stale()
+            if requeued:
+                self.stdout.write(f'Requeued {requeued} stale backtest jobs')
+            ran = 0
+            for job_id in BacktestResult.objects.filter(status='queued').order_by('created_at').values_list('id', flat=True):
+                ran += backtest_jobs.execute(job_id)
+            if ran:
+                self.stdout.write(f'Ran {ran} backtest jobs')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
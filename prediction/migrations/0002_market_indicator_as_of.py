@@ -0,0 +1,26 @@
+# Generated by Django 4.2.28 on 2026-10-17 07:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prediction', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='marketindicator',
+            options={'ordering': [models.OrderBy(models.F('as_of'), descending=True, nulls_last=True), '-calculated_at'], 'verbose_name': 'Market Indicator', 'verbose_name_plural': 'Market Indicators'},
+        ),
+        migrations.AddField(
+            model_name='marketindicator',
+            name='as_of',
+            field=models.DateField(blank=True, help_text='Price bar the value was computed for', null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='marketindicator',
+            constraint=models.UniqueConstraint(fields=('stock', 'indicator_type', 'period', 'as_of'), name='uniq_indicator_per_bar'),
+        ),
+    ]
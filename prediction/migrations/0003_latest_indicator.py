@@ -0,0 +1,56 @@
+# Generated by Django 4.2.28 on 2026-10-17 07:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_latest_indicators(apps, schema_editor):
+    MarketIndicator = apps.get_model('prediction', 'MarketIndicator')
+    LatestIndicator = apps.get_model('prediction', 'LatestIndicator')
+    seen = set()
+    snapshot = []
+    rows = MarketIndicator.objects.order_by(
+        'stock_id', 'indicator_type', models.F('as_of').desc(nulls_last=True), '-calculated_at'
+    ).values_list('stock_id', 'indicator_type', 'value', 'period', 'as_of', 'calculated_at')
+    for stock_id, indicator_type, value, period, as_of, calculated_at in rows.iterator():
+        if (stock_id, indicator_type) in seen:
+            continue
+        seen.add((stock_id, indicator_type))
+        snapshot.append(LatestIndicator(
+            stock_id=stock_id, indicator_type=indicator_type, value=value,
+            period=period, as_of=as_of, calculated_at=calculated_at,
+        ))
+    LatestIndicator.objects.bulk_create(snapshot, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prediction', '0002_market_indicator_as_of'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestIndicator',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('indicator_type', models.CharField(choices=[('rsi', 'RSI'), ('macd', 'MACD'), ('sma', 'Simple Moving Average'), ('ema', 'Exponential Moving Average'), ('volume', 'Volume'), ('sentiment', 'Sentiment')], max_length=20)),
+                ('value', models.DecimalField(decimal_places=4, max_digits=15)),
+                ('period', models.PositiveIntegerField(default=14)),
+                ('as_of', models.DateField(blank=True, null=True)),
+                ('calculated_at', models.DateTimeField()),
+                ('stock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='latest_indicators', to='prediction.stock')),
+            ],
+            options={
+                'verbose_name': 'Latest Indicator',
+                'verbose_name_plural': 'Latest Indicators',
+                'db_table': 'prediction_latest_indicators',
+                'ordering': ['indicator_type'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='latestindicator',
+            constraint=models.UniqueConstraint(fields=('stock', 'indicator_type'), name='uniq_latest_indicator'),
+        ),
+        migrations.RunPython(backfill_latest_indicators, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.28 on 2026-10-17 07:08
+
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_leaderboard(apps, schema_editor):
+    Prediction = apps.get_model('prediction', 'Prediction')
+    LeaderboardEntry = apps.get_model('prediction', 'LeaderboardEntry')
+    counts = defaultdict(lambda: [0, 0])
+    rows = Prediction.objects.filter(is_correct__isnull=False).values_list(
+        'user_id', 'predicted_for_date', 'is_correct'
+    )
+    for user_id, day, is_correct in rows.iterator():
+        for window, start in (
+            ('daily', day),
+            ('weekly', day - timedelta(days=day.weekday())),
+            ('monthly', day.replace(day=1)),
+            ('all', date(1970, 1, 1)),
+        ):
+            c = counts[(user_id, window, start)]
+            c[0] += 1
+            c[1] += 1 if is_correct else 0
+    LeaderboardEntry.objects.bulk_create([
+        LeaderboardEntry(
+            user_id=user_id, window=window, period_start=start, total=total, correct=correct,
+            accuracy=round(correct / total * 100, 1),
+        )
+        for (user_id, window, start), (total, correct) in counts.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('prediction', '0004_backtest_result'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly'), ('all', 'All Time')], max_length=10)),
+                ('period_start', models.DateField(help_text='First day of the period (1970-01-01 for all-time)')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('accuracy', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Leaderboard Entry',
+                'verbose_name_plural': 'Leaderboard Entries',
+                'db_table': 'prediction_leaderboard',
+                'ordering': ['-accuracy', '-correct'],
+                'indexes': [models.Index(models.F('window'), models.F('period_start'), models.OrderBy(models.F('accuracy'), descending=True), models.OrderBy(models.F('correct'), descending=True), name='leaderboard_top_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('user', 'window', 'period_start'), name='uniq_leaderboard_entry'),
+        ),
+        migrations.RunPython(backfill_leaderboard, migrations.RunPython.noop),
+    ]
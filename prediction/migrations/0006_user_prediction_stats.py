@@ -0,0 +1,74 @@
+# Generated by Django 4.2.28 on 2026-10-17 07:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_user_stats(apps, schema_editor):
+    Prediction = apps.get_model('prediction', 'Prediction')
+    UserPredictionStats = apps.get_model('prediction', 'UserPredictionStats')
+    stats = {}
+    rows = Prediction.objects.order_by('resolved_at', 'id').values_list(
+        'user_id', 'stock_id', 'created_at', 'predicted_for_date', 'is_correct'
+    )
+    for user_id, stock_id, created_at, target, is_correct in rows.iterator():
+        s = stats.get(user_id)
+        if s is None:
+            s = stats[user_id] = UserPredictionStats(user_id=user_id, by_horizon={}, by_stock={})
+        buckets = [
+            s.by_horizon.setdefault(str((target - created_at.date()).days), {'total': 0, 'resolved': 0, 'correct': 0}),
+            s.by_stock.setdefault(str(stock_id), {'total': 0, 'resolved': 0, 'correct': 0}),
+        ]
+        s.total += 1
+        for b in buckets:
+            b['total'] += 1
+        if is_correct is None:
+            continue
+        s.resolved += 1
+        for b in buckets:
+            b['resolved'] += 1
+        if is_correct:
+            s.correct += 1
+            for b in buckets:
+                b['correct'] += 1
+            s.current_streak += 1
+            s.best_streak = max(s.best_streak, s.current_streak)
+        else:
+            s.current_streak = 0
+    for s in stats.values():
+        s.accuracy = round(s.correct / s.resolved * 100, 2) if s.resolved else 0
+    UserPredictionStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('prediction', '0005_leaderboard_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserPredictionStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('resolved', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('accuracy', models.FloatField(default=0, help_text='Correct / resolved, in percent')),
+                ('current_streak', models.PositiveIntegerField(default=0, help_text='Consecutive correct resolutions')),
+                ('best_streak', models.PositiveIntegerField(default=0)),
+                ('by_horizon', models.JSONField(blank=True, default=dict, help_text='{horizon days: {total, resolved, correct}}')),
+                ('by_stock', models.JSONField(blank=True, default=dict, help_text='{stock id: {total, resolved, correct}}')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='prediction_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Prediction Stats',
+                'verbose_name_plural': 'User Prediction Stats',
+                'db_table': 'prediction_user_stats',
+            },
+        ),
+        migrations.RunPython(backfill_user_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.28 on 2026-10-17 07:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prediction', '0006_user_prediction_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockRiskMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.PositiveSmallIntegerField(help_text='Trailing daily bars the metrics cover')),
+                ('benchmark', models.CharField(blank=True, help_text='Symbol beta is measured against', max_length=10)),
+                ('as_of', models.DateField(blank=True, help_text='Latest bar included', null=True)),
+                ('observations', models.PositiveIntegerField(default=0, help_text='Daily returns used')),
+                ('beta', models.FloatField(blank=True, null=True)),
+                ('volatility', models.FloatField(blank=True, null=True)),
+                ('rolling_volatility', models.FloatField(blank=True, null=True)),
+                ('var_95', models.FloatField(blank=True, null=True)),
+                ('var_99', models.FloatField(blank=True, null=True)),
+                ('cvar_95', models.FloatField(blank=True, null=True)),
+                ('cvar_99', models.FloatField(blank=True, null=True)),
+                ('parametric_var_95', models.FloatField(blank=True, null=True)),
+                ('parametric_var_99', models.FloatField(blank=True, null=True)),
+                ('parametric_cvar_95', models.FloatField(blank=True, null=True)),
+                ('parametric_cvar_99', models.FloatField(blank=True, null=True)),
+                ('max_drawdown', models.FloatField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('stock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='risk_metrics', to='prediction.stock')),
+            ],
+            options={
+                'verbose_name': 'Stock Risk Metrics',
+                'verbose_name_plural': 'Stock Risk Metrics',
+                'db_table': 'prediction_stock_risk',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='stockriskmetrics',
+            constraint=models.UniqueConstraint(fields=('stock', 'window'), name='uniq_stock_risk_window'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.28 on 2026-10-17 07:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prediction', '0007_stock_risk_metrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IntradayBar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('interval', models.PositiveSmallIntegerField(choices=[(1, '1 minute'), (5, '5 minutes')], help_text='Bar length in minutes')),
+                ('session', models.DateField(help_text='Trading day (MARKET_TIMEZONE) the bar belongs to')),
+                ('start', models.DateTimeField(help_text='Bar open time')),
+                ('open_price', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('high_price', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('low_price', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('close_price', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('volume', models.BigIntegerField(default=0)),
+                ('stock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='intraday_bars', to='prediction.stock')),
+            ],
+            options={
+                'verbose_name': 'Intraday Bar',
+                'verbose_name_plural': 'Intraday Bars',
+                'db_table': 'prediction_intraday_bars',
+                'ordering': ['start'],
+                'indexes': [models.Index(fields=['session'], name='intraday_session_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='intradaybar',
+            constraint=models.UniqueConstraint(fields=('stock', 'interval', 'session', 'start'), name='uniq_intraday_bar'),
+        ),
+    ]
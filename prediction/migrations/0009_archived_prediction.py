@@ -0,0 +1,42 @@
+# Generated by Django 4.2.28 on 2026-10-17 07:43
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('prediction', '0008_intraday_bar'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPrediction',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('user_prediction', models.CharField(choices=[('up', 'Up'), ('down', 'Down')], max_length=4)),
+                ('ai_prediction', models.CharField(choices=[('up', 'Up'), ('down', 'Down')], max_length=4)),
+                ('ai_confidence', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('ai_explanation', models.TextField(blank=True)),
+                ('actual_result', models.CharField(blank=True, choices=[('up', 'Up'), ('down', 'Down')], max_length=4, null=True)),
+                ('is_correct', models.BooleanField(blank=True, null=True)),
+                ('price_at_prediction', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('predicted_for_date', models.DateField()),
+                ('created_at', models.DateTimeField()),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('stock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_predictions', to='prediction.stock')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_predictions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Prediction',
+                'verbose_name_plural': 'Archived Predictions',
+                'db_table': 'prediction_predictions_archive',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='pred_archive_user_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.28 on 2026-10-17 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prediction', '0009_archived_prediction'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aipredictionmodel',
+            name='evaluated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='aipredictionmodel',
+            name='evaluation',
+            field=models.JSONField(blank=True, default=dict, help_text='Latest offline evaluation report (prediction.evaluation)'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prediction', '0010_ai_model_evaluation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backtestresult',
+            name='claim_token',
+            field=models.CharField(blank=True, help_text='Set by the worker running the job; only it may finish the job', max_length=32),
+        ),
+    ]
@@ -70,17 +70,68 @@ class Prediction(models.Model):
         return f"{self.user.username} - {self.stock.symbol} - {self.user_prediction}"
     
     def resolve(self, actual_price):
-        """Resolve prediction with actual price"""
-        self.actual_result = 'up' if actual_price >= self.price_at_prediction else 'down'
-        self.is_correct = self.user_prediction == self.actual_result
-        self.resolved_at = timezone.now()
-        self.save(update_fields=['actual_result', 'is_correct', 'resolved_at'])
+        """
+        Resolve prediction with actual price. Only an unresolved prediction is
+        changed (checked by the UPDATE itself, so a concurrent resolver run
+        cannot count it twice); returns False and reloads the stored result when
+        it was already resolved, leaving the profile, leaderboard and stats alone.
+        """
+        from django.db import transaction
+        from django.db.models import F
+        from users.models import UserProfile
+        from . import user_stats
+        from .leaderboard import record_resolutions
 
-        # Update user profile: only correct_predictions (total already incremented at create)
-        profile = getattr(self.user, 'profile', None)
-        if profile is not None and self.is_correct:
-            profile.correct_predictions = (profile.correct_predictions or 0) + 1
-            profile.save(update_fields=['correct_predictions'])
+        actual_result = 'up' if actual_price >= self.price_at_prediction else 'down'
+        is_correct = self.user_prediction == actual_result
+        resolved_at = timezone.now()
+        with transaction.atomic():
+            updated = Prediction.objects.filter(pk=self.pk, actual_result__isnull=True).update(
+                actual_result=actual_result, is_correct=is_correct, resolved_at=resolved_at,
+            )
+            if not updated:
+                self.refresh_from_db(fields=['actual_result', 'is_correct', 'resolved_at'])
+                return False
+            self.actual_result, self.is_correct, self.resolved_at = actual_result, is_correct, resolved_at
+            record_resolutions([self])
+            user_stats.record_resolutions([self])
+
+            # Update user profile: only correct_predictions (total already incremented at create)
+            if is_correct:
+                UserProfile.objects.filter(user_id=self.user_id).update(
+                    correct_predictions=F('correct_predictions') + 1
+                )
+        return True
+
+
+class ArchivedPrediction(models.Model):
+    """Resolved prediction moved out of the active table (see prediction.archive); keeps its original id"""
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_predictions')
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE, related_name='archived_predictions')
+    user_prediction = models.CharField(max_length=4, choices=Prediction.DIRECTION_CHOICES)
+    ai_prediction = models.CharField(max_length=4, choices=Prediction.DIRECTION_CHOICES)
+    ai_confidence = models.DecimalField(max_digits=5, decimal_places=2)
+    ai_explanation = models.TextField(blank=True)
+    actual_result = models.CharField(max_length=4, choices=Prediction.DIRECTION_CHOICES, blank=True, null=True)
+    is_correct = models.BooleanField(null=True, blank=True)
+    price_at_prediction = models.DecimalField(max_digits=15, decimal_places=2)
+    predicted_for_date = models.DateField()
+    created_at = models.DateTimeField()
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'prediction_predictions_archive'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='pred_archive_user_idx'),
+        ]
+        verbose_name = 'Archived Prediction'
+        verbose_name_plural = 'Archived Predictions'
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.stock.symbol} - {self.user_prediction} (archived)"
 
 
 class StockPriceHistory(models.Model):
@@ -104,6 +155,40 @@ class StockPriceHistory(models.Model):
         return f"{self.stock.symbol} - {self.date}"
 
 
+class IntradayBar(models.Model):
+    """1- or 5-minute OHLCV bar built from quote ticks; compacted into daily bars after a retention period"""
+    INTERVAL_CHOICES = [
+        (1, '1 minute'),
+        (5, '5 minutes'),
+    ]
+    
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE, related_name='intraday_bars')
+    interval = models.PositiveSmallIntegerField(choices=INTERVAL_CHOICES, help_text='Bar length in minutes')
+    session = models.DateField(help_text='Trading day (MARKET_TIMEZONE) the bar belongs to')
+    start = models.DateTimeField(help_text='Bar open time')
+    open_price = models.DecimalField(max_digits=15, decimal_places=2)
+    high_price = models.DecimalField(max_digits=15, decimal_places=2)
+    low_price = models.DecimalField(max_digits=15, decimal_places=2)
+    close_price = models.DecimalField(max_digits=15, decimal_places=2)
+    volume = models.BigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'prediction_intraday_bars'
+        ordering = ['start']
+        constraints = [
+            # Leading (stock, interval, session) also serves chart reads of a stock's latest sessions
+            models.UniqueConstraint(fields=['stock', 'interval', 'session', 'start'], name='uniq_intraday_bar'),
+        ]
+        indexes = [
+            models.Index(fields=['session'], name='intraday_session_idx'),
+        ]
+        verbose_name = 'Intraday Bar'
+        verbose_name_plural = 'Intraday Bars'
+    
+    def __str__(self):
+        return f"{self.stock.symbol} {self.interval}m - {self.start}"
+
+
 class AIPredictionModel(models.Model):
     """AI prediction model settings and performance"""
     name = models.CharField(max_length=100)
@@ -112,6 +197,8 @@ class AIPredictionModel(models.Model):
     accuracy_score = models.DecimalField(max_digits=5, decimal_places=2, default=0)
     total_predictions = models.IntegerField(default=0)
     correct_predictions = models.IntegerField(default=0)
+    evaluation = models.JSONField(default=dict, blank=True, help_text='Latest offline evaluation report (prediction.evaluation)')
+    evaluated_at = models.DateTimeField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -146,13 +233,167 @@ class MarketIndicator(models.Model):
     indicator_type = models.CharField(max_length=20, choices=INDICATOR_TYPES)
     value = models.DecimalField(max_digits=15, decimal_places=4)
     period = models.PositiveIntegerField(default=14, help_text='Period for the indicator')
+    as_of = models.DateField(null=True, blank=True, help_text='Price bar the value was computed for')
     calculated_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         db_table = 'prediction_market_indicators'
-        ordering = ['-calculated_at']
+        ordering = [models.F('as_of').desc(nulls_last=True), '-calculated_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['stock', 'indicator_type', 'period', 'as_of'],
+                name='uniq_indicator_per_bar',
+            ),
+        ]
         verbose_name = 'Market Indicator'
         verbose_name_plural = 'Market Indicators'
     
     def __str__(self):
         return f"{self.stock.symbol} - {self.indicator_type}"
+
+
+class LatestIndicator(models.Model):
+    """Newest MarketIndicator value per (stock, indicator_type), kept current by the writers"""
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE, related_name='latest_indicators')
+    indicator_type = models.CharField(max_length=20, choices=MarketIndicator.INDICATOR_TYPES)
+    value = models.DecimalField(max_digits=15, decimal_places=4)
+    period = models.PositiveIntegerField(default=14)
+    as_of = models.DateField(null=True, blank=True)
+    calculated_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'prediction_latest_indicators'
+        ordering = ['indicator_type']
+        constraints = [
+            models.UniqueConstraint(fields=['stock', 'indicator_type'], name='uniq_latest_indicator'),
+        ]
+        verbose_name = 'Latest Indicator'
+        verbose_name_plural = 'Latest Indicators'
+    
+    def __str__(self):
+        return f"{self.stock.symbol} - {self.indicator_type} (latest)"
+
+
+class BacktestResult(models.Model):
+    """Backtest job and its cached result, keyed by a hash of the request and price-data versions"""
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    cache_key = models.CharField(max_length=64, unique=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued', db_index=True)
+    request = models.JSONField(default=dict)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='backtests')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    claim_token = models.CharField(max_length=32, blank=True, help_text='Set by the worker running the job; only it may finish the job')
+    
+    class Meta:
+        db_table = 'prediction_backtest_results'
+        ordering = ['-created_at']
+        verbose_name = 'Backtest Result'
+        verbose_name_plural = 'Backtest Results'
+    
+    def __str__(self):
+        return f"Backtest {self.id} ({self.request.get('strategy')}, {self.status})"
+
+
+class LeaderboardEntry(models.Model):
+    """Per-user resolved/correct prediction counts for one leaderboard window and period"""
+    
+    WINDOW_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+        ('all', 'All Time'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    window = models.CharField(max_length=10, choices=WINDOW_CHOICES)
+    period_start = models.DateField(help_text='First day of the period (1970-01-01 for all-time)')
+    total = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    accuracy = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'prediction_leaderboard'
+        ordering = ['-accuracy', '-correct']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'window', 'period_start'], name='uniq_leaderboard_entry'),
+        ]
+        indexes = [
+            models.Index(
+                'window', 'period_start', models.F('accuracy').desc(), models.F('correct').desc(),
+                name='leaderboard_top_idx',
+            ),
+        ]
+        verbose_name = 'Leaderboard Entry'
+        verbose_name_plural = 'Leaderboard Entries'
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.window} {self.period_start}: {self.accuracy}%"
+
+
+class UserPredictionStats(models.Model):
+    """Per-user prediction counters, maintained when predictions are made and resolved"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='prediction_stats')
+    total = models.PositiveIntegerField(default=0)
+    resolved = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    accuracy = models.FloatField(default=0, help_text='Correct / resolved, in percent')
+    current_streak = models.PositiveIntegerField(default=0, help_text='Consecutive correct resolutions')
+    best_streak = models.PositiveIntegerField(default=0)
+    by_horizon = models.JSONField(default=dict, blank=True, help_text='{horizon days: {total, resolved, correct}}')
+    by_stock = models.JSONField(default=dict, blank=True, help_text='{stock id: {total, resolved, correct}}')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'prediction_user_stats'
+        verbose_name = 'User Prediction Stats'
+        verbose_name_plural = 'User Prediction Stats'
+    
+    def __str__(self):
+        return f"{self.user.username}: {self.correct}/{self.resolved} correct"
+
+
+class StockRiskMetrics(models.Model):
+    """Risk statistics of a stock's daily returns over a trailing window, computed in a nightly batch"""
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE, related_name='risk_metrics')
+    window = models.PositiveSmallIntegerField(help_text='Trailing daily bars the metrics cover')
+    benchmark = models.CharField(max_length=10, blank=True, help_text='Symbol beta is measured against')
+    as_of = models.DateField(null=True, blank=True, help_text='Latest bar included')
+    observations = models.PositiveIntegerField(default=0, help_text='Daily returns used')
+    beta = models.FloatField(null=True, blank=True)
+    # Percent; volatility annualized, rolling volatility daily over the last 21 bars
+    volatility = models.FloatField(null=True, blank=True)
+    rolling_volatility = models.FloatField(null=True, blank=True)
+    # One-day losses in percent of position value (positive = loss)
+    var_95 = models.FloatField(null=True, blank=True)
+    var_99 = models.FloatField(null=True, blank=True)
+    cvar_95 = models.FloatField(null=True, blank=True)
+    cvar_99 = models.FloatField(null=True, blank=True)
+    parametric_var_95 = models.FloatField(null=True, blank=True)
+    parametric_var_99 = models.FloatField(null=True, blank=True)
+    parametric_cvar_95 = models.FloatField(null=True, blank=True)
+    parametric_cvar_99 = models.FloatField(null=True, blank=True)
+    max_drawdown = models.FloatField(null=True, blank=True)
+    computed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'prediction_stock_risk'
+        verbose_name = 'Stock Risk Metrics'
+        verbose_name_plural = 'Stock Risk Metrics'
+        constraints = [
+            models.UniqueConstraint(fields=['stock', 'window'], name='uniq_stock_risk_window'),
+        ]
+    
+    def __str__(self):
+        return f"{self.stock.symbol} risk ({self.window} bars)"
@@ -0,0 +1,182 @@
+"""
+Vectorized candlestick pattern detection for FinanceAI
+
+Every pattern is a NumPy boolean mask over a stock's OHLC arrays, so a
+decade of bars is scanned in a few array operations. Daily-bar hits are kept
+in the Django cache per stock with the price-store version they were computed
+for; when new bars land only the tail of the series is scanned again. The
+universe scan ("which stocks printed pattern X on their latest bar") reads
+the same cache entries.
+"""
+import numpy as np
+from django.core.cache import cache
+
+from .price_store import LOAD_CHUNK, price_store
+
+
+CACHE_KEY = 'prediction:patterns:{stock_id}'
+
+SINGLE_BAR = ['hammer', 'doji', 'shooting_star']
+MULTI_BAR = [
+    'bullish_engulfing', 'bearish_engulfing', 'morning_star', 'evening_star',
+    'three_white_soldiers', 'three_black_crows',
+]
+PATTERNS = SINGLE_BAR + MULTI_BAR
+# Bars before the newest one that a pattern can look at (three-bar patterns)
+LOOKBACK = 2
+
+
+def _prev(x, k):
+    """x shifted k bars later (out[i] = x[i - k]); the first k entries are NaN"""
+    out = np.full(x.shape, np.nan)
+    if k < len(x):
+        out[k:] = x[:len(x) - k]
+    return out
+
+
+def detect(open_, high, low, close):
+    """{pattern: boolean mask over the bars} for every pattern in PATTERNS"""
+    o, h, l, c = (np.asarray(a, dtype=np.float64) for a in (open_, high, low, close))
+    body = np.abs(c - o)
+    full_range = np.where(h > l, h - l, 0.0001)
+    lower_wick = np.minimum(o, c) - l
+    upper_wick = h - np.maximum(o, c)
+    small = body / full_range < 0.35
+    bull = c > o
+    bear = c < o
+    out = {}
+
+    # Single bar; at most one per bar, in the order the detail view always used
+    out['hammer'] = small & (lower_wick > 2 * body) & (upper_wick < body)
+    out['doji'] = (body / full_range < 0.1) & ~out['hammer']
+    out['shooting_star'] = small & (upper_wick > 2 * body) & (lower_wick < body) & ~out['hammer'] & ~out['doji']
+
+    with np.errstate(invalid='ignore'):
+        o1, c1, body1 = _prev(o, 1), _prev(c, 1), _prev(body, 1)
+        o2, c2, body2 = _prev(o, 2), _prev(c, 2), _prev(body, 2)
+        range2 = _prev(full_range, 2)
+        bull1, bear1 = c1 > o1, c1 < o1
+        bull2, bear2 = c2 > o2, c2 < o2
+
+        # Today's body swallows yesterday's opposite-coloured body
+        out['bullish_engulfing'] = bear1 & bull & (o <= c1) & (c >= o1) & (body > body1)
+        out['bearish_engulfing'] = bull1 & bear & (o >= c1) & (c <= o1) & (body > body1)
+
+        # Long candle, small-bodied star, then a candle closing past the first one's midpoint
+        long2 = body2 >= 0.5 * range2
+        star1 = body1 <= 0.3 * body2
+        mid2 = (o2 + c2) / 2
+        out['morning_star'] = bear2 & long2 & star1 & (np.maximum(o1, c1) <= c2) & bull & (c > mid2)
+        out['evening_star'] = bull2 & long2 & star1 & (np.minimum(o1, c1) >= c2) & bear & (c < mid2)
+
+        # Three long candles of one colour, each opening inside the previous body
+        strong = body >= 0.5 * full_range
+        strong1, strong2 = _prev(strong.astype(np.float64), 1) == 1, _prev(strong.astype(np.float64), 2) == 1
+        out['three_white_soldiers'] = (
+            bull & bull1 & bull2 & strong & strong1 & strong2
+            & (c > c1) & (c1 > c2) & (o >= o1) & (o <= c1) & (o1 >= o2) & (o1 <= c2)
+        )
+        out['three_black_crows'] = (
+            bear & bear1 & bear2 & strong & strong1 & strong2
+            & (c < c1) & (c1 < c2) & (o <= o1) & (o >= c1) & (o1 <= o2) & (o1 >= c2)
+        )
+    return out
+
+
+def find_patterns(series, start=0):
+    """[{'date', 'pattern'}] for bars of `series` from index `start` on, oldest first"""
+    if len(series) <= start:
+        return []
+    lo = max(start - LOOKBACK, 0)
+    masks = detect(series.open[lo:], series.high[lo:], series.low[lo:], series.close[lo:])
+    hits = sorted(
+        (start + int(i), name)
+        for name in PATTERNS for i in np.flatnonzero(masks[name][start - lo:])
+    )
+    if not hits:
+        return []
+    dates = np.datetime_as_string(series.dates[[i for i, _ in hits]], unit='D').tolist()
+    return [{'date': d, 'pattern': name} for d, (_, name) in zip(dates, hits)]
+
+
+# --- per-stock cache -------------------------------------------------------
+
+def _bar(series, i):
+    return [
+        str(np.datetime_as_string(series.dates[i], unit='D')),
+        float(series.open[i]), float(series.high[i]), float(series.low[i]), float(series.close[i]),
+    ]
+
+
+def _refresh(series, entry):
+    """Cache entry for `series`, reusing `entry` when the new series only appends bars"""
+    n_old = entry['n_bars'] if entry else 0
+    if entry and (n_old == 0 or n_old > len(series) or _bar(series, n_old - 1) != entry['last_bar']):
+        entry, n_old = None, 0  # history was rewritten, not appended to: rescan everything
+    hits = entry['hits'] if entry else []
+    hits = hits + find_patterns(series, start=n_old)
+    return {
+        'version': series.version,
+        'n_bars': len(series),
+        'last_bar': _bar(series, len(series) - 1) if len(series) else None,
+        'hits': hits,
+    }
+
+
+def cached_patterns(series_by_id):
+    """{stock_id: cache entry} for the given PriceSeries, updating stale entries"""
+    keys = {sid: CACHE_KEY.format(stock_id=sid) for sid in series_by_id}
+    found = cache.get_many(list(keys.values()))
+    out = {}
+    stale = {}
+    for sid, series in series_by_id.items():
+        entry = found.get(keys[sid])
+        if entry is None or entry['version'] != series.version:
+            entry = _refresh(series, entry)
+            stale[keys[sid]] = entry
+        out[sid] = entry
+    if stale:
+        cache.set_many(stale, timeout=None)
+    return out
+
+
+def stock_patterns(series):
+    """Pattern hits for one stock's daily bars (cached)"""
+    return cached_patterns({series.stock_id: series})[series.stock_id]['hits']
+
+
+def scan(pattern, stock_ids, day=None):
+    """
+    [(stock_id, date)] for stocks whose latest bar (or the bar on `day`,
+    'YYYY-MM-DD') shows `pattern`. Fresh cache entries are used as they are;
+    only stale ones load price arrays.
+    """
+    matches = []
+    for i in range(0, len(stock_ids), LOAD_CHUNK):
+        chunk = stock_ids[i:i + LOAD_CHUNK]
+        versions = price_store.versions(chunk)
+        keys = {sid: CACHE_KEY.format(stock_id=sid) for sid in chunk}
+        found = cache.get_many(list(keys.values()))
+        entries = {}
+        stale = []
+        for sid in chunk:
+            entry = found.get(keys[sid])
+            if entry is not None and entry['version'] == versions[sid]:
+                entries[sid] = entry
+            else:
+                stale.append(sid)
+        if stale:
+            entries.update(cached_patterns(price_store.get_many(stale)))
+        for sid in chunk:
+            entry = entries[sid]
+            if not entry['last_bar']:
+                continue
+            target = day or entry['last_bar'][0]
+            # Hits are in date order, so the bar being asked about is at the end
+            for hit in reversed(entry['hits']):
+                if hit['date'] < target:
+                    break
+                if hit['date'] == target and hit['pattern'] == pattern:
+                    matches.append((sid, target))
+                    break
+    return matches
@@ -0,0 +1,362 @@
+"""
+Columnar in-memory price store for FinanceAI
+
+Keeps one set of NumPy arrays (date, open, high, low, close, volume) per stock,
+loaded lazily from StockPriceHistory and shared by the chart / analytics views.
+Each process holds its own copy; a per-stock version token kept in the
+'versions' cache tells every process when new history rows have landed. Weekly and
+monthly rollups for long chart ranges are resampled from the daily arrays on
+first use and cached with them, so they follow the same version token.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+from django.utils.connection import ConnectionProxy
+
+from .models import StockPriceHistory
+
+
+VERSION_KEY = 'prediction:price_version:{stock_id}'
+# Cache holding version tokens (this module's, the indicator snapshot's and the
+# search index's); never culled, see CACHES in settings
+version_cache = ConnectionProxy(caches, 'versions')
+# Stocks per history query when loading many symbols at once
+LOAD_CHUNK = 500
+
+RESOLUTIONS = ('daily', 'weekly', 'monthly')
+# Chart range -> (daily bars or calendar days, default resolution); None = all history.
+# Daily ranges count bars (as the chart always has); longer ranges count calendar days.
+CHART_RANGES = {
+    '1D': (1, 'daily'),
+    '1W': (7, 'daily'),
+    '1M': (30, 'daily'),
+    '3M': (90, 'daily'),
+    '1Y': (365, 'daily'),
+    '2Y': (2 * 365, 'weekly'),
+    '5Y': (5 * 365, 'weekly'),
+    '10Y': (10 * 365, 'monthly'),
+    'MAX': (None, 'monthly'),
+}
+
+
+def _new_token():
+    return str(time.time_ns())
+
+
+class PriceSeries:
+    """Daily OHLCV bars for one stock as parallel arrays, oldest bar first"""
+
+    __slots__ = ('stock_id', 'version', 'dates', 'open', 'high', 'low', 'close', 'volume', '_rollups')
+
+    def __init__(self, stock_id, version, dates, open_, high, low, close, volume):
+        self.stock_id = stock_id
+        self.version = version
+        self.dates = dates
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self._rollups = {}
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def last_date(self):
+        """Date of the newest bar (datetime.date) or None when empty"""
+        if not len(self.dates):
+            return None
+        return self.dates[-1].astype(object)
+
+    def tail(self, n):
+        """Most recent n bars (arrays are views, not copies)"""
+        n = max(int(n), 0)
+        start = max(len(self.dates) - n, 0)
+        return self._slice(start, len(self.dates))
+
+    def since(self, date):
+        """Bars on or after date"""
+        return self.between(start=date)
+
+    def between(self, start=None, end=None):
+        """Bars dated within [start, end]; either bound may be None"""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(start, 'D'), side='left'))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, np.datetime64(end, 'D'), side='right'))
+        return self._slice(lo, max(lo, hi))
+
+    def _slice(self, start, stop):
+        return PriceSeries(
+            self.stock_id, self.version, self.dates[start:stop],
+            self.open[start:stop], self.high[start:stop], self.low[start:stop],
+            self.close[start:stop], self.volume[start:stop],
+        )
+
+    def resample(self, resolution):
+        """
+        Weekly (Monday-based) or monthly OHLCV bars, dated by their first trading day.
+        Cached on the series, so each version of a stock is rolled up at most once.
+        """
+        if resolution == 'daily' or not len(self.dates):
+            return self
+        if resolution not in self._rollups:
+            if resolution == 'weekly':
+                days = self.dates.astype(np.int64)
+                keys = days - (days + 3) % 7  # 1970-01-01 was a Thursday
+            elif resolution == 'monthly':
+                keys = self.dates.astype('datetime64[M]')
+            else:
+                raise ValueError(f'Unknown resolution: {resolution}')
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            ends = np.r_[starts[1:], len(keys)] - 1
+            self._rollups[resolution] = PriceSeries(
+                self.stock_id, self.version, self.dates[starts], self.open[starts],
+                np.maximum.reduceat(self.high, starts), np.minimum.reduceat(self.low, starts),
+                self.close[ends], np.add.reduceat(self.volume, starts),
+            )
+        return self._rollups[resolution]
+
+    def date_strings(self, fmt='%Y-%m-%d'):
+        if self.dates.dtype != 'datetime64[D]':
+            # Intraday bars (datetime64[m], UTC): ISO timestamps whatever the format
+            return np.datetime_as_string(self.dates, timezone='UTC').tolist()
+        if fmt == '%Y-%m-%d':
+            return np.datetime_as_string(self.dates, unit='D').tolist()
+        return [d.strftime(fmt) for d in self.dates.astype(object)]
+
+    def ohlc(self):
+        """Bars in the chart payload shape: [{date, o, h, l, c, v}, ...]"""
+        return [
+            {'date': d, 'o': o, 'h': h, 'l': l, 'c': c, 'v': v}
+            for d, o, h, l, c, v in zip(
+                self.date_strings(), self.open.tolist(), self.high.tolist(),
+                self.low.tolist(), self.close.tolist(), self.volume.tolist(),
+            )
+        ]
+
+    def columns(self):
+        """
+        Bars as parallel arrays (columnar payloads): `date` in days since
+        1970-01-01, or `time` in minutes since 1970-01-01 UTC for intraday bars
+        """
+        key = 'date' if self.dates.dtype == 'datetime64[D]' else 'time'
+        return {
+            key: self.dates.astype(np.int32),
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume,
+        }
+
+    def price_history(self):
+        """Bars in the StockPriceHistorySerializer shape (decimal strings)"""
+        return [
+            {
+                'date': d,
+                'open_price': f'{o:.2f}',
+                'high_price': f'{h:.2f}',
+                'low_price': f'{l:.2f}',
+                'close_price': f'{c:.2f}',
+                'volume': v,
+            }
+            for d, o, h, l, c, v in zip(
+                self.date_strings(), self.open.tolist(), self.high.tolist(),
+                self.low.tolist(), self.close.tolist(), self.volume.tolist(),
+            )
+        ]
+
+
+def chart_bars(series, range_param='1M', resolution=None, max_points=None):
+    """
+    (bars, resolution) for a chart range of `series`. The range picks its own
+    resolution unless one is given; if the window still has more than
+    max_points bars the next coarser resolution is used, then the oldest bars
+    are dropped.
+    """
+    span, default = CHART_RANGES.get(range_param, CHART_RANGES['1M'])
+    resolution = resolution if resolution in RESOLUTIONS else default
+    max_points = max_points or getattr(settings, 'CHART_MAX_POINTS', 500)
+    if span is None:
+        window = series
+    elif default == 'daily':
+        window = series.tail(span)
+    else:
+        window = series.since(series.last_date - timedelta(days=span)) if len(series) else series
+    for res in RESOLUTIONS[RESOLUTIONS.index(resolution):]:
+        bars = series.resample(res)
+        if len(window):
+            bars = bars.since(window.dates[0].astype(object))
+        resolution = res
+        if len(bars) <= max_points:
+            break
+    return bars.tail(max_points), resolution
+
+
+def _empty_series(stock_id, version):
+    return PriceSeries(
+        stock_id, version, np.empty(0, dtype='datetime64[D]'),
+        np.empty(0), np.empty(0), np.empty(0), np.empty(0), np.empty(0, dtype=np.int64),
+    )
+
+
+def align_right(series_list):
+    """Stack series into (stocks x max_len) close / volume / date matrices, padded on the left"""
+    width = max((len(s) for s in series_list), default=0)
+    shape = (len(series_list), width)
+    close = np.full(shape, np.nan)
+    volume = np.full(shape, np.nan)
+    dates = np.full(shape, np.datetime64('NaT'), dtype='datetime64[D]')
+    for row, s in enumerate(series_list):
+        n = len(s)
+        if n:
+            close[row, width - n:] = s.close
+            volume[row, width - n:] = s.volume
+            dates[row, width - n:] = s.dates
+    return dates, close, volume
+
+
+def align_dates(series_list, dates):
+    """(stocks x len(dates)) close matrix placed on a shared sorted date index; NaN where no bar"""
+    close = np.full((len(series_list), len(dates)), np.nan)
+    if not len(dates):
+        return close
+    for row, s in enumerate(series_list):
+        pos = np.searchsorted(dates, s.dates)
+        keep = (pos < len(dates)) & (dates[np.minimum(pos, len(dates) - 1)] == s.dates)
+        close[row, pos[keep]] = s.close[keep]
+    return close
+
+
+def _history_rows(stock_ids):
+    """(stock_id, date, o, h, l, c, v) rows ordered by stock then date, as floats"""
+    return (
+        StockPriceHistory.objects.filter(stock_id__in=stock_ids)
+        .order_by('stock_id', 'date')
+        .annotate(
+            o=Cast('open_price', FloatField()),
+            h=Cast('high_price', FloatField()),
+            l=Cast('low_price', FloatField()),
+            c=Cast('close_price', FloatField()),
+        )
+        .values_list('stock_id', 'date', 'o', 'h', 'l', 'c', 'volume')
+    )
+
+
+class PriceStore:
+    """Per-process LRU of PriceSeries keyed by stock id"""
+
+    def __init__(self, max_symbols=None):
+        self.max_symbols = max_symbols or getattr(settings, 'PRICE_STORE_MAX_SYMBOLS', 2000)
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+
+    # --- versions -------------------------------------------------------
+
+    def versions(self, stock_ids):
+        """Current version token per stock id (creates tokens that are missing)"""
+        keys = {sid: VERSION_KEY.format(stock_id=sid) for sid in stock_ids}
+        found = version_cache.get_many(list(keys.values()))
+        out = {}
+        for sid, key in keys.items():
+            token = found.get(key)
+            if token is None:
+                token = _new_token()
+                # add() keeps a token another process set in the meantime
+                if not version_cache.add(key, token, timeout=None):
+                    token = version_cache.get(key) or token
+            out[sid] = token
+        return out
+
+    def version(self, stock_id):
+        return self.versions([stock_id])[stock_id]
+
+    def invalidate(self, stock_ids):
+        """Mark stocks as changed in every process; call after writing history rows"""
+        stock_ids = list(stock_ids)
+        if not stock_ids:
+            return
+        version_cache.set_many(
+            {VERSION_KEY.format(stock_id=sid): _new_token() for sid in stock_ids},
+            timeout=None,
+        )
+        with self._lock:
+            for sid in stock_ids:
+                self._series.pop(sid, None)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    # --- reads ----------------------------------------------------------
+
+    def get(self, stock_id):
+        """PriceSeries for one stock, loading it if missing or stale"""
+        return self.get_many([stock_id])[stock_id]
+
+    def get_many(self, stock_ids):
+        """{stock_id: PriceSeries}; all stale / missing stocks load in one query"""
+        stock_ids = list(dict.fromkeys(stock_ids))
+        if not stock_ids:
+            return {}
+        versions = self.versions(stock_ids)
+        result = {}
+        missing = []
+        with self._lock:
+            for sid in stock_ids:
+                series = self._series.get(sid)
+                if series is not None and series.version == versions[sid]:
+                    self._series.move_to_end(sid)
+                    result[sid] = series
+                else:
+                    missing.append(sid)
+        if missing:
+            loaded = self._load(missing, versions)
+            with self._lock:
+                for sid, series in loaded.items():
+                    self._series[sid] = series
+                    self._series.move_to_end(sid)
+                while len(self._series) > self.max_symbols:
+                    self._series.popitem(last=False)
+            result.update(loaded)
+        return result
+
+    def _load(self, stock_ids, versions):
+        loaded = {sid: _empty_series(sid, versions[sid]) for sid in stock_ids}
+        for i in range(0, len(stock_ids), LOAD_CHUNK):
+            self._load_chunk(stock_ids[i:i + LOAD_CHUNK], versions, loaded)
+        return loaded
+
+    def _load_chunk(self, stock_ids, versions, loaded):
+        rows = list(_history_rows(stock_ids))
+        if not rows:
+            return
+        sids, dates, o, h, l, c, v = zip(*rows)
+        sids = np.asarray(sids, dtype=np.int64)
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        o = np.asarray(o, dtype=np.float64)
+        h = np.asarray(h, dtype=np.float64)
+        l = np.asarray(l, dtype=np.float64)
+        c = np.asarray(c, dtype=np.float64)
+        v = np.asarray(v, dtype=np.int64)
+        # rows are sorted by stock id, so each stock is one contiguous block
+        bounds = np.flatnonzero(np.diff(sids)) + 1
+        starts = np.concatenate(([0], bounds))
+        stops = np.concatenate((bounds, [len(sids)]))
+        for start, stop in zip(starts.tolist(), stops.tolist()):
+            sid = int(sids[start])
+            loaded[sid] = PriceSeries(
+                sid, versions[sid], dates[start:stop].copy(),
+                o[start:stop].copy(), h[start:stop].copy(), l[start:stop].copy(),
+                c[start:stop].copy(), v[start:stop].copy(),
+            )
+
+
+price_store = PriceStore()
@@ -0,0 +1,266 @@
+"""
+Live quotes for FinanceAI
+
+The whole quote table (one entry per symbol with price, session open/high/low,
+volume, previous close and the tick timestamp) is a single Django cache entry,
+so a client polling any number of symbols costs one cache read. Only the quote
+worker (refresh_quotes, or ingest_quotes which also persists prices) writes
+it, pulling ticks from the provider named by QUOTE_PROVIDER; request handlers
+never call a provider.
+
+Providers implement fetch() -> [Tick]. Included: StockTableQuoteProvider
+(prices already stored on Stock rows) and ReplayQuoteProvider (a CSV of
+recorded ticks, replayed a fixed step of feed time per call, for tests and
+demos).
+"""
+import csv
+import time
+import zoneinfo
+from collections import namedtuple
+from datetime import date, datetime, time as dt_time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Stock
+
+
+QUOTES_KEY = 'prediction:quotes'
+# The table's sequence number on its own, so pollers can skip unchanged tables without fetching them
+QUOTES_SEQ_KEY = 'prediction:quotes:seq'
+MAX_SYMBOLS = 200
+
+# One trade print / price update; volume is the size traded since the symbol's previous tick
+Tick = namedtuple('Tick', 'symbol price timestamp volume', defaults=(0,))
+
+
+# --- providers -----------------------------------------------------------------
+
+class QuoteProvider:
+    """Source of quote ticks"""
+
+    def fetch(self):
+        """Ticks since the previous call, oldest first"""
+        raise NotImplementedError
+
+    def now(self):
+        """Current feed time (session closes are judged against it)"""
+        return timezone.now()
+
+
+class StockTableQuoteProvider(QuoteProvider):
+    """Quotes from Stock.current_price, for rows updated since the previous call"""
+
+    def __init__(self):
+        self.since = None
+
+    def fetch(self):
+        rows = Stock.objects.order_by('last_updated')
+        if self.since is not None:
+            rows = rows.filter(last_updated__gt=self.since)
+        ticks = [
+            Tick(symbol, float(price), updated)
+            for symbol, price, updated in rows.values_list('symbol', 'current_price', 'last_updated')
+        ]
+        if ticks:
+            self.since = ticks[-1].timestamp
+        return ticks
+
+
+def _parse_timestamp(text):
+    value = datetime.fromisoformat(str(text).strip().replace('Z', '+00:00'))
+    if timezone.is_naive(value):
+        return value.replace(tzinfo=dt_timezone.utc)
+    return value.astimezone(dt_timezone.utc)
+
+
+class ReplayQuoteProvider(QuoteProvider):
+    """
+    Replays a CSV of ticks (timestamp, symbol, price[, volume]) sorted by
+    timestamp. Each fetch() returns the next `step` seconds of feed time, so
+    a replay is deterministic whatever the polling interval; stretches with no
+    ticks are skipped.
+    """
+
+    def __init__(self, path, step=1.0, loop=False):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            self.ticks = [
+                Tick(row['symbol'].strip().upper(), float(row['price']), _parse_timestamp(row['timestamp']),
+                     int(float(row.get('volume') or 0)))
+                for row in csv.DictReader(f)
+            ]
+        self.ticks.sort(key=lambda t: t.timestamp)
+        self.step = timedelta(seconds=step)
+        self.loop = loop
+        self.pos = 0
+        self.clock = self.ticks[0].timestamp if self.ticks else None
+        # Each lap of a looped replay is shifted past the previous one so ticks stay in order
+        self.offset = timedelta(0)
+
+    @property
+    def exhausted(self):
+        return self.pos >= len(self.ticks) and not self.loop
+
+    def now(self):
+        return self.clock + self.offset if self.clock is not None else timezone.now()
+
+    def fetch(self):
+        if not self.ticks:
+            return []
+        if self.pos >= len(self.ticks):
+            if not self.loop:
+                return []
+            self.offset += self.ticks[-1].timestamp - self.ticks[0].timestamp + self.step
+            self.pos, self.clock = 0, self.ticks[0].timestamp
+        # Skip idle feed time (overnight, halts) instead of returning empty batches through it
+        self.clock = max(self.clock, self.ticks[self.pos].timestamp) + self.step
+        start = self.pos
+        while self.pos < len(self.ticks) and self.ticks[self.pos].timestamp < self.clock:
+            self.pos += 1
+        batch = self.ticks[start:self.pos]
+        if self.offset:
+            batch = [t._replace(timestamp=t.timestamp + self.offset) for t in batch]
+        return batch
+
+
+def market_timezone():
+    return zoneinfo.ZoneInfo(getattr(settings, 'MARKET_TIMEZONE', 'America/New_York'))
+
+
+def session_close(session):
+    """Aware datetime of the market close on a session date ('YYYY-MM-DD')"""
+    close = dt_time.fromisoformat(getattr(settings, 'MARKET_CLOSE', '16:00'))
+    return datetime.combine(date.fromisoformat(session), close, tzinfo=market_timezone())
+
+
+def get_provider():
+    """The QUOTE_PROVIDER class (dotted path) built with QUOTE_PROVIDER_OPTIONS"""
+    path = getattr(settings, 'QUOTE_PROVIDER', 'prediction.quotes.StockTableQuoteProvider')
+    return import_string(path)(**getattr(settings, 'QUOTE_PROVIDER_OPTIONS', {}))
+
+
+# --- quote table ---------------------------------------------------------------
+
+# Cache backends private to one process: a table the worker writes there never reaches the web workers
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_is_shared():
+    """True when the default cache can carry the quote table from the worker to other processes"""
+    return settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES
+
+
+def load_table():
+    return cache.get(QUOTES_KEY) or {'seq': 0, 'updated_at': None, 'quotes': {}}
+
+
+def save_table(table, changed=()):
+    """Store the table; bumps its sequence number and stamps it on the changed quotes (SSE event ids)"""
+    table['seq'] = table.get('seq', 0) + 1
+    for symbol in changed:
+        table['quotes'][symbol]['seq'] = table['seq']
+    table['updated_at'] = time.time()
+    cache.set_many({QUOTES_KEY: table, QUOTES_SEQ_KEY: table['seq']}, timeout=None)
+
+
+def seed_missing(table, symbols):
+    """Add entries, from their Stock rows, for symbols the table has not seen; returns how many"""
+    quotes = table['quotes']
+    unseen = set(symbols) - set(quotes)
+    if not unseen:
+        return 0
+    rows = Stock.objects.filter(symbol__in=unseen).values_list('id', 'symbol', 'current_price', 'previous_close')
+    for stock_id, symbol, price, prev in rows:
+        quotes[symbol] = {
+            'symbol': symbol, 'stock_id': stock_id, 'price': float(price),
+            'previous_close': float(prev or 0) or None,
+            'open': None, 'high': None, 'low': None, 'volume': 0,
+            'session': None, 'rolled': None, 'closing_price': None, 'timestamp': None,
+        }
+    return len(unseen)
+
+
+def roll_session(quote):
+    """The daily bar of the quote's current session; marks it rolled and keeps its closing price"""
+    quote['rolled'] = quote['session']
+    quote['closing_price'] = quote['price']
+    return {
+        'stock_id': quote['stock_id'], 'date': quote['session'], 'open': quote['open'],
+        'high': quote['high'], 'low': quote['low'], 'close': quote['price'], 'volume': quote['volume'],
+    }
+
+
+def apply_ticks(quotes, ticks, closed=None):
+    """
+    Fold ticks into the {symbol: quote} table in place (many ticks per symbol
+    coalesce into one entry); returns the symbols that changed. When a tick
+    opens a new session, the finished session's bar is appended to `closed`
+    unless it was already rolled at the close (later ticks are after-hours).
+    """
+    changed = set()
+    tz = market_timezone()
+    for tick in ticks:
+        quote = quotes.get(tick.symbol)
+        if quote is None:
+            continue
+        stamp = tick.timestamp.isoformat()
+        if quote['timestamp'] is not None and stamp < quote['timestamp']:
+            continue  # late tick
+        session = timezone.localdate(tick.timestamp, tz).isoformat()
+        if quote['session'] != session:
+            # First tick of a new session: the finished session's close becomes the previous close
+            if quote['session'] is not None:
+                if quote.get('rolled') != quote['session']:
+                    bar = roll_session(quote)
+                    if closed is not None:
+                        closed.append(bar)
+                quote['previous_close'] = quote['closing_price']
+            quote.update(session=session, open=tick.price, high=tick.price, low=tick.price, volume=0)
+        quote['price'] = tick.price
+        quote['high'] = max(quote['high'], tick.price)
+        quote['low'] = min(quote['low'], tick.price)
+        quote['volume'] += tick.volume
+        quote['timestamp'] = stamp
+        prev = quote['previous_close']
+        quote['change'] = round(tick.price - prev, 4) if prev else 0
+        quote['change_percent'] = round((tick.price - prev) / prev * 100, 2) if prev else 0
+        changed.add(tick.symbol)
+    return changed
+
+
+def publish(ticks):
+    """Apply ticks to the shared quote table (single writer); returns the symbols that changed"""
+    table = load_table()
+    seeded = seed_missing(table, {t.symbol for t in ticks})
+    changed = apply_ticks(table['quotes'], ticks)
+    if changed or seeded:
+        save_table(table, changed)
+    return changed
+
+
+def get_quotes(symbols):
+    """({symbol: quote}, table updated_at) for the requested symbols, from one cache read"""
+    table = load_table()
+    quotes = table['quotes']
+    return {s: quotes[s] for s in symbols if s in quotes}, table['updated_at']
+
+
+def quote_payload(quote):
+    """Public fields of a quote entry"""
+    return {
+        'symbol': quote['symbol'],
+        'price': quote['price'],
+        'change': quote.get('change', 0),
+        'change_percent': quote.get('change_percent', 0),
+        'previous_close': quote['previous_close'],
+        'open': quote['open'],
+        'high': quote['high'],
+        'low': quote['low'],
+        'volume': quote['volume'],
+        'timestamp': quote['timestamp'],
+    }
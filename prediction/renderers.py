@@ -0,0 +1,76 @@
+"""
+Columnar chart renderers for FinanceAI
+
+Chart and stock detail endpoints normally return bars as a list of per-bar
+objects. With ?format=columnar they return the bars once, as parallel arrays
+under `columns` (date as days since 1970-01-01, or time as minutes since
+1970-01-01 UTC for intraday bars, then open, high, low, close, volume), taken
+straight from the price store's arrays. ?format=packed sends the same columns
+as binary:
+
+    b'FAC1' | uint32 header length | UTF-8 JSON header | padding to 8 bytes | columns
+
+The header is the JSON response with `columns` replaced by
+[[name, dtype, length], ...]. Each column follows in that order, little-endian
+and padded to 8 bytes, so a client can wrap it in a typed array without
+copying. Dates and times are int32, prices float32 (exact to the cent below
+~100,000) and volume float64. Error responses are a header with no columns.
+"""
+import json
+import struct
+
+import numpy as np
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+
+MAGIC = b'FAC1'
+PACKED_DTYPES = {'date': '<i4', 'time': '<i4', 'volume': '<f8'}
+PACKED_DEFAULT_DTYPE = '<f4'
+DTYPE_NAMES = {'<i4': 'int32', '<f4': 'float32', '<f8': 'float64'}
+
+
+def _padding(size):
+    return b'\0' * (-size % 8)
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """JSON with bars as parallel arrays (?format=columnar)"""
+    format = 'columnar'
+
+
+class PackedColumnsRenderer(BaseRenderer):
+    """Bars as packed little-endian arrays after a JSON header (?format=packed)"""
+    media_type = 'application/vnd.financeai.columns'
+    format = 'packed'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        header = dict(data or {})
+        body = header.get('data')
+        arrays = []
+        if isinstance(body, dict) and 'columns' in body:
+            body = header['data'] = dict(body)
+            specs = []
+            for name, values in body['columns'].items():
+                dtype = PACKED_DTYPES.get(name, PACKED_DEFAULT_DTYPE)
+                array = np.ascontiguousarray(values, dtype=dtype)
+                specs.append([name, DTYPE_NAMES[dtype], len(array)])
+                arrays.append(array)
+            body['columns'] = specs
+        head = json.dumps(header, cls=JSONEncoder, separators=(',', ':')).encode('utf-8')
+        parts = [MAGIC, struct.pack('<I', len(head)), head, _padding(len(MAGIC) + 4 + len(head))]
+        for array in arrays:
+            parts += [array.tobytes(), _padding(array.nbytes)]
+        return b''.join(parts)
+
+
+# Renderers for endpoints that can return columnar bars
+COLUMNAR_RENDERERS = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarJSONRenderer, PackedColumnsRenderer]
+
+
+def wants_columns(request):
+    """True when the negotiated renderer expects bars as `columns`"""
+    return request.accepted_renderer.format in (ColumnarJSONRenderer.format, PackedColumnsRenderer.format)
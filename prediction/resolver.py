@@ -0,0 +1,89 @@
+"""
+Bulk prediction resolver for FinanceAI
+
+Resolves predictions whose predicted_for_date has passed, in batches, outside
+the request cycle (see the resolve_predictions management command). Each batch
+is one as-of price query, one bulk_update and one F() increment per distinct
+per-user count of newly correct predictions; the same transaction adds the
+batch to the leaderboard and the per-user stats rows (see
+leaderboard.record_resolutions and user_stats.record_resolutions).
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from users.models import UserProfile
+from . import user_stats
+from .leaderboard import record_resolutions
+from .models import Prediction, StockPriceHistory
+
+
+def _due_batch(today, after_id, batch_size):
+    """Unresolved due predictions with the first close on/after their target date"""
+    first_close = StockPriceHistory.objects.filter(
+        stock_id=OuterRef('stock_id'),
+        date__gte=OuterRef('predicted_for_date'),
+        date__lte=today,
+    ).order_by('date').values('close_price')[:1]
+    return list(
+        Prediction.objects.select_for_update(skip_locked=True, of=('self',))
+        .filter(actual_result__isnull=True, predicted_for_date__lte=today, id__gt=after_id)
+        .order_by('id')
+        .annotate(resolved_close=Subquery(first_close), fallback_price=F('stock__current_price'))
+        .only(
+            'id', 'user_id', 'stock_id', 'user_prediction', 'price_at_prediction',
+            'predicted_for_date', 'created_at',
+        )[:batch_size]
+    )
+
+
+def _credit_correct(user_counts):
+    """Add each user's newly correct predictions to their profile, one UPDATE per distinct count"""
+    by_count = defaultdict(list)
+    for user_id, n in user_counts.items():
+        by_count[n].append(user_id)
+    for n, user_ids in by_count.items():
+        UserProfile.objects.filter(user_id__in=user_ids).update(
+            correct_predictions=F('correct_predictions') + n
+        )
+
+
+def resolve_batch(predictions, now=None):
+    """Resolve already-annotated predictions in place; returns the ones that changed"""
+    now = now or timezone.now()
+    resolved = []
+    for p in predictions:
+        price_at = p.price_at_prediction
+        actual_price = p.resolved_close
+        if actual_price is None:
+            # No history yet: fall back to the stock's current price (as the read path used to)
+            if not price_at or price_at <= 0:
+                continue
+            actual_price = p.fallback_price
+        p.actual_result = 'up' if actual_price >= price_at else 'down'
+        p.is_correct = p.user_prediction == p.actual_result
+        p.resolved_at = now
+        resolved.append(p)
+    return resolved
+
+
+def resolve_due_predictions(today=None, batch_size=1000):
+    """Resolve every due prediction in batches; returns the number resolved"""
+    today = today or timezone.now().date()
+    total = 0
+    after_id = 0
+    while True:
+        with transaction.atomic():
+            batch = _due_batch(today, after_id, batch_size)
+            if not batch:
+                break
+            after_id = batch[-1].id
+            resolved = resolve_batch(batch)
+            Prediction.objects.bulk_update(resolved, ['actual_result', 'is_correct', 'resolved_at'])
+            _credit_correct(Counter(p.user_id for p in resolved if p.is_correct))
+            record_resolutions(resolved)
+            user_stats.record_resolutions(resolved)
+        total += len(resolved)
+    return total
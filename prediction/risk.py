@@ -0,0 +1,217 @@
+"""
+Risk analytics for FinanceAI
+
+Computes, for a (stocks x bars) close matrix on a shared date index: beta
+against a benchmark symbol (RISK_BENCHMARK_SYMBOL), historical and parametric
+(normal) one-day VaR / CVaR at 95% and 99%, annualized and rolling
+volatility, and max drawdown. Every metric is a NumPy reduction along the bar
+axis, so the nightly batch (run_risk_batch, the compute_risk command) handles
+the universe in a few matrix passes and stores StockRiskMetrics rows; the risk
+meter and portfolio analytics read those rows. Other windows are computed on
+demand for one stock and cached by price-store version.
+"""
+import math
+import warnings
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from .kernels import beta, drawdown, ffill, pct_change, rolling_std
+from .models import Stock, StockRiskMetrics
+from .price_store import align_dates, price_store
+
+
+TRADING_DAYS = 252
+ROLLING_WINDOW = 21
+MIN_OBSERVATIONS = 20
+MAX_WINDOW = 2520
+LEVELS = (95, 99)
+# One-sided standard normal quantiles for the parametric VaR
+Z_SCORES = {95: 1.6448536269514722, 99: 2.3263478740408408}
+METRICS = (
+    'beta', 'volatility', 'rolling_volatility',
+    'var_95', 'var_99', 'cvar_95', 'cvar_99',
+    'parametric_var_95', 'parametric_var_99', 'parametric_cvar_95', 'parametric_cvar_99',
+    'max_drawdown',
+)
+CACHE_KEY = 'prediction:risk:{stock_id}:{window}:{benchmark}:{version}:{benchmark_version}'
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def default_window():
+    return getattr(settings, 'RISK_WINDOW', TRADING_DAYS)
+
+
+def benchmark_symbol():
+    return getattr(settings, 'RISK_BENCHMARK_SYMBOL', 'SPY')
+
+
+def compute(close, benchmark_close=None, rolling_window=ROLLING_WINDOW):
+    """
+    {metric: 1D array, one value per row} for a close matrix whose columns are
+    shared dates. Percent values; NaN where a row has fewer than
+    MIN_OBSERVATIONS returns (or no benchmark overlap, for beta).
+    """
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    if close.shape[1] < 2:
+        empty = np.full(len(close), np.nan)
+        return {'observations': np.zeros(len(close), dtype=int), **{name: empty for name in METRICS}}
+    returns = pct_change(close)[:, 1:]
+    valid = ~np.isnan(returns)
+    n = valid.sum(axis=1)
+    out = {'observations': n}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN rows
+        mean = np.nanmean(returns, axis=1)
+        std = np.nanstd(returns, axis=1, ddof=1)
+        out['volatility'] = std * math.sqrt(TRADING_DAYS) * 100
+        out['rolling_volatility'] = ffill(rolling_std(returns, rolling_window))[:, -1] * 100
+
+        for level in LEVELS:
+            tail = (100 - level) / 100
+            # Historical: loss at the tail quantile, and the mean loss beyond it
+            q = np.nanpercentile(returns, 100 - level, axis=1)
+            in_tail = valid & (returns <= q[:, None])
+            out[f'var_{level}'] = -q * 100
+            out[f'cvar_{level}'] = -np.where(in_tail, returns, 0.0).sum(axis=1) / in_tail.sum(axis=1) * 100
+            # Parametric: normal returns with the sample mean and volatility
+            z = Z_SCORES[level]
+            density = math.exp(-z * z / 2) / math.sqrt(2 * math.pi)
+            out[f'parametric_var_{level}'] = -(mean - z * std) * 100
+            out[f'parametric_cvar_{level}'] = -(mean - std * density / tail) * 100
+
+        out['max_drawdown'] = np.nanmax(drawdown(ffill(close)), axis=1) * 100
+
+    if benchmark_close is not None:
+        out['beta'] = beta(returns, pct_change(benchmark_close)[0, 1:], min_periods=MIN_OBSERVATIONS)
+    else:
+        out['beta'] = np.full(len(close), np.nan)
+
+    short = n < MIN_OBSERVATIONS
+    for name in METRICS:
+        out[name] = np.where(short, np.nan, out[name])
+    return out
+
+
+def _window_dates(series_list, benchmark_series, window):
+    """The last window + 1 trading dates: the benchmark's, or the union of the series' without one"""
+    if benchmark_series is not None and len(benchmark_series):
+        dates = benchmark_series.dates
+    elif series_list:
+        dates = np.unique(np.concatenate([s.dates for s in series_list]))
+    else:
+        dates = np.empty(0, 'datetime64[D]')
+    return dates[-(window + 1):]
+
+
+def _benchmark_series(symbol):
+    stock_id = Stock.objects.filter(symbol=symbol).values_list('id', flat=True).first()
+    return price_store.get(stock_id) if stock_id is not None else None
+
+
+def metrics_for_series(series_list, window, benchmark_series=None):
+    """[{metric: value or None, 'observations', 'as_of'}] for the PriceSeries"""
+    dates = _window_dates(series_list, benchmark_series, window)
+    close = align_dates(series_list, dates)
+    bench = align_dates([benchmark_series], dates) if benchmark_series is not None else None
+    metrics = compute(close, bench)
+    results = []
+    for i in range(len(series_list)):
+        row = {
+            name: None if math.isnan(metrics[name][i]) else round(float(metrics[name][i]), 4)
+            for name in METRICS
+        }
+        row['observations'] = int(metrics['observations'][i])
+        has_bar = ~np.isnan(close[i])
+        row['as_of'] = (
+            dates[np.flatnonzero(has_bar)[-1]].astype(object) if has_bar.any() else None
+        )
+        results.append(row)
+    return results
+
+
+def run_risk_batch(window=None, benchmark=None, stock_ids=None, batch_stocks=500):
+    """Compute and store StockRiskMetrics for the universe (or the given stocks); returns rows written"""
+    window = window or default_window()
+    benchmark = benchmark or benchmark_symbol()
+    if stock_ids is None:
+        stock_ids = list(Stock.objects.order_by('id').values_list('id', flat=True))
+    benchmark_series = _benchmark_series(benchmark)
+    written = 0
+    for i in range(0, len(stock_ids), batch_stocks):
+        batch = stock_ids[i:i + batch_stocks]
+        series = price_store.get_many(batch)
+        results = metrics_for_series([series[sid] for sid in batch], window, benchmark_series)
+        StockRiskMetrics.objects.bulk_create(
+            [
+                StockRiskMetrics(stock_id=sid, window=window, benchmark=benchmark, **row)
+                for sid, row in zip(batch, results)
+            ],
+            update_conflicts=True,
+            unique_fields=['stock', 'window'],
+            update_fields=['benchmark', 'as_of', 'observations', *METRICS, 'computed_at'],
+        )
+        written += len(batch)
+    return written
+
+
+def stock_risk(stock, window=None):
+    """
+    Risk payload for one stock: the stored nightly row when it covers the
+    stock's latest bar, else computed now and cached by price version.
+    """
+    window = window or default_window()
+    benchmark = benchmark_symbol()
+    series = price_store.get(stock.id)
+    last_bar = series.dates[-1].astype(object) if len(series) else None
+
+    row = StockRiskMetrics.objects.filter(stock=stock, window=window, benchmark=benchmark).first()
+    if row is not None and row.as_of == last_bar:
+        result = {name: getattr(row, name) for name in METRICS}
+        result.update(observations=row.observations, as_of=row.as_of)
+    else:
+        benchmark_series = _benchmark_series(benchmark)
+        key = CACHE_KEY.format(
+            stock_id=stock.id, window=window, benchmark=benchmark, version=series.version,
+            benchmark_version=benchmark_series.version if benchmark_series is not None else None,
+        )
+        result = cache.get(key)
+        if result is None:
+            result = metrics_for_series([series], window, benchmark_series)[0]
+            cache.set(key, result, CACHE_TIMEOUT)
+    result.update(window=window, benchmark=benchmark)
+    return result
+
+
+def stored_metrics(stock_ids, window=None):
+    """{stock_id: StockRiskMetrics} from the last nightly batch"""
+    rows = StockRiskMetrics.objects.filter(stock_id__in=stock_ids, window=window or default_window())
+    return {row.stock_id: row for row in rows}
+
+
+def portfolio_volatility(values, window=None):
+    """
+    Annualized volatility (percent) of holdings kept at their current weights,
+    from the value-weighted daily return series over the last `window` bars, so
+    correlation between holdings counts. `values` is {stock_id: position value};
+    None when the holdings share fewer than MIN_OBSERVATIONS daily returns.
+    """
+    window = window or default_window()
+    values = {sid: value for sid, value in values.items() if value > 0}
+    total = sum(values.values())
+    if not total:
+        return None
+    stock_ids = list(values)
+    series = price_store.get_many(stock_ids)
+    series_list = [series[sid] for sid in stock_ids]
+    dates = _window_dates(series_list, None, window)
+    if len(dates) < 2:
+        return None
+    returns = pct_change(align_dates(series_list, dates))[:, 1:]
+    shared = ~np.isnan(returns).any(axis=0)
+    if shared.sum() < MIN_OBSERVATIONS:
+        return None
+    weights = np.array([values[sid] for sid in stock_ids]) / total
+    daily = weights @ returns[:, shared]
+    return round(float(np.std(daily, ddof=1)) * math.sqrt(TRADING_DAYS) * 100, 2)
@@ -0,0 +1,178 @@
+"""
+In-memory stock search index for FinanceAI
+
+Typeahead over symbols and company names without touching the database:
+sorted symbol and name-token arrays answer prefix queries with a binary
+search, and a trigram index on names catches typos and mid-word matches.
+Results are ranked exact symbol, then symbol prefix, then name-word prefix,
+then fuzzy name match, then (while short of the limit) any substring of the
+symbol or name, as the former icontains query matched ("SFT" finds MSFT);
+substrings are looked up through exact trigram postings, so only candidates
+sharing the query's rarest trigram are checked. Like the price store, each
+process builds its own copy and a version token in the versions cache tells it
+when Stock rows changed. A build replaces one snapshot tuple, so a search
+never mixes structures from two builds.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+from .models import Stock
+from .price_store import version_cache
+
+
+VERSION_KEY = 'prediction:stock_search_version'
+# Fuzzy matches need at least this share of the query's trigrams
+MIN_TRIGRAM_SCORE = 0.6
+# Trigrams present in more names than this are skipped when better ones exist
+COMMON_TRIGRAM = 2000
+# Entries scanned for substrings of queries too short to have a trigram
+SHORT_SUBSTRING_SCAN = 5000
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def _tokens(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _trigrams(text):
+    text = f"  {' '.join(_tokens(text))} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _raw_trigrams(text):
+    """Every 3-character slice of `text` as is, for exact substring lookups"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class StockSearchIndex:
+    """Symbol / name index over every Stock, rebuilt when the version token changes"""
+
+    def __init__(self):
+        self.version = None
+        self._lock = threading.Lock()
+        # (symbols, symbol_ids, words, names, trigrams, texts, substrings):
+        #   symbols     sorted upper-case symbols
+        #   symbol_ids  stock id per entry of symbols
+        #   words       sorted (name token, stock id)
+        #   names       stock id -> lower-case name
+        #   trigrams    token trigram -> list of stock ids (fuzzy matching)
+        #   texts       'symbol\nname' lower-cased, per entry of symbols
+        #   substrings  raw trigram of texts -> ascending entry positions
+        self._snapshot = ([], [], [], {}, {}, [], {})
+
+    # --- versions -------------------------------------------------------
+
+    @staticmethod
+    def current_version():
+        token = version_cache.get(VERSION_KEY)
+        if token is None:
+            token = str(time.time_ns())
+            if not version_cache.add(VERSION_KEY, token, timeout=None):
+                token = version_cache.get(VERSION_KEY) or token
+        return token
+
+    @staticmethod
+    def invalidate():
+        """Mark the index stale in every process; call after adding, renaming or deleting stocks"""
+        version_cache.set(VERSION_KEY, str(time.time_ns()), timeout=None)
+
+    # --- build ----------------------------------------------------------
+
+    def _ensure_current(self):
+        version = self.current_version()
+        if version == self.version:
+            return
+        with self._lock:
+            if version != self.version:
+                self._build(version)
+
+    def _build(self, version):
+        rows = sorted(Stock.objects.values_list('symbol', 'id', 'name'))
+        words = []
+        names = {}
+        trigrams = {}
+        texts = []
+        substrings = {}
+        for pos, (symbol, sid, name) in enumerate(rows):
+            names[sid] = name.lower()
+            words.extend((token, sid) for token in set(_tokens(name)))
+            for gram in _trigrams(name):
+                trigrams.setdefault(gram, []).append(sid)
+            text = f'{symbol.lower()}\n{name.lower()}'
+            texts.append(text)
+            for gram in _raw_trigrams(text):
+                substrings.setdefault(gram, []).append(pos)
+        words.sort()
+        # Swap everything in at once so readers never see a half-built index
+        self._snapshot = (
+            [r[0].upper() for r in rows], [r[1] for r in rows], words, names, trigrams, texts, substrings,
+        )
+        self.version = version
+
+    # --- search ---------------------------------------------------------
+
+    def search(self, q, limit=20):
+        """Ranked stock ids matching `q` (at most `limit`)"""
+        q = q.strip()
+        if not q:
+            return []
+        self._ensure_current()
+        symbols, symbol_ids, words, names, trigrams, texts, substrings = self._snapshot
+        found = {}
+
+        def add(sid):
+            if sid not in found:
+                found[sid] = None
+            return len(found) >= limit
+
+        # Exact symbol, then symbol prefix (sorted, so the exact match comes first)
+        sym = q.upper()
+        i = bisect_left(symbols, sym)
+        while i < len(symbols) and symbols[i].startswith(sym):
+            if add(symbol_ids[i]):
+                return list(found)
+            i += 1
+
+        # Name words: the first query word as a prefix, the rest anywhere in the name
+        terms = _tokens(q)
+        if terms:
+            first, rest = terms[0], terms[1:]
+            i = bisect_left(words, (first,))
+            while i < len(words) and words[i][0].startswith(first):
+                sid = words[i][1]
+                if all(t in names[sid] for t in rest) and add(sid):
+                    return list(found)
+                i += 1
+
+        # Fuzzy: share of the query's trigrams found in the name
+        grams = _trigrams(q)
+        if len(q) >= 3 and grams:
+            postings = sorted((trigrams.get(g, ()) for g in grams), key=len)
+            usable = [p for p in postings if len(p) <= COMMON_TRIGRAM] or postings[:1]
+            hits = Counter(sid for p in usable for sid in p)
+            needed = MIN_TRIGRAM_SCORE * len(usable)
+            for sid, n in sorted(hits.items(), key=lambda item: -item[1]):
+                if n < needed:
+                    break
+                if add(sid):
+                    return list(found)
+
+        # Substring of the symbol or name anywhere: check the entries holding the
+        # query's rarest trigram, or the first few thousand for 1-2 characters
+        needle = q.lower()
+        grams = _raw_trigrams(needle)
+        if grams:
+            candidates = min((substrings.get(g, ()) for g in grams), key=len)
+        else:
+            candidates = range(min(len(texts), SHORT_SUBSTRING_SCAN))
+        for pos in candidates:
+            if needle in texts[pos] and add(symbol_ids[pos]):
+                break
+        return list(found)
+
+
+stock_index = StockSearchIndex()
@@ -2,6 +2,7 @@
 Prediction serializers for FinanceAI
 """
 from rest_framework import serializers
+from .backtest import STRATEGIES
 from .models import Stock, Prediction, StockPriceHistory, AIPredictionModel, MarketIndicator
 
 
@@ -54,6 +55,26 @@ class MakePredictionSerializer(serializers.Serializer):
     )
 
 
+class BatchPredictionSerializer(serializers.Serializer):
+    """Serializer for submitting many predictions at once"""
+    predictions = serializers.ListField(child=MakePredictionSerializer(), min_length=1, max_length=50)
+
+
+class BacktestSerializer(serializers.Serializer):
+    """Serializer for backtest requests"""
+    strategy = serializers.ChoiceField(choices=sorted(STRATEGIES), default='ma_crossover')
+    symbol = serializers.CharField(required=False, default='AAPL')
+    symbols = serializers.ListField(
+        child=serializers.CharField(), required=False, min_length=1, max_length=50
+    )
+    params = serializers.DictField(required=False, default=dict)
+    initial_capital = serializers.FloatField(default=100000, min_value=1)
+    cost_bps = serializers.FloatField(default=0, min_value=0, max_value=1000)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    mode = serializers.ChoiceField(choices=['sync', 'async'], default='sync')
+
+
 class AIPredictionModelSerializer(serializers.ModelSerializer):
     """Serializer for AI prediction models"""
     accuracy_percentage = serializers.ReadOnlyField()
@@ -64,7 +85,7 @@ class AIPredictionModelSerializer(serializers.ModelSerializer):
             'id', 'name', 'version', 'description',
             'accuracy_score', 'accuracy_percentage',
             'total_predictions', 'correct_predictions',
-            'is_active', 'created_at'
+            'evaluation', 'evaluated_at', 'is_active', 'created_at'
         ]
 
 
@@ -0,0 +1,50 @@
+"""
+Prediction signals
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from .models import MarketIndicator, Stock, StockPriceHistory
+from .price_store import price_store
+from .search import stock_index
+
+
+# Sent by the quote ingest worker after each committed cycle: stock_ids whose
+# Stock price changed, bar_stock_ids whose daily history gained or updated a bar
+prices_changed = Signal()
+
+
+@receiver(post_save, sender=StockPriceHistory)
+@receiver(post_delete, sender=StockPriceHistory)
+def invalidate_price_store(sender, instance, **kwargs):
+    """Drop cached price arrays when a history row is written or removed"""
+    price_store.invalidate([instance.stock_id])
+
+
+@receiver(post_save, sender=Stock)
+@receiver(post_delete, sender=Stock)
+def invalidate_stock_index(sender, instance, update_fields=None, **kwargs):
+    """Rebuild the search index when a stock is added, renamed or removed (not on price saves)"""
+    if update_fields is not None and not {'symbol', 'name'} & set(update_fields):
+        return
+    stock_index.invalidate()
+
+
+@receiver(post_save, sender=MarketIndicator)
+def update_latest_indicator(sender, instance, **kwargs):
+    """Keep the latest-indicator snapshot current for rows saved one at a time"""
+    from .indicators import refresh_latest_indicators
+    refresh_latest_indicators([instance])
+
+
+@receiver(post_delete, sender=MarketIndicator)
+def rebuild_latest_indicator(sender, instance, **kwargs):
+    from .indicators import rebuild_latest_indicator
+    rebuild_latest_indicator(instance.stock_id, instance.indicator_type)
+
+
+@receiver(prices_changed)
+def invalidate_rolled_bars(sender, bar_stock_ids=(), **kwargs):
+    """bulk_create skips post_save, so drop cached price arrays for stocks that got a new daily bar"""
+    if bar_stock_ids:
+        price_store.invalidate(bar_stock_ids)
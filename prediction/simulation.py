@@ -0,0 +1,91 @@
+"""
+Monte Carlo price-path projection for FinanceAI
+
+Simulates N paths x horizon days of price moves for a stock, either as
+geometric Brownian motion with the drift and volatility of its recent daily
+log returns, or by resampling those returns (bootstrap). All paths are one
+(N x horizon) NumPy array; the chart only needs the 5/25/50/75/95th
+percentile bands. Bands are computed on a unit start price and cached per
+(stock, horizon, method, paths, price-store version), then scaled to the
+current price when served.
+"""
+import numpy as np
+from django.core.cache import cache
+
+from .price_store import price_store
+
+
+METHODS = ('gbm', 'bootstrap')
+PERCENTILES = (5, 25, 50, 75, 95)
+MAX_HORIZON = 90
+DEFAULT_PATHS = 10000
+MAX_PATHS = 20000
+# Daily bars of history the return distribution is estimated from
+LOOKBACK = 252
+MIN_RETURNS = 20
+CACHE_KEY = 'prediction:montecarlo:{stock_id}:{horizon}:{method}:{paths}:{version}'
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def log_returns(close, lookback=LOOKBACK):
+    close = np.asarray(close, dtype=np.float64)[-(lookback + 1):]
+    close = close[close > 0]
+    return np.diff(np.log(close))
+
+
+def simulate_paths(returns, horizon, n_paths=DEFAULT_PATHS, method='gbm', seed=None):
+    """(n_paths x horizon) price multiples of the start price"""
+    rng = np.random.default_rng(seed)
+    if method == 'bootstrap':
+        steps = returns[rng.integers(0, len(returns), size=(n_paths, horizon))]
+    else:
+        # GBM: log increments ~ N(mean, std) of the historical log returns
+        steps = rng.normal(returns.mean(), returns.std(ddof=1), size=(n_paths, horizon))
+    return np.exp(np.cumsum(steps, axis=1))
+
+
+def unit_bands(close, horizon, n_paths=DEFAULT_PATHS, method='gbm', seed=None):
+    """Percentile bands of simulated paths starting at 1.0, or None without enough history"""
+    returns = log_returns(close)
+    if len(returns) < MIN_RETURNS:
+        return None
+    paths = simulate_paths(returns, horizon, n_paths, method, seed)
+    bands = np.percentile(paths, PERCENTILES, axis=0)
+    return {
+        'bands': {f'p{p}': row.tolist() for p, row in zip(PERCENTILES, bands)},
+        'prob_up': float((paths[:, -1] > 1.0).mean()),
+        'daily_drift': float(returns.mean()),
+        'daily_volatility': float(returns.std(ddof=1)),
+        'history_days': int(len(returns)),
+    }
+
+
+def price_bands(stock, horizon, n_paths=DEFAULT_PATHS, method='gbm'):
+    """Cached chart payload: one {day, p5 ... p95} entry per day, in prices"""
+    series = price_store.get(stock.id)
+    key = CACHE_KEY.format(
+        stock_id=stock.id, horizon=horizon, method=method, paths=n_paths, version=series.version
+    )
+    unit = cache.get(key)
+    if unit is None:
+        # Seeded per stock and version, so a cache miss reproduces the same bands
+        unit = unit_bands(series.close, horizon, n_paths, method, seed=[stock.id, horizon, len(series)])
+        if unit is None:
+            return None
+        cache.set(key, unit, CACHE_TIMEOUT)
+    start = float(stock.current_price) or float(series.close[-1])
+    scaled = {name: [round(start * v, 2) for v in values] for name, values in unit['bands'].items()}
+    return {
+        'method': method,
+        'paths': n_paths,
+        'horizon': horizon,
+        'start_price': round(start, 2),
+        'prob_up': round(unit['prob_up'] * 100, 1),
+        'daily_drift': round(unit['daily_drift'] * 100, 4),
+        'daily_volatility': round(unit['daily_volatility'] * 100, 4),
+        'history_days': unit['history_days'],
+        'bands': [
+            {'day': d + 1, **{name: values[d] for name, values in scaled.items()}}
+            for d in range(horizon)
+        ],
+    }
@@ -0,0 +1,149 @@
+"""
+Server-Sent Events price stream for FinanceAI
+
+One long-lived async response per open dashboard replaces per-second polling.
+The generator reads the shared quote table (one cache read per poll interval,
+whatever the number of symbols) and pushes a `quote` event for each watched
+symbol whose quote changed, and a `portfolio` event when the user's holdings
+value moves. Each poll reads only the table's sequence number; the table itself
+is fetched when that changes. Event ids are the sequence number, so a client
+that reconnects with Last-Event-ID only receives what changed while it was away.
+Comment lines keep idle connections open through proxies. Serve it from the
+ASGI application (finance_ai.asgi) so a stream does not hold a worker thread;
+its CancelOnDisconnect wrapper ends the generator when the client goes away.
+
+EventSource cannot send an Authorization header, and a bearer token in the
+URL would end up in access logs and browser history. Browsers therefore open
+the stream with a ticket: a random id issued by an authenticated POST, valid
+for TICKET_SECONDS and redeemed once.
+"""
+import asyncio
+import json
+import secrets
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .quotes import QUOTES_KEY, QUOTES_SEQ_KEY, quote_payload
+
+
+HEARTBEAT_SECONDS = 15
+HOLDINGS_REFRESH_SECONDS = 60
+# Streams end after this long; EventSource reconnects with Last-Event-ID
+MAX_STREAM_SECONDS = 60 * 60
+RETRY_MS = 3000
+TICKET_KEY = 'prediction:stream_ticket:{ticket}'
+TICKET_SECONDS = 30
+
+
+def format_event(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, separators=(",", ":"))}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def issue_ticket(user_id):
+    """New single-use stream ticket for the user"""
+    ticket = secrets.token_urlsafe(32)
+    cache.set(TICKET_KEY.format(ticket=ticket), user_id, TICKET_SECONDS)
+    return ticket
+
+
+def redeem_ticket(ticket):
+    """User id the ticket was issued to, or None if it is unknown, expired or already used"""
+    key = TICKET_KEY.format(ticket=ticket)
+    user_id = cache.get(key)
+    # delete() is True for one caller only, so a ticket cannot open two streams
+    if user_id is None or not cache.delete(key):
+        return None
+    return user_id
+
+
+def load_holdings(user_id):
+    """{symbol: (shares, cost basis, stored price, stored previous close)} for the user's portfolio"""
+    from portfolio.models import Portfolio
+    rows = Portfolio.objects.filter(user_id=user_id).values_list(
+        'stock__symbol', 'shares', 'average_buy_price', 'stock__current_price', 'stock__previous_close'
+    )
+    return {
+        symbol: (float(shares), float(shares * avg), float(price), float(prev or 0))
+        for symbol, shares, avg, price, prev in rows
+    }
+
+
+def portfolio_values(holdings, quotes):
+    """Summary numbers for the holdings at the latest quote prices (stored prices when unquoted)"""
+    total_value = total_cost = day_change = 0.0
+    for symbol, (shares, cost, price, prev) in holdings.items():
+        quote = quotes.get(symbol)
+        if quote is not None:
+            price, prev = quote['price'], quote['previous_close'] or prev
+        total_value += shares * price
+        total_cost += cost
+        day_change += shares * (price - prev) if prev else 0.0
+    gain = total_value - total_cost
+    return {
+        'total_value': round(total_value, 2),
+        'total_cost': round(total_cost, 2),
+        'total_gain_loss': round(gain, 2),
+        'total_gain_loss_percentage': round(gain / total_cost * 100, 2) if total_cost > 0 else 0,
+        'day_gain_loss': round(day_change, 2),
+        'day_gain_loss_percentage': (
+            round(day_change / (total_value - day_change) * 100, 2) if total_value > day_change else 0
+        ),
+        'number_of_holdings': len(holdings),
+    }
+
+
+async def event_stream(user_id, symbols=(), last_event_id=0, poll_seconds=None, max_seconds=MAX_STREAM_SECONDS):
+    """Async iterator of SSE frames for the user's holdings plus `symbols`"""
+    poll_seconds = poll_seconds or getattr(settings, 'STREAM_POLL_SECONDS', 0.5)
+    started = last_beat = time.monotonic()
+    holdings = await sync_to_async(load_holdings)(user_id)
+    holdings_loaded = started
+    since = last_event_id
+    last_values = None
+    fetched, seq, quotes = False, 0, {}
+    seen = None
+    yield f'retry: {RETRY_MS}\n\n'
+
+    while time.monotonic() - started < max_seconds:
+        now = time.monotonic()
+        dirty = last_values is None
+        if now - holdings_loaded >= HOLDINGS_REFRESH_SECONDS:
+            holdings = await sync_to_async(load_holdings)(user_id)
+            holdings_loaded, dirty = now, True
+        current = await cache.aget(QUOTES_SEQ_KEY)
+        if not fetched or current != seen:
+            table = await cache.aget(QUOTES_KEY) or {}
+            seq, quotes = table.get('seq', 0), table.get('quotes', {})
+            fetched, seen = True, current
+        if since > seq:
+            since = 0  # quote table was reset: resend everything
+        frames = []
+        if seq > since:
+            for symbol in sorted(set(symbols) | set(holdings)):
+                quote = quotes.get(symbol)
+                if quote is not None and quote.get('seq', 0) > since:
+                    frames.append(format_event('quote', quote_payload(quote), seq))
+            since, dirty = seq, True
+        if dirty and holdings:
+            values = portfolio_values(holdings, quotes)
+            if values != last_values:
+                previous = last_values['total_value'] if last_values else values['total_value']
+                frames.append(format_event(
+                    'portfolio', {**values, 'value_change': round(values['total_value'] - previous, 2)}, seq
+                ))
+                last_values = values
+        if frames:
+            yield ''.join(frames)
+            last_beat = now
+        elif now - last_beat >= HEARTBEAT_SECONDS:
+            yield ': heartbeat\n\n'
+            last_beat = now
+        await asyncio.sleep(poll_seconds)
@@ -0,0 +1,70 @@
+"""
+Shared fixtures for the prediction tests
+
+Tests run against process-local caches, cleared with the in-memory price store
+before every test, so version tokens and cached results never leak between
+tests (or in from a development cache).
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from prediction.models import Stock, StockPriceHistory
+from prediction.price_store import price_store
+
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-default'},
+    'versions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-versions'},
+}
+START = date(2025, 1, 1)
+
+
+class IsolatedCachesMixin:
+    def setUp(self):
+        super().setUp()
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        price_store.clear()
+
+
+@override_settings(CACHES=TEST_CACHES)
+class PredictionTestCase(IsolatedCachesMixin, TestCase):
+    pass
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AsyncPredictionTestCase(IsolatedCachesMixin, TransactionTestCase):
+    """For code that reaches the database from sync_to_async threads (outside the test's transaction)"""
+
+
+def make_stock(symbol, closes=(), name=None, start=START, volume=1000, sector=''):
+    """Stock with one daily bar per close (consecutive days from `start`)"""
+    price = Decimal(str(closes[-1])) if len(closes) else Decimal('100')
+    stock = Stock.objects.create(
+        symbol=symbol, name=name or f'{symbol} Inc', sector=sector,
+        current_price=price, previous_close=price,
+    )
+    add_bars(stock, closes, start, volume)
+    return stock
+
+
+def add_bars(stock, closes, start, volume=1000):
+    """Daily bars for `closes` from `start` on (bulk_create, so the price store is invalidated here)"""
+    StockPriceHistory.objects.bulk_create([
+        StockPriceHistory(
+            stock=stock, date=start + timedelta(days=i), open_price=close, high_price=close,
+            low_price=close, close_price=close, volume=volume,
+        )
+        for i, close in enumerate(Decimal(str(round(c, 2))) for c in closes)
+    ])
+    price_store.invalidate([stock.id])
+
+
+def random_walk(n, seed, start=100.0, scale=0.01):
+    """n closes of a seeded geometric random walk"""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    return (start * np.cumprod(1 + rng.normal(0, scale, n))).tolist()
@@ -0,0 +1,64 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+
+from prediction import ai_signal, indicators
+from prediction.models import StockPriceHistory
+
+from .base import PredictionTestCase, START, make_stock
+
+
+RISING = [100 + i for i in range(12)]
+
+
+class AISignalCacheTests(PredictionTestCase):
+    def cached_keys(self):
+        return [key for key in cache._cache if ':prediction:ai_signal:' in key]
+
+    def test_signal_computed_once_per_version(self):
+        stock = make_stock('AAA', RISING)
+        with mock.patch.object(ai_signal, 'build_signal', wraps=ai_signal.build_signal) as build:
+            first = ai_signal.get_signal(stock)
+            self.assertEqual(ai_signal.get_signal(stock, 'lstm')['prediction'], first['prediction'])
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(first['prediction'], 'up')
+        self.assertIn('Model: LINEAR.', first['explanation'])
+
+    def test_coin_flips_not_cached(self):
+        for stock in (make_stock('AAA'), make_stock('BBB', [100] * 12)):
+            self.assertTrue(ai_signal.get_signals([stock])[stock.id]['coin_flip'])
+        self.assertEqual(self.cached_keys(), [])
+        self.assertEqual(ai_signal.warm_signals(), 2)
+        self.assertEqual(self.cached_keys(), [])
+
+    def test_new_bar_invalidates(self):
+        stock = make_stock('AAA', RISING)
+        ai_signal.get_signal(stock)
+        StockPriceHistory.objects.create(
+            stock=stock, date=START + timedelta(days=len(RISING)), open_price=50, high_price=50,
+            low_price=50, close_price=50, volume=0,
+        )
+        with mock.patch.object(ai_signal, 'build_signal', wraps=ai_signal.build_signal) as build:
+            ai_signal.get_signal(stock)
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(len(self.cached_keys()), 2)
+
+    def test_indicator_snapshot_invalidates(self):
+        stock = make_stock('AAA', [100 + (i % 3) for i in range(40)])
+        before = ai_signal.get_signal(stock)
+        with self.captureOnCommitCallbacks(execute=True):
+            indicators.run_indicator_engine([stock.id])
+        with mock.patch.object(ai_signal, 'build_signal', wraps=ai_signal.build_signal) as build:
+            after = ai_signal.get_signal(stock)
+        self.assertEqual(build.call_count, 1)
+        self.assertNotEqual(after['explanation'], before['explanation'])
+        self.assertIn('RSI', after['explanation'])
+
+    def test_warm_signals_fills_cache(self):
+        stocks = [make_stock(symbol, RISING) for symbol in ('AAA', 'BBB')]
+        self.assertEqual(ai_signal.warm_signals(), 2)
+        with mock.patch.object(ai_signal, 'build_signal') as build:
+            signals = ai_signal.get_signals(stocks)
+        build.assert_not_called()
+        self.assertEqual({s['prediction'] for s in signals.values()}, {'up'})
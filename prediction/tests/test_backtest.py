@@ -0,0 +1,176 @@
+from datetime import timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from prediction import backtest_jobs
+from prediction.backtest import normalize_params, run_backtest, sweep
+from prediction.models import BacktestResult, StockPriceHistory
+
+from .base import PredictionTestCase, add_bars, make_stock, random_walk
+
+
+class BacktestEngineTests(PredictionTestCase):
+    def test_buy_and_hold_enters_on_the_bar_after_the_signal(self):
+        close = np.array([[100.0, 110.0, 121.0, 133.1]])
+        result = run_backtest(close, 'buy_and_hold', initial_capital=1000)
+        np.testing.assert_allclose(result['position'][0], [0, 1, 1, 1])
+        np.testing.assert_allclose(result['equity'][0], [1000, 1100, 1210, 1331])
+        self.assertAlmostEqual(result['metrics']['total_return'][0], 0.331)
+        self.assertEqual(result['metrics']['trades'][0], 1)
+
+    def test_costs_reduce_returns(self):
+        close = np.array([random_walk(300, seed=1)])
+        free = run_backtest(close, 'ma_crossover', {'fast': 5, 'slow': 20})
+        costly = run_backtest(close, 'ma_crossover', {'fast': 5, 'slow': 20}, cost_bps=50)
+        self.assertGreater(free['metrics']['trades'][0], 0)
+        self.assertLess(costly['metrics']['total_return'][0], free['metrics']['total_return'][0])
+
+    def test_rows_are_independent(self):
+        a, b = random_walk(200, seed=2), random_walk(200, seed=3)
+        both = run_backtest(np.array([a, b]), 'momentum')
+        alone = run_backtest(np.array([b]), 'momentum')
+        np.testing.assert_allclose(both['equity'][1], alone['equity'][0])
+
+    def test_left_padding_is_flat(self):
+        close = np.array([[np.nan, np.nan, 100.0, 105.0, 110.0]])
+        result = run_backtest(close, 'buy_and_hold', initial_capital=100)
+        np.testing.assert_allclose(result['position'][0, :3], 0)
+        self.assertGreater(result['equity'][0, -1], 100)
+
+    def test_normalize_params(self):
+        self.assertEqual(normalize_params('ma_crossover', {'fast': '5'}), {'fast': 5, 'slow': 20})
+        for strategy, params in [('nope', {}), ('ma_crossover', {'bogus': 1}), ('momentum', {'lookback': 0})]:
+            with self.assertRaises(ValueError):
+                normalize_params(strategy, params)
+
+    def test_sweep_matches_single_runs(self):
+        close = np.array([random_walk(200, seed=4)])
+        grid = {'fast': [5, 10], 'slow': [20, 30]}
+        results = sweep(close, 'ma_crossover', grid, processes=1)
+        self.assertEqual(len(results), 4)
+        for row in results:
+            single = run_backtest(close, 'ma_crossover', row['params'])
+            self.assertAlmostEqual(row['metrics']['total_return'][0], single['metrics']['total_return'][0])
+
+
+REQUEST = {
+    'strategy': 'buy_and_hold', 'params': {}, 'symbols': ['AAA'], 'multi': False,
+    'initial_capital': 1000.0, 'cost_bps': 0.0, 'start_date': None, 'end_date': None,
+}
+
+
+@override_settings(BACKTEST_JOB_THREADS=0)
+class BacktestJobTests(PredictionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('alice', password='pw')
+        self.stock = make_stock('AAA', random_walk(120, seed=5))
+
+    def key(self):
+        return backtest_jobs.cache_key(REQUEST, [self.stock.id])
+
+    def test_cache_key_is_stable_until_prices_change(self):
+        key = self.key()
+        self.assertEqual(self.key(), key)
+        add_bars(self.stock, [123.0], self.stock.price_history.order_by('-date').first().date + timedelta(days=1))
+        self.assertNotEqual(self.key(), key)
+
+    def test_saving_a_bar_changes_the_cache_key(self):
+        key = self.key()
+        bar = StockPriceHistory.objects.filter(stock=self.stock).first()
+        bar.close_price += 1
+        bar.save()  # post_save invalidates the price store version
+        self.assertNotEqual(self.key(), key)
+
+    def test_cache_key_depends_on_request(self):
+        other = dict(REQUEST, cost_bps=5.0)
+        self.assertNotEqual(backtest_jobs.cache_key(other, [self.stock.id]), self.key())
+
+    def test_run_sync_stores_and_reuses_result(self):
+        result = backtest_jobs.run_sync(REQUEST, self.key(), self.user)
+        job = BacktestResult.objects.get(cache_key=self.key())
+        self.assertEqual(job.status, 'done')
+        self.assertLessEqual(job.created_at, job.finished_at)
+        self.assertLessEqual(job.started_at, job.finished_at)
+        BacktestResult.objects.filter(pk=job.pk).update(result={'cached': True})
+        self.assertEqual(backtest_jobs.run_sync(REQUEST, self.key(), self.user), {'cached': True})
+        self.assertEqual(result['symbol'], 'AAA')
+
+    def test_execute_claims_once(self):
+        job = backtest_jobs.get_or_queue(REQUEST, self.key(), self.user)
+        self.assertTrue(backtest_jobs.execute(job.id))
+        self.assertFalse(backtest_jobs.execute(job.id))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.claim_token), ('done', ''))
+        self.assertEqual(job.result['symbol'], 'AAA')
+
+    def test_identical_requests_share_a_job(self):
+        first = backtest_jobs.get_or_queue(REQUEST, self.key(), self.user)
+        other = User.objects.create_user('bob', password='pw')
+        self.assertEqual(backtest_jobs.get_or_queue(REQUEST, self.key(), other).id, first.id)
+
+    def test_failed_job_is_queued_again(self):
+        job = backtest_jobs.get_or_queue(dict(REQUEST, symbols=['ZZZ']), 'missing', self.user)
+        with self.assertLogs('prediction.backtest_jobs', 'ERROR'):
+            self.assertTrue(backtest_jobs.execute(job.id))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(backtest_jobs.get_or_queue(job.request, 'missing').status, 'queued')
+
+    @override_settings(BACKTEST_JOB_TIMEOUT=60)
+    def test_stale_running_job_is_requeued(self):
+        job = backtest_jobs.get_or_queue(REQUEST, self.key(), self.user)
+        BacktestResult.objects.filter(pk=job.pk).update(
+            status='running', started_at=timezone.now() - timedelta(seconds=120), claim_token='dead',
+        )
+        self.assertEqual(backtest_jobs.requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.claim_token), ('queued', ''))
+
+    @override_settings(BACKTEST_JOB_TIMEOUT=60)
+    def test_fresh_running_job_is_left_alone(self):
+        job = backtest_jobs.get_or_queue(REQUEST, self.key(), self.user)
+        BacktestResult.objects.filter(pk=job.pk).update(status='running', started_at=timezone.now())
+        self.assertEqual(backtest_jobs.requeue_stale(), 0)
+        self.assertEqual(backtest_jobs.get_or_queue(REQUEST, self.key()).status, 'running')
+
+    def test_worker_that_lost_its_claim_discards_its_result(self):
+        job = backtest_jobs.get_or_queue(REQUEST, self.key(), self.user)
+        compute = backtest_jobs.compute
+        outcomes = []
+
+        def requeued_mid_run(request):
+            # The job times out and another worker claims and finishes it meanwhile
+            BacktestResult.objects.filter(pk=job.pk).update(status='queued', started_at=None, claim_token='')
+            backtest_jobs.compute = compute
+            outcomes.append(backtest_jobs.execute(job.id))
+            return {'stale': True}
+
+        backtest_jobs.compute = requeued_mid_run
+        try:
+            with self.assertLogs('prediction.backtest_jobs', 'WARNING'):
+                outcomes.append(backtest_jobs.execute(job.id))
+        finally:
+            backtest_jobs.compute = compute
+        self.assertEqual(outcomes, [True, False])
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertNotIn('stale', job.result)
+
+    def test_async_endpoint_queues_then_serves_result(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        payload = {'strategy': 'buy_and_hold', 'symbol': 'AAA', 'initial_capital': 1000, 'mode': 'async'}
+        response = client.post('/api/prediction/backtest/', payload, format='json')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['data']['job_id']
+        backtest_jobs.execute(job_id)
+        response = client.get(f'/api/prediction/backtest/jobs/{job_id}/')
+        self.assertEqual(response.json()['data']['job_status'], 'done')
+        response = client.post('/api/prediction/backtest/', payload, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['job_id'], job_id)
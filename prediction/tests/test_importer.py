@@ -0,0 +1,105 @@
+import csv
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+
+from prediction.importer import ImportFileError, PriceImporter, parse_row, read_chunks
+from prediction.models import Stock, StockPriceHistory
+from prediction.price_store import price_store
+
+from .base import PredictionTestCase, make_stock
+
+
+def raw(**overrides):
+    row = {'symbol': 'aaa', 'date': '2025-01-02', 'open': '10', 'high': '12', 'low': '9', 'close': '11', 'volume': '100'}
+    row.update(overrides)
+    return row
+
+
+class ParseRowTests(PredictionTestCase):
+    def test_valid_row(self):
+        self.assertEqual(
+            parse_row(raw()),
+            ('AAA', date(2025, 1, 2), Decimal('10.00'), Decimal('12.00'), Decimal('9.00'), Decimal('11.00'), 100),
+        )
+
+    def test_iso_timestamp_and_custom_format(self):
+        self.assertEqual(parse_row(raw(date='2025-01-02T00:00:00Z'))[1], date(2025, 1, 2))
+        self.assertEqual(parse_row(raw(date='01/02/2025'), date_format='%m/%d/%Y')[1], date(2025, 1, 2))
+
+    def test_default_symbol(self):
+        self.assertEqual(parse_row(raw(symbol=''), default_symbol='msft')[0], 'MSFT')
+
+    def test_invalid_rows(self):
+        for bad in [
+            raw(symbol=''), raw(date='yesterday'), raw(close='abc'), raw(open='-1'),
+            raw(high='10.5'), raw(low='11.5'), raw(volume='-5'), raw(volume='many'),
+        ]:
+            with self.assertRaises(ValueError, msg=bad):
+                parse_row(bad)
+
+
+class PriceImporterTests(PredictionTestCase):
+    def test_upserts_and_creates_stocks(self):
+        make_stock('AAA', [10])
+        importer = PriceImporter()
+        written = importer.import_chunk([
+            raw(), raw(date='2025-01-03', close='11.5'), raw(date='2025-01-03', close='11.8'),
+            raw(symbol='new', close='5', low='4', open='5', high='6'), raw(close='oops'),
+        ])
+        self.assertEqual(written, 3)  # the repeated (AAA, 2025-01-03) row counts once; last one wins
+        self.assertEqual((importer.rows_read, importer.rows_invalid, importer.stocks_created), (5, 1, 1))
+        self.assertEqual(len(importer.errors), 1)
+        self.assertEqual(
+            StockPriceHistory.objects.get(stock__symbol='AAA', date=date(2025, 1, 3)).close_price, Decimal('11.80')
+        )
+        self.assertEqual(Stock.objects.get(symbol='NEW').current_price, Decimal('5.00'))
+
+        importer.import_chunk([raw(close='11.9', high='12')])
+        self.assertEqual(
+            StockPriceHistory.objects.get(stock__symbol='AAA', date=date(2025, 1, 2)).close_price, Decimal('11.90')
+        )
+
+    def test_import_invalidates_price_store(self):
+        stock = make_stock('AAA', [10])
+        self.assertEqual(len(price_store.get(stock.id)), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            PriceImporter().import_chunk([raw(date='2025-02-01')])
+        self.assertEqual(len(price_store.get(stock.id)), 2)
+
+    def test_skip_existing(self):
+        make_stock('AAA', [10], start=date(2025, 1, 2))
+        PriceImporter(skip_existing=True).import_chunk([raw(close='11')])
+        self.assertEqual(StockPriceHistory.objects.get(stock__symbol='AAA').close_price, Decimal('10.00'))
+
+    def test_dry_run_writes_nothing(self):
+        importer = PriceImporter(dry_run=True)
+        self.assertEqual(importer.import_chunk([raw(symbol='new')]), 1)
+        self.assertFalse(Stock.objects.filter(symbol='NEW').exists())
+        self.assertFalse(StockPriceHistory.objects.exists())
+
+
+class ReadChunksTests(PredictionTestCase):
+    def write_csv(self, header, rows):
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return path
+
+    def test_chunks_and_column_aliases(self):
+        path = self.write_csv(
+            ['Ticker', 'Date', 'Open', 'High', 'Low', 'Close', 'Volume'],
+            [['AAA', f'2025-01-0{i}', 1, 2, 1, 2, 10] for i in range(1, 6)],
+        )
+        chunks = list(read_chunks(path, 2))
+        self.assertEqual([len(c) for c in chunks], [2, 2, 1])
+        self.assertEqual(chunks[0][0]['symbol'], 'AAA')
+
+    def test_missing_column(self):
+        path = self.write_csv(['date', 'open', 'high', 'low', 'close'], [])
+        with self.assertRaises(ImportFileError):
+            list(read_chunks(path, 10, default_symbol='AAA'))
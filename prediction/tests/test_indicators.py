@@ -0,0 +1,66 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from prediction import indicators
+from prediction.models import LatestIndicator, MarketIndicator
+
+from .base import PredictionTestCase, START, add_bars, make_stock, random_walk
+
+
+class IndicatorEngineTests(PredictionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.closes = random_walk(60, seed=11)
+        self.stock = make_stock('AAA', self.closes)
+
+    def test_incremental_writes_only_new_bars(self):
+        first = indicators.run_indicator_engine()
+        self.assertGreater(first, 0)
+        self.assertEqual(indicators.run_indicator_engine(), 0)
+
+        add_bars(self.stock, [self.closes[-1] * 1.01], START + timedelta(days=60))
+        self.assertEqual(indicators.run_indicator_engine(), len(indicators.PRICE_TYPES))
+        latest = LatestIndicator.objects.get(stock=self.stock, indicator_type='rsi')
+        self.assertEqual(latest.as_of, START + timedelta(days=60))
+
+    def test_incremental_matches_full(self):
+        indicators.run_indicator_engine(since=START + timedelta(days=59))
+        add_bars(self.stock, [self.closes[-1] * 0.98], START + timedelta(days=60))
+        indicators.run_indicator_engine()
+        new_bar = START + timedelta(days=60)
+        incremental = dict(
+            MarketIndicator.objects.filter(as_of=new_bar).values_list('indicator_type', 'value')
+        )
+        MarketIndicator.objects.all().delete()
+        indicators.run_indicator_engine(full=True)
+        self.assertEqual(
+            dict(MarketIndicator.objects.filter(as_of=new_bar).values_list('indicator_type', 'value')),
+            incremental,
+        )
+        self.assertEqual(indicators.stored_through([self.stock.id]), {self.stock.id: new_bar})
+
+    def test_since_rewrites_older_bars(self):
+        indicators.run_indicator_engine()
+        MarketIndicator.objects.filter(as_of__gte=START + timedelta(days=50)).update(value=0)
+        self.assertEqual(indicators.run_indicator_engine(), 0)
+        indicators.run_indicator_engine(since=START + timedelta(days=50))
+        self.assertFalse(MarketIndicator.objects.filter(indicator_type='sma', value=0).exists())
+
+    def test_missing_news_table(self):
+        tables = [t for t in connection.introspection.table_names() if not t.startswith('news')]
+        with mock.patch.object(connection.introspection, 'table_names', return_value=tables):
+            self.assertEqual(indicators.sentiment_scores([self.stock.id]), {})
+            self.assertGreater(indicators.run_indicator_engine(), 0)
+
+    def test_command_options(self):
+        out = StringIO()
+        call_command('compute_indicators', '--symbols', 'aaa', stdout=out)
+        self.assertIn('Wrote', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('compute_indicators', '--since', '2025-01-01', '--full', stdout=out)
+        with self.assertRaises(CommandError):
+            call_command('compute_indicators', '--symbols', 'NOPE', stdout=out)
@@ -0,0 +1,90 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from prediction import intraday
+from prediction.intraday import BarAggregator
+from prediction.models import IntradayBar, StockPriceHistory
+from prediction.quotes import Tick
+
+from .base import PredictionTestCase, make_stock
+
+
+OPEN = datetime(2025, 1, 2, 14, 30, tzinfo=dt_timezone.utc)  # 09:30 New York
+
+
+class BarAggregatorTests(PredictionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.stock = make_stock('AAA')
+        self.table = {'AAA': {'stock_id': self.stock.id}}
+
+    def at(self, minutes, price, volume=1):
+        return Tick('AAA', price, OPEN + timedelta(seconds=minutes * 60), volume)
+
+    def test_builds_one_and_five_minute_bars(self):
+        agg = BarAggregator()
+        agg.add([self.at(0, 10), self.at(0.5, 12), self.at(1, 9), self.at(1.5, 11), self.at(5, 13)], self.table)
+        bars = {(b['interval'], b['start']): b for b in agg.drain()}
+        self.assertEqual(len(bars), 5)
+        first = bars[(1, OPEN)]
+        self.assertEqual((first['open'], first['high'], first['low'], first['close'], first['volume']), (10, 12, 10, 12, 2))
+        five = bars[(5, OPEN)]
+        self.assertEqual((five['open'], five['high'], five['low'], five['close'], five['volume']), (10, 12, 9, 11, 4))
+        self.assertEqual(five['session'], date(2025, 1, 2))
+        self.assertEqual(agg.drain(), [])
+
+    def test_late_ticks_and_unknown_symbols_skipped(self):
+        agg = BarAggregator()
+        agg.add([self.at(1, 10), self.at(0, 99), Tick('ZZZ', 5, OPEN)], self.table)
+        bars = agg.drain()
+        self.assertEqual({b['close'] for b in bars}, {10})
+
+    def test_resumes_stored_partial_bar(self):
+        first = BarAggregator()
+        first.add([self.at(0, 10, 5), self.at(0.2, 15, 5)], self.table)
+        intraday.write_bars(first.drain())
+
+        second = BarAggregator()  # a restarted worker picks up mid-bar
+        second.add([self.at(0.5, 8, 2)], self.table)
+        intraday.write_bars(second.drain())
+        row = IntradayBar.objects.get(stock=self.stock, interval=1)
+        self.assertEqual(
+            (row.open_price, row.high_price, row.low_price, row.close_price, row.volume),
+            (Decimal('10.00'), Decimal('15.00'), Decimal('8.00'), Decimal('8.00'), 12),
+        )
+
+
+class CompactTests(PredictionTestCase):
+    def test_folds_old_sessions_into_daily_bars(self):
+        stock = make_stock('AAA', [50], start=date(2025, 1, 3))
+        agg = BarAggregator()
+        table = {'AAA': {'stock_id': stock.id}}
+        for day in (0, 1, 40):
+            base = OPEN + timedelta(days=day)
+            agg.add([Tick('AAA', 10 + day, base, 5), Tick('AAA', 12 + day, base + timedelta(minutes=1), 5),
+                     Tick('AAA', 9 + day, base + timedelta(minutes=2), 5)], table)
+        intraday.write_bars(agg.drain())
+
+        written, deleted = intraday.compact(today=date(2025, 2, 11), retention=30)
+        self.assertEqual(written, 2)
+        self.assertEqual(deleted, 2 * 4)  # three 1-minute bars and one 5-minute bar per session
+        bar = StockPriceHistory.objects.get(stock=stock, date=date(2025, 1, 2))
+        self.assertEqual(
+            (bar.open_price, bar.high_price, bar.low_price, bar.close_price, bar.volume),
+            (Decimal('10.00'), Decimal('12.00'), Decimal('9.00'), Decimal('9.00'), 15),
+        )
+        # An existing daily bar wins over the compacted one
+        self.assertEqual(StockPriceHistory.objects.get(stock=stock, date=date(2025, 1, 3)).close_price, Decimal('50.00'))
+        self.assertEqual(set(IntradayBar.objects.values_list('session', flat=True)), {date(2025, 2, 11)})
+
+    def test_chart_bars(self):
+        stock = make_stock('AAA')
+        agg = BarAggregator()
+        agg.add([Tick('AAA', 10 + i, OPEN + timedelta(minutes=i)) for i in range(7)], {'AAA': {'stock_id': stock.id}})
+        intraday.write_bars(agg.drain())
+        bars, resolution = intraday.chart_bars(stock.id, '1D')
+        self.assertEqual(resolution, '1m')
+        self.assertEqual(bars.close.tolist(), [10, 11, 12, 13, 14, 15, 16])
+        self.assertEqual(intraday.labels(bars, '1D')[:2], ['09:30', '09:31'])
+        self.assertEqual(intraday.chart_bars(stock.id, '1M'), (None, None))
+        self.assertEqual(intraday.chart_bars(stock.id, '1W'), (None, None))
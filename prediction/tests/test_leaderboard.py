@@ -0,0 +1,127 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from prediction import archive, leaderboard, user_stats
+from prediction.models import ArchivedPrediction, LeaderboardEntry, Prediction, UserPredictionStats
+
+from .base import PredictionTestCase, make_stock
+
+
+def resolved(user, stock, day, correct, resolved_at=None):
+    """A prediction resolved on `day` through the same counters the resolver updates"""
+    prediction = Prediction.objects.create(
+        user=user, stock=stock, user_prediction='up', ai_prediction='up', ai_confidence=60,
+        price_at_prediction=Decimal('100'), predicted_for_date=day,
+        actual_result='up' if correct else 'down', is_correct=correct,
+        resolved_at=resolved_at or timezone.now(),
+    )
+    user_stats.record_created([prediction])
+    leaderboard.record_resolutions([prediction])
+    user_stats.record_resolutions([prediction])
+    return prediction
+
+
+class LeaderboardTests(PredictionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.stock = make_stock('AAA')
+        self.alice = User.objects.create_user('alice', password='pw')
+        self.bob = User.objects.create_user('bob', password='pw')
+
+    def test_period_start(self):
+        day = date(2025, 3, 13)  # a Thursday
+        self.assertEqual(leaderboard.period_start('daily', day), day)
+        self.assertEqual(leaderboard.period_start('weekly', day), date(2025, 3, 10))
+        self.assertEqual(leaderboard.period_start('monthly', day), date(2025, 3, 1))
+        self.assertEqual(leaderboard.period_start('all', day), leaderboard.ALL_TIME)
+
+    def test_record_resolutions_counts_every_window(self):
+        day = date(2025, 3, 13)
+        resolved(self.alice, self.stock, day, True)
+        resolved(self.alice, self.stock, day, False)
+        entries = {e.window: (e.total, e.correct, e.accuracy) for e in LeaderboardEntry.objects.filter(user=self.alice)}
+        self.assertEqual(entries, {w: (2, 1, 50.0) for w in leaderboard.WINDOWS})
+
+    def test_top_ranks_by_accuracy_and_applies_min_total(self):
+        today = timezone.localdate()
+        for correct in (True, True, False):
+            resolved(self.alice, self.stock, today, correct)
+        for correct in (True, True, True):
+            resolved(self.bob, self.stock, today, correct)
+        ranked = [e.user.username for e in leaderboard.top('daily', min_total=3)]
+        self.assertEqual(ranked, ['bob', 'alice'])
+        self.assertEqual(list(leaderboard.top('daily', min_total=4)), [])
+        self.assertEqual(list(leaderboard.top('daily', day=today - timedelta(days=1), min_total=1)), [])
+
+    def test_rebuild_matches_incremental_entries(self):
+        for i, correct in enumerate([True, False, True, True]):
+            resolved(self.alice, self.stock, date(2025, 3, 1) + timedelta(days=i * 9), correct)
+        incremental = set(LeaderboardEntry.objects.values_list('window', 'period_start', 'total', 'correct'))
+        leaderboard.rebuild()
+        self.assertEqual(set(LeaderboardEntry.objects.values_list('window', 'period_start', 'total', 'correct')), incremental)
+
+    def test_endpoint(self):
+        today = timezone.localdate()
+        for _ in range(5):
+            resolved(self.alice, self.stock, today, True)
+        client = APIClient()
+        client.force_authenticate(self.bob)
+        response = client.get('/api/prediction/leaderboard/?window=daily')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'][0]['correct'], 5)
+
+
+class UserStatsTests(PredictionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.stock = make_stock('AAA')
+        self.user = User.objects.create_user('alice', password='pw')
+
+    def test_streaks(self):
+        for correct in (True, True, False, True):
+            resolved(self.user, self.stock, date(2025, 3, 1), correct)
+        stats = UserPredictionStats.objects.get(user=self.user)
+        self.assertEqual((stats.resolved, stats.correct, stats.accuracy), (4, 3, 75.0))
+        self.assertEqual((stats.current_streak, stats.best_streak), (1, 2))
+        self.assertEqual(stats.by_stock[str(self.stock.id)]['correct'], 3)
+
+    def test_get_stats_for_new_user(self):
+        stats = user_stats.get_stats(self.user)
+        self.assertIsNone(stats.pk)
+        self.assertEqual(stats.total, 0)
+
+
+class ArchiveTests(PredictionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.stock = make_stock('AAA')
+        self.user = User.objects.create_user('alice', password='pw')
+
+    def test_archives_only_old_resolved_predictions(self):
+        now = timezone.now()
+        old = resolved(self.user, self.stock, date(2025, 1, 1), True, resolved_at=now - timedelta(days=100))
+        recent = resolved(self.user, self.stock, date(2025, 1, 1), False, resolved_at=now - timedelta(days=5))
+        self.assertEqual(archive.archive_resolved(days=90, now=now), 1)
+        self.assertEqual(list(Prediction.objects.values_list('id', flat=True)), [recent.id])
+        self.assertTrue(ArchivedPrediction.objects.filter(id=old.id, is_correct=True).exists())
+
+    def test_archived_predictions_still_count_in_rebuilds(self):
+        now = timezone.now()
+        resolved(self.user, self.stock, date(2025, 1, 1), True, resolved_at=now - timedelta(days=100))
+        resolved(self.user, self.stock, date(2025, 1, 2), True, resolved_at=now - timedelta(days=1))
+        before = UserPredictionStats.objects.get(user=self.user)
+        archive.archive_resolved(days=90, now=now)
+        user_stats.rebuild()
+        after = UserPredictionStats.objects.get(user=self.user)
+        self.assertEqual((after.total, after.resolved, after.correct), (before.total, before.resolved, before.correct))
+
+    def test_recent_merges_archive_on_request(self):
+        now = timezone.now()
+        old = resolved(self.user, self.stock, date(2025, 1, 1), True, resolved_at=now - timedelta(days=100))
+        archive.archive_resolved(days=90, now=now)
+        self.assertEqual(archive.recent(self.user), [])
+        self.assertEqual([p.id for p in archive.recent(self.user, include_archive=True)], [old.id])
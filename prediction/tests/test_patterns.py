@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.core.cache import cache
+
+from prediction import patterns
+from prediction.models import StockPriceHistory
+from prediction.price_store import PriceSeries, price_store
+
+from .base import PredictionTestCase, START, make_stock
+
+
+def series(bars, stock_id=1, version='v1'):
+    o, h, l, c = (np.array(col, dtype=np.float64) for col in zip(*bars))
+    dates = np.datetime64(START.isoformat()) + np.arange(len(bars))
+    return PriceSeries(stock_id, version, dates, o, h, l, c, np.zeros(len(bars), dtype=np.int64))
+
+
+def random_bars(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, n))
+    open_ = close * (1 + rng.normal(0, 0.01, n))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, n))
+    return list(zip(open_, high, low, close))
+
+
+HAMMER = (10.0, 10.1, 8.0, 10.1)
+DOJI = (10.0, 11.0, 9.0, 10.0)
+ENGULFING = [(10.0, 10.2, 8.9, 9.0), (8.9, 10.6, 8.8, 10.5)]
+
+
+class DetectTests(PredictionTestCase):
+    def test_single_bar_patterns(self):
+        masks = patterns.detect(*zip(HAMMER, DOJI))
+        self.assertEqual(masks['hammer'].tolist(), [True, False])
+        self.assertEqual(masks['doji'].tolist(), [False, True])
+        self.assertFalse(masks['shooting_star'].any())
+
+    def test_engulfing_needs_previous_bar(self):
+        masks = patterns.detect(*zip(*ENGULFING))
+        self.assertEqual(masks['bullish_engulfing'].tolist(), [False, True])
+        self.assertFalse(masks['bearish_engulfing'].any())
+
+    def test_find_patterns_from_start(self):
+        s = series([DOJI] + ENGULFING)
+        self.assertEqual(patterns.find_patterns(s), [
+            {'date': '2025-01-01', 'pattern': 'doji'},
+            {'date': '2025-01-03', 'pattern': 'bullish_engulfing'},
+        ])
+        self.assertEqual(patterns.find_patterns(s, start=2), [{'date': '2025-01-03', 'pattern': 'bullish_engulfing'}])
+
+
+class CachedPatternsTests(PredictionTestCase):
+    def test_appended_bars_match_full_scan(self):
+        bars = random_bars(400, seed=3)
+        patterns.cached_patterns({1: series(bars[:300])})
+        entry = patterns.cached_patterns({1: series(bars, version='v2')})[1]
+        self.assertEqual(entry['n_bars'], 400)
+        self.assertEqual(entry['hits'], patterns.find_patterns(series(bars)))
+        self.assertTrue(entry['hits'])
+
+    def test_rewritten_history_rescans(self):
+        bars = random_bars(50, seed=4)
+        patterns.cached_patterns({1: series(bars[:-1] + [DOJI])})  # the latest bar is later restated
+        entry = patterns.cached_patterns({1: series(bars + [HAMMER], version='v2')})[1]
+        bars = bars + [HAMMER]
+        self.assertEqual(entry['hits'], patterns.find_patterns(series(bars)))
+
+    def test_fresh_entry_reused(self):
+        patterns.cached_patterns({1: series([DOJI])})
+        cache.set(patterns.CACHE_KEY.format(stock_id=1), {**cache.get(patterns.CACHE_KEY.format(stock_id=1)), 'hits': []})
+        self.assertEqual(patterns.stock_patterns(series([DOJI])), [])
+
+
+class ScanTests(PredictionTestCase):
+    def add(self, stock, bars):
+        StockPriceHistory.objects.bulk_create([
+            StockPriceHistory(
+                stock=stock, date=START + timedelta(days=i), open_price=Decimal(str(o)), high_price=Decimal(str(h)),
+                low_price=Decimal(str(l)), close_price=Decimal(str(c)), volume=0,
+            )
+            for i, (o, h, l, c) in enumerate(bars)
+        ])
+        price_store.invalidate([stock.id])
+
+    def test_latest_bar_and_day(self):
+        aaa, bbb = make_stock('AAA'), make_stock('BBB')
+        self.add(aaa, [HAMMER] + ENGULFING)
+        self.add(bbb, ENGULFING + [HAMMER])
+        ids = [aaa.id, bbb.id]
+        self.assertEqual(patterns.scan('bullish_engulfing', ids), [(aaa.id, '2025-01-03')])
+        self.assertEqual(patterns.scan('hammer', ids), [(bbb.id, '2025-01-03')])
+        self.assertEqual(patterns.scan('bullish_engulfing', ids, day='2025-01-02'), [(bbb.id, '2025-01-02')])
+
+        # A new bar bumps the stock's version, so its cached entry is refreshed
+        StockPriceHistory.objects.create(
+            stock=aaa, date=date(2025, 1, 4), open_price=10, high_price=10.1, low_price=8, close_price=10.1, volume=0,
+        )
+        self.assertEqual(patterns.scan('hammer', ids), [(aaa.id, '2025-01-04'), (bbb.id, '2025-01-03')])
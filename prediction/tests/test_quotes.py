@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.core.cache import cache
+
+from prediction import quotes
+from prediction.quotes import QUOTES_KEY, QUOTES_SEQ_KEY, Tick
+
+from .base import PredictionTestCase, make_stock
+
+
+OPEN = datetime(2025, 1, 2, 15, 0, tzinfo=dt_timezone.utc)  # 10:00 New York
+
+
+def quote(symbol='AAA', price=100.0, previous_close=None):
+    return {
+        'symbol': symbol, 'stock_id': 1, 'price': price, 'previous_close': previous_close,
+        'open': None, 'high': None, 'low': None, 'volume': 0,
+        'session': None, 'rolled': None, 'closing_price': None, 'timestamp': None,
+    }
+
+
+class ApplyTicksTests(PredictionTestCase):
+    def test_coalesces_ticks_into_session_fields(self):
+        table = {'AAA': quote(previous_close=100.0)}
+        changed = quotes.apply_ticks(table, [
+            Tick('AAA', 101.0, OPEN, 10),
+            Tick('AAA', 99.0, OPEN + timedelta(minutes=1), 5),
+            Tick('AAA', 102.0, OPEN + timedelta(minutes=2), 1),
+            Tick('ZZZ', 1.0, OPEN),
+        ])
+        self.assertEqual(changed, {'AAA'})
+        q = table['AAA']
+        self.assertEqual((q['open'], q['high'], q['low'], q['price'], q['volume']), (101.0, 102.0, 99.0, 102.0, 16))
+        self.assertEqual((q['change'], q['change_percent']), (2.0, 2.0))
+        self.assertEqual(q['session'], '2025-01-02')
+
+    def test_late_tick_ignored(self):
+        table = {'AAA': quote()}
+        quotes.apply_ticks(table, [Tick('AAA', 101.0, OPEN + timedelta(minutes=5))])
+        self.assertEqual(quotes.apply_ticks(table, [Tick('AAA', 50.0, OPEN)]), set())
+        self.assertEqual(table['AAA']['price'], 101.0)
+
+    def test_new_session_rolls_previous_bar(self):
+        table = {'AAA': quote()}
+        quotes.apply_ticks(table, [Tick('AAA', 101.0, OPEN, 10), Tick('AAA', 104.0, OPEN + timedelta(hours=1), 10)])
+        closed = []
+        quotes.apply_ticks(table, [Tick('AAA', 110.0, OPEN + timedelta(days=1), 3)], closed)
+        self.assertEqual(closed, [{
+            'stock_id': 1, 'date': '2025-01-02', 'open': 101.0, 'high': 104.0, 'low': 101.0, 'close': 104.0, 'volume': 20,
+        }])
+        q = table['AAA']
+        self.assertEqual((q['previous_close'], q['open'], q['volume'], q['session']), (104.0, 110.0, 3, '2025-01-03'))
+
+    def test_session_rolled_at_close_is_not_rolled_again(self):
+        table = {'AAA': quote()}
+        quotes.apply_ticks(table, [Tick('AAA', 101.0, OPEN)])
+        quotes.roll_session(table['AAA'])
+        quotes.apply_ticks(table, [Tick('AAA', 105.0, OPEN + timedelta(hours=8))])  # after-hours, same session
+        closed = []
+        quotes.apply_ticks(table, [Tick('AAA', 106.0, OPEN + timedelta(days=1))], closed)
+        self.assertEqual(closed, [])
+        self.assertEqual(table['AAA']['previous_close'], 101.0)
+
+
+class QuoteTableTests(PredictionTestCase):
+    def test_save_table_bumps_seq_key_and_stamps_changed(self):
+        table = {'seq': 0, 'updated_at': None, 'quotes': {'AAA': quote(), 'BBB': quote('BBB')}}
+        quotes.save_table(table, {'AAA'})
+        quotes.save_table(table, {'BBB'})
+        self.assertEqual(cache.get(QUOTES_SEQ_KEY), 2)
+        stored = cache.get(QUOTES_KEY)
+        self.assertEqual((stored['quotes']['AAA']['seq'], stored['quotes']['BBB']['seq']), (1, 2))
+
+    def test_publish_seeds_from_stock_rows(self):
+        stock = make_stock('AAA')
+        stock.current_price, stock.previous_close = Decimal('100'), Decimal('95')
+        stock.save()
+        self.assertEqual(quotes.publish([Tick('AAA', 97.0, OPEN), Tick('NOPE', 1.0, OPEN)]), {'AAA'})
+        found, updated_at = quotes.get_quotes(['AAA', 'NOPE'])
+        self.assertEqual(list(found), ['AAA'])
+        self.assertIsNotNone(updated_at)
+        payload = quotes.quote_payload(found['AAA'])
+        self.assertEqual((payload['price'], payload['previous_close'], payload['change']), (97.0, 95.0, 2.0))
+        self.assertEqual(cache.get(QUOTES_SEQ_KEY), 1)
+
+    def test_publish_without_changes_keeps_table(self):
+        self.assertEqual(quotes.publish([]), set())
+        self.assertIsNone(cache.get(QUOTES_SEQ_KEY))
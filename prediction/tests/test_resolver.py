@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+
+from prediction import user_stats
+from prediction.models import LeaderboardEntry, Prediction, UserPredictionStats
+from prediction.resolver import resolve_due_predictions
+from users.models import UserProfile
+
+from .base import PredictionTestCase, make_stock
+
+
+class ResolutionCountersTests(PredictionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('alice', password='pw')
+        self.stock = make_stock('AAA', [100, 101, 102])
+        self.target = date(2025, 1, 2)
+
+    def predict(self, direction='up', price='100'):
+        prediction = Prediction.objects.create(
+            user=self.user, stock=self.stock, user_prediction=direction, ai_prediction='up',
+            ai_confidence=60, price_at_prediction=Decimal(price), predicted_for_date=self.target,
+        )
+        user_stats.record_created([prediction])
+        return prediction
+
+    def counters(self):
+        stats = UserPredictionStats.objects.get(user=self.user)
+        entry = LeaderboardEntry.objects.get(user=self.user, window='all')
+        profile = UserProfile.objects.get(user=self.user)
+        return {
+            'stats': (stats.resolved, stats.correct),
+            'leaderboard': (entry.total, entry.correct),
+            'profile': profile.correct_predictions,
+        }
+
+    def test_resolver_counts_each_prediction_once(self):
+        self.predict('up')
+        self.predict('down')
+        self.assertEqual(resolve_due_predictions(today=date(2025, 1, 3)), 2)
+        self.assertEqual(self.counters(), {'stats': (2, 1), 'leaderboard': (2, 1), 'profile': 1})
+        # A second pass finds nothing left to resolve
+        self.assertEqual(resolve_due_predictions(today=date(2025, 1, 3)), 0)
+        self.assertEqual(self.counters(), {'stats': (2, 1), 'leaderboard': (2, 1), 'profile': 1})
+
+    def test_resolver_uses_first_close_on_or_after_target(self):
+        prediction = self.predict('up', price='101.50')
+        resolve_due_predictions(today=date(2025, 1, 3))
+        prediction.refresh_from_db()
+        self.assertEqual(prediction.actual_result, 'down')  # 101 on the target date
+        self.assertFalse(prediction.is_correct)
+
+    def test_re_resolve_keeps_result_and_counters(self):
+        prediction = self.predict('up')
+        self.assertTrue(prediction.resolve(Decimal('110')))
+        before = self.counters()
+        self.assertEqual(before, {'stats': (1, 1), 'leaderboard': (1, 1), 'profile': 1})
+
+        # A later price would flip the outcome; it must not change the stored result
+        self.assertFalse(prediction.resolve(Decimal('90')))
+        self.assertTrue(prediction.is_correct)
+        prediction.refresh_from_db()
+        self.assertEqual((prediction.actual_result, prediction.is_correct), ('up', True))
+        self.assertEqual(self.counters(), before)
+
+    def test_resolver_skips_manually_resolved(self):
+        prediction = self.predict('down')
+        Prediction.objects.get(pk=prediction.pk).resolve(Decimal('90'))
+        self.assertEqual(resolve_due_predictions(today=date(2025, 1, 3)), 0)
+        self.assertEqual(self.counters(), {'stats': (1, 1), 'leaderboard': (1, 1), 'profile': 1})
+
+    def test_stale_instance_cannot_resolve_twice(self):
+        prediction = self.predict('up')
+        stale = Prediction.objects.get(pk=prediction.pk)
+        prediction.resolve(Decimal('110'))
+        self.assertFalse(stale.resolve(Decimal('90')))
+        self.assertEqual(stale.actual_result, 'up')
+        self.assertEqual(self.counters()['stats'], (1, 1))
+
+    def test_rebuild_matches_incremental_counters(self):
+        for direction in ('up', 'down', 'up'):
+            self.predict(direction)
+        resolve_due_predictions(today=self.target + timedelta(days=1))
+        incremental = UserPredictionStats.objects.get(user=self.user)
+        user_stats.rebuild()
+        rebuilt = UserPredictionStats.objects.get(user=self.user)
+        self.assertEqual(
+            (rebuilt.total, rebuilt.resolved, rebuilt.correct, rebuilt.best_streak),
+            (incremental.total, incremental.resolved, incremental.correct, incremental.best_streak),
+        )
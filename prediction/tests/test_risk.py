@@ -0,0 +1,69 @@
+import math
+from datetime import timedelta
+
+import numpy as np
+
+from prediction import risk
+from prediction.models import StockPriceHistory, StockRiskMetrics
+
+from .base import PredictionTestCase, make_stock, random_walk
+
+
+class ComputeTests(PredictionTestCase):
+    def test_volatility_and_drawdown(self):
+        closes = np.array(random_walk(120, seed=1))
+        out = risk.compute(closes)
+        returns = closes[1:] / closes[:-1] - 1
+        self.assertEqual(out['observations'][0], 119)
+        self.assertAlmostEqual(out['volatility'][0], returns.std(ddof=1) * math.sqrt(252) * 100)
+        peak = np.maximum.accumulate(closes)
+        self.assertAlmostEqual(out['max_drawdown'][0], ((peak - closes) / peak).max() * 100)
+        self.assertTrue(out['cvar_95'][0] >= out['var_95'][0] > 0)
+        self.assertTrue(math.isnan(out['beta'][0]))
+
+    def test_beta_against_benchmark(self):
+        bench = np.array(random_walk(60, seed=2))
+        levered = 100 * np.cumprod(np.r_[1, 1 + 2 * (bench[1:] / bench[:-1] - 1)])
+        out = risk.compute(np.vstack([bench, levered]), bench[None, :])
+        self.assertAlmostEqual(out['beta'][0], 1.0)
+        self.assertAlmostEqual(out['beta'][1], 2.0)
+
+    def test_short_history_is_nan(self):
+        out = risk.compute(random_walk(10, seed=3))
+        self.assertEqual(out['observations'][0], 9)
+        self.assertTrue(all(math.isnan(out[name][0]) for name in risk.METRICS))
+
+
+class PortfolioVolatilityTests(PredictionTestCase):
+    def test_correlation_counts(self):
+        walk = random_walk(100, seed=5)
+        mirror = [200 - c for c in walk]  # moves opposite to walk
+        aaa, bbb, ccc = make_stock('AAA', walk), make_stock('BBB', walk), make_stock('CCC', mirror)
+        single = risk.compute(np.array([walk]))['volatility'][0]
+        self.assertAlmostEqual(risk.portfolio_volatility({aaa.id: 500, bbb.id: 500}), single, places=1)
+        hedged = risk.portfolio_volatility({aaa.id: 500, ccc.id: 500})
+        self.assertLess(hedged, single / 5)
+
+    def test_needs_shared_history(self):
+        aaa = make_stock('AAA', random_walk(100, seed=6))
+        bbb = make_stock('BBB', random_walk(10, seed=7))
+        self.assertIsNone(risk.portfolio_volatility({aaa.id: 100, bbb.id: 100}))
+        self.assertIsNone(risk.portfolio_volatility({aaa.id: 0}))
+        self.assertIsNotNone(risk.portfolio_volatility({aaa.id: 100, bbb.id: 0}))
+
+
+class StockRiskTests(PredictionTestCase):
+    def test_stored_row_used_until_new_bar(self):
+        stock = make_stock('AAA', random_walk(60, seed=8))
+        self.assertEqual(risk.run_risk_batch(window=252), 1)
+        StockRiskMetrics.objects.filter(stock=stock).update(volatility=123.0)
+        self.assertEqual(risk.stock_risk(stock, window=252)['volatility'], 123.0)
+
+        last = StockPriceHistory.objects.filter(stock=stock).latest('date')
+        StockPriceHistory.objects.create(
+            stock=stock, date=last.date + timedelta(days=1),
+            open_price=100, high_price=100, low_price=100, close_price=100, volume=0,
+        )
+        fresh = risk.stock_risk(stock, window=252)
+        self.assertNotEqual(fresh['volatility'], 123.0)
+        self.assertEqual(fresh['observations'], 60)
@@ -0,0 +1,53 @@
+from prediction.models import Stock
+from prediction.search import StockSearchIndex
+
+from .base import PredictionTestCase, make_stock
+
+
+class StockSearchTests(PredictionTestCase):
+    def setUp(self):
+        super().setUp()
+        for symbol, name in [
+            ('MSFT', 'Microsoft Corporation'),
+            ('MS', 'Morgan Stanley'),
+            ('MSCI', 'MSCI Inc'),
+            ('AAPL', 'Apple Inc'),
+            ('AMD', 'Advanced Micro Devices'),
+            ('MU', 'Micron Technology'),
+        ]:
+            make_stock(symbol, name=name)
+        self.index = StockSearchIndex()
+
+    def symbols(self, q, limit=20):
+        names = dict(Stock.objects.values_list('id', 'symbol'))
+        return [names[sid] for sid in self.index.search(q, limit)]
+
+    def test_exact_symbol_then_symbol_prefix(self):
+        self.assertEqual(self.symbols('ms')[:3], ['MS', 'MSCI', 'MSFT'])
+
+    def test_name_word_prefix_after_symbols(self):
+        results = self.symbols('micro')
+        self.assertEqual(set(results[:3]), {'MSFT', 'AMD', 'MU'})
+
+    def test_multi_word_query(self):
+        self.assertEqual(self.symbols('advanced micro'), ['AMD'])
+
+    def test_fuzzy_name_match(self):
+        self.assertIn('MSFT', self.symbols('microsft'))
+
+    def test_substring_match(self):
+        self.assertEqual(self.symbols('SFT'), ['MSFT'])
+        self.assertEqual(self.symbols('stanl'), ['MS'])
+
+    def test_limit(self):
+        self.assertEqual(len(self.symbols('m', limit=2)), 2)
+
+    def test_blank_query(self):
+        self.assertEqual(self.symbols('  '), [])
+
+    def test_rename_invalidates_index(self):
+        self.assertEqual(self.symbols('apple'), ['AAPL'])
+        Stock.objects.filter(symbol='AAPL').update(name='Pear Computer')
+        StockSearchIndex.invalidate()
+        self.assertEqual(self.symbols('apple'), [])
+        self.assertEqual(self.symbols('pear'), ['AAPL'])
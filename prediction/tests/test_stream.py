@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from finance_ai.asgi import CancelOnDisconnect
+from prediction import quotes, stream
+
+from .base import AsyncPredictionTestCase, PredictionTestCase, make_stock
+
+
+class StreamTicketTests(PredictionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('alice', password='pw')
+
+    def test_ticket_is_single_use(self):
+        ticket = stream.issue_ticket(self.user.id)
+        self.assertEqual(stream.redeem_ticket(ticket), self.user.id)
+        self.assertIsNone(stream.redeem_ticket(ticket))
+
+    def test_unknown_ticket(self):
+        self.assertIsNone(stream.redeem_ticket('nope'))
+
+    def test_ticket_endpoint_requires_auth(self):
+        self.assertEqual(APIClient().post('/api/prediction/stream/ticket/').status_code, 401)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post('/api/prediction/stream/ticket/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(stream.redeem_ticket(response.json()['data']['ticket']), self.user.id)
+
+    def test_stream_is_unavailable_under_wsgi(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/api/prediction/stream/').status_code, 503)
+
+
+class StreamViewTests(AsyncPredictionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('alice', password='pw')
+
+    async def open_stream(self, query):
+        client = AsyncClient()
+        response = await client.get(f'/api/prediction/stream/?{query}')
+        if response.status_code == 200:
+            await response.streaming_content.aclose()
+        return response.status_code
+
+    def test_ticket_opens_one_stream(self):
+        ticket = stream.issue_ticket(self.user.id)
+        self.assertEqual(asyncio.run(self.open_stream(f'ticket={ticket}')), 200)
+        self.assertEqual(asyncio.run(self.open_stream(f'ticket={ticket}')), 401)
+
+    def test_access_token_in_query_is_rejected(self):
+        token = str(AccessToken.for_user(self.user))
+        self.assertEqual(asyncio.run(self.open_stream(f'token={token}')), 401)
+
+
+class EventStreamTests(AsyncPredictionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('alice', password='pw')
+        make_stock('AAA', [100])
+        quotes.publish([quotes.Tick('AAA', 101.0, quotes._parse_timestamp('2025-01-02T15:00:00+00:00'))])
+
+    def collect(self, **kwargs):
+        async def run():
+            return [frame async for frame in stream.event_stream(self.user.id, ['AAA'], poll_seconds=0.01, **kwargs)]
+        return asyncio.run(run())
+
+    def test_quote_frames_carry_sequence_ids(self):
+        frames = self.collect(max_seconds=0.05)
+        self.assertTrue(frames[0].startswith('retry:'))
+        quote = [f for f in frames if 'event: quote' in f]
+        self.assertEqual(len(quote), 1)
+        seq = cache.get(quotes.QUOTES_SEQ_KEY)
+        self.assertIn(f'id: {seq}\n', quote[0])
+        self.assertEqual(json.loads(quote[0].split('data: ', 1)[1])['price'], 101.0)
+
+    def test_resume_skips_seen_events(self):
+        seq = cache.get(quotes.QUOTES_SEQ_KEY)
+        frames = self.collect(last_event_id=seq, max_seconds=0.05)
+        self.assertFalse([f for f in frames if 'event: quote' in f])
+
+    def test_unchanged_table_is_fetched_once(self):
+        reads = []
+        original = cache.aget
+
+        async def counting_aget(key, *args, **kwargs):
+            reads.append(key)
+            return await original(key, *args, **kwargs)
+
+        cache.aget = counting_aget
+        try:
+            self.collect(max_seconds=0.1)
+        finally:
+            del cache.aget
+        self.assertEqual(reads.count(quotes.QUOTES_KEY), 1)
+        self.assertGreater(reads.count(quotes.QUOTES_SEQ_KEY), 1)
+
+
+class CancelOnDisconnectTests(PredictionTestCase):
+    def test_disconnect_cancels_streaming_app(self):
+        finished = []
+
+        async def app(scope, receive, send):
+            try:
+                while True:
+                    await asyncio.sleep(0.01)
+            finally:
+                finished.append(True)
+
+        async def run():
+            messages = asyncio.Queue()
+            await messages.put({'type': 'http.request', 'body': b'', 'more_body': False})
+            task = asyncio.ensure_future(CancelOnDisconnect(app)(
+                {'type': 'http', 'path': '/api/prediction/stream/'}, messages.get, None,
+            ))
+            await asyncio.sleep(0.05)
+            await messages.put({'type': 'http.disconnect'})
+            await asyncio.wait_for(task, 1)
+
+        asyncio.run(run())
+        self.assertEqual(finished, [True])
+
+    def test_other_paths_pass_through(self):
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append(await receive())
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        asyncio.run(CancelOnDisconnect(app)({'type': 'http', 'path': '/api/'}, receive, None))
+        self.assertEqual(seen[0]['type'], 'http.request')
@@ -7,15 +7,23 @@ from . import views
 urlpatterns = [
     path('stocks/', views.StockListView.as_view(), name='stock_list'),
     path('stocks/compare/', views.stock_compare_view, name='stock_compare'),
+    path('patterns/scan/', views.pattern_scan_view, name='pattern_scan'),
+    path('quotes/', views.quotes_view, name='quotes'),
+    path('stream/', views.price_stream_view, name='price_stream'),
+    path('stream/ticket/', views.stream_ticket_view, name='price_stream_ticket'),
     path('stocks/<str:symbol>/', views.StockDetailView.as_view(), name='stock_detail'),
     path('stocks/<str:symbol>/chart/', views.stock_chart_data_view, name='stock_chart'),
     path('stocks/<str:symbol>/indicators/', views.stock_indicators_view, name='stock_indicators'),
     path('stocks/<str:symbol>/sentiment/', views.stock_sentiment_view, name='stock_sentiment'),
+    path('stocks/<str:symbol>/live/', views.stock_live_view, name='stock_live'),
     path('stocks/<str:symbol>/risk/', views.stock_risk_view, name='stock_risk'),
+    path('stocks/<str:symbol>/simulate/', views.stock_simulation_view, name='stock_simulate'),
     path('make/', views.MakePredictionView.as_view(), name='make_prediction'),
+    path('make/batch/', views.BatchPredictionView.as_view(), name='make_prediction_batch'),
     path('history/', views.PredictionHistoryView.as_view(), name='prediction_history'),
     path('stats/', views.prediction_stats_view, name='prediction_stats'),
     path('backtest/', views.backtest_view, name='backtest'),
+    path('backtest/jobs/<int:job_id>/', views.backtest_job_view, name='backtest_job'),
     path('leaderboard/', views.leaderboard_view, name='leaderboard'),
     path('resolve/<int:prediction_id>/', views.resolve_prediction_view, name='resolve_prediction'),
 ]
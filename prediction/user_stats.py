@@ -0,0 +1,140 @@
+"""
+Precomputed per-user prediction statistics for FinanceAI
+
+One UserPredictionStats row per user holds the counters the stats and
+dashboard endpoints show (total, resolved, correct, accuracy, streaks and
+per-horizon / per-stock breakdowns). Rows are updated under a row lock in the
+same transaction that creates or resolves predictions, so reads never scan
+the prediction table. rebuild() recomputes them from scratch.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import archive
+from .models import Stock, UserPredictionStats
+
+
+def _accuracy(correct, resolved):
+    return round(correct / resolved * 100, 2) if resolved else 0
+
+
+def horizon_days(prediction):
+    """Days between the prediction being made and its target date"""
+    return (prediction.predicted_for_date - prediction.created_at.date()).days
+
+
+def _bucket(breakdown, key):
+    return breakdown.setdefault(str(key), {'total': 0, 'resolved': 0, 'correct': 0})
+
+
+def _locked_rows(user_ids):
+    """{user_id: stats row} locked for update, creating missing rows; call inside a transaction"""
+    user_ids = sorted(set(user_ids))
+    UserPredictionStats.objects.bulk_create(
+        [UserPredictionStats(user_id=u) for u in user_ids], ignore_conflicts=True
+    )
+    return {
+        row.user_id: row
+        for row in UserPredictionStats.objects.select_for_update().filter(user_id__in=user_ids).order_by('user_id')
+    }
+
+
+def record_created(predictions):
+    """Count new predictions; call inside the transaction that created them"""
+    by_user = defaultdict(list)
+    for p in predictions:
+        by_user[p.user_id].append(p)
+    if not by_user:
+        return
+    rows = _locked_rows(by_user)
+    now = timezone.now()
+    for user_id, preds in by_user.items():
+        row = rows[user_id]
+        row.updated_at = now  # bulk_update skips auto_now
+        row.total += len(preds)
+        for p in preds:
+            _bucket(row.by_horizon, horizon_days(p))['total'] += 1
+            _bucket(row.by_stock, p.stock_id)['total'] += 1
+    UserPredictionStats.objects.bulk_update(rows.values(), ['total', 'by_horizon', 'by_stock', 'updated_at'])
+
+
+def _apply_resolution(row, p):
+    row.resolved += 1
+    horizon = _bucket(row.by_horizon, horizon_days(p))
+    stock = _bucket(row.by_stock, p.stock_id)
+    horizon['resolved'] += 1
+    stock['resolved'] += 1
+    if p.is_correct:
+        row.correct += 1
+        horizon['correct'] += 1
+        stock['correct'] += 1
+        row.current_streak += 1
+        row.best_streak = max(row.best_streak, row.current_streak)
+    else:
+        row.current_streak = 0
+
+
+def record_resolutions(predictions):
+    """Count newly resolved predictions (in resolution order); call inside a transaction"""
+    by_user = defaultdict(list)
+    for p in predictions:
+        by_user[p.user_id].append(p)
+    if not by_user:
+        return
+    rows = _locked_rows(by_user)
+    now = timezone.now()
+    for user_id, preds in by_user.items():
+        row = rows[user_id]
+        row.updated_at = now
+        for p in sorted(preds, key=lambda p: p.id):
+            _apply_resolution(row, p)
+        row.accuracy = _accuracy(row.correct, row.resolved)
+    UserPredictionStats.objects.bulk_update(
+        rows.values(),
+        ['resolved', 'correct', 'accuracy', 'current_streak', 'best_streak', 'by_horizon', 'by_stock', 'updated_at'],
+    )
+
+
+def rebuild(user_ids=None):
+    """Recompute stats rows from the active and archived predictions; returns the number of rows written"""
+    rows = {}
+    # Active and archived predictions, resolved ones in the order they were resolved (for the streak)
+    preds = archive.scan(
+        ['id', 'user_id', 'stock_id', 'is_correct', 'created_at', 'predicted_for_date', 'resolved_at'],
+        user_ids=user_ids,
+    )
+    for p in preds:
+        row = rows.get(p.user_id)
+        if row is None:
+            row = rows[p.user_id] = UserPredictionStats(user_id=p.user_id, by_horizon={}, by_stock={})
+        row.total += 1
+        _bucket(row.by_horizon, horizon_days(p))['total'] += 1
+        _bucket(row.by_stock, p.stock_id)['total'] += 1
+        if p.is_correct is not None:
+            _apply_resolution(row, p)
+    for row in rows.values():
+        row.accuracy = _accuracy(row.correct, row.resolved)
+
+    with transaction.atomic():
+        stale = UserPredictionStats.objects.all()
+        if user_ids is not None:
+            stale = stale.filter(user_id__in=user_ids)
+        stale.delete()
+        UserPredictionStats.objects.bulk_create(rows.values(), batch_size=1000)
+    return len(rows)
+
+
+def get_stats(user):
+    """The user's stats row (an unsaved empty one if they have never predicted)"""
+    return UserPredictionStats.objects.filter(user=user).first() or UserPredictionStats(user=user)
+
+
+def stock_breakdown(row):
+    """by_stock keyed by symbol instead of stock id"""
+    symbols = dict(Stock.objects.filter(id__in=[int(k) for k in row.by_stock]).values_list('id', 'symbol'))
+    return {
+        symbols[int(sid)]: counts
+        for sid, counts in row.by_stock.items() if int(sid) in symbols
+    }
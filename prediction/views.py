@@ -1,171 +1,137 @@
 """
 Prediction views for FinanceAI
 """
-import random
 from datetime import datetime, timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.decorators import method_decorator
 from rest_framework import status, generics
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes, throttle_classes
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Count, Avg, Q
-
-from .models import Stock, Prediction, StockPriceHistory, AIPredictionModel, MarketIndicator
+from rest_framework.throttling import UserRateThrottle
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from django.db import transaction
+from django.db.models import Count, Avg, F
+
+from .models import (
+    Stock, Prediction, AIPredictionModel, LatestIndicator,
+    BacktestResult, ArchivedPrediction
+)
 from .serializers import (
     StockSerializer, PredictionSerializer, MakePredictionSerializer,
-    StockPriceHistorySerializer, PredictionStatsSerializer
+    PredictionStatsSerializer, BacktestSerializer, BatchPredictionSerializer
+)
+from . import (
+    ai_signal, archive, backtest_jobs, compare, evaluation, intraday, leaderboard, patterns, quotes, risk, simulation,
+    stream, user_stats,
 )
+from .backtest import normalize_params
+from .conditional import conditional_on_bars, conditional_on_indicators
+from .price_store import chart_bars, price_store
+from .renderers import COLUMNAR_RENDERERS, wants_columns
+from .search import stock_index
 from users.models import UserActivity, UserProfile
 
 
-def resolve_predictions_from_history(predictions_queryset):
-    """
-    For any prediction without actual_result where predicted_for_date has passed,
-    look up closing price from StockPriceHistory (on or after predicted_for_date),
-    set actual_result and is_correct, and save.
-    """
-    today = timezone.now().date()
-    to_resolve = [
-        p for p in predictions_queryset
-        if p.actual_result is None and p.predicted_for_date <= today
-    ]
-    if not to_resolve:
-        return
-    stock_ids = list({p.stock_id for p in to_resolve})
-    dates = list({p.predicted_for_date for p in to_resolve})
-    # Exact date match first
-    history = StockPriceHistory.objects.filter(
-        stock_id__in=stock_ids,
-        date__in=dates
-    ).values_list('stock_id', 'date', 'close_price')
-    price_map = {(sid, d): float(c) for sid, d, c in history}
-    # For any still missing: use first close on or after predicted_for_date
-    for p in to_resolve:
-        key = (p.stock_id, p.predicted_for_date)
-        if key in price_map:
-            continue
-        first_after = StockPriceHistory.objects.filter(
-            stock_id=p.stock_id,
-            date__gte=p.predicted_for_date,
-            date__lte=today
-        ).order_by('date').values_list('date', 'close_price').first()
-        if first_after:
-            _, close_price = first_after
-            price_map[key] = float(close_price)
-    for p in to_resolve:
-        key = (p.stock_id, p.predicted_for_date)
-        if key not in price_map:
-            continue
-        actual_price = price_map[key]
-        price_at = float(p.price_at_prediction)
-        actual_result = 'up' if actual_price >= price_at else 'down'
-        is_correct = (p.user_prediction == actual_result)
-        p.actual_result = actual_result
-        p.is_correct = is_correct
-        p.resolved_at = timezone.now()
-        p.save(update_fields=['actual_result', 'is_correct', 'resolved_at'])
-        try:
-            profile = UserProfile.objects.get(user_id=p.user_id)
-            if is_correct:
-                profile.correct_predictions = (profile.correct_predictions or 0) + 1
-            profile.save(update_fields=['correct_predictions'])
-        except UserProfile.DoesNotExist:
-            pass
-    # Fallback: resolve using stock current_price when no history (so UI shows something)
-    still_pending = [p for p in to_resolve if p.actual_result is None]
-    for p in still_pending:
-        try:
-            stock = Stock.objects.get(id=p.stock_id)
-            actual_price = float(stock.current_price)
-            price_at = float(p.price_at_prediction)
-            if price_at <= 0:
-                continue
-            actual_result = 'up' if actual_price >= price_at else 'down'
-            is_correct = (p.user_prediction == actual_result)
-            p.actual_result = actual_result
-            p.is_correct = is_correct
-            p.resolved_at = timezone.now()
-            p.save(update_fields=['actual_result', 'is_correct', 'resolved_at'])
-            try:
-                profile = UserProfile.objects.get(user_id=p.user_id)
-                if is_correct:
-                    profile.correct_predictions = (profile.correct_predictions or 0) + 1
-                profile.save(update_fields=['correct_predictions'])
-            except UserProfile.DoesNotExist:
-                pass
-        except Stock.DoesNotExist:
-            pass
+def _chart_bars(request, stock_id):
+    """(bars, resolution) for the request's range / resolution: stored intraday bars for 1D, else daily"""
+    range_param = (request.query_params.get('range') or '1M').upper()
+    resolution = request.query_params.get('resolution')
+    bars, resolution_used = intraday.chart_bars(stock_id, range_param, resolution)
+    if bars is None:
+        bars, resolution_used = chart_bars(price_store.get(stock_id), range_param, resolution)
+    return bars, resolution_used
+
+
+class StockListPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
 
 
 class StockListView(generics.ListAPIView):
-    """List all available stocks, with optional search by symbol or name"""
-    queryset = Stock.objects.all()
+    """
+    List available stocks, paginated (page, page_size).
+    With ?q= returns ranked typeahead matches from the in-memory search index
+    (exact symbol, symbol prefix, name word, fuzzy name); limit defaults to 20.
+    """
+    queryset = Stock.objects.order_by('symbol')
     serializer_class = StockSerializer
     permission_classes = [IsAuthenticated]
-    
-    def get_queryset(self):
-        qs = super().get_queryset()
-        q = (self.request.query_params.get('q') or '').strip()
-        if q:
-            qs = qs.filter(
-                Q(symbol__icontains=q) | Q(name__icontains=q)
-            )[:20]
-        return qs
+    pagination_class = StockListPagination
     
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        q = (request.query_params.get('q') or '').strip()
+        if q:
+            try:
+                limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+            except ValueError:
+                limit = 20
+            ids = stock_index.search(q, limit=limit)
+            by_id = Stock.objects.in_bulk(ids)
+            serializer = self.get_serializer([by_id[i] for i in ids if i in by_id], many=True)
+            return Response({
+                'status': 'success',
+                'data': serializer.data
+            })
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
         return Response({
             'status': 'success',
-            'data': serializer.data
+            'data': serializer.data,
+            'pagination': {
+                'count': self.paginator.page.paginator.count,
+                'page': self.paginator.page.number,
+                'next': self.paginator.get_next_link(),
+                'previous': self.paginator.get_previous_link(),
+            }
         })
 
 
 class StockDetailView(generics.RetrieveAPIView):
-    """Get stock details with price history (optional range: 1D, 1W, 1M, 1Y)"""
+    """
+    Get stock details with price history.
+    Optional range (1D, 1W, 1M, 3M, 1Y, 2Y, 5Y, 10Y, MAX) and resolution (1m, 5m, daily, weekly, monthly);
+    1D uses stored 1-minute bars when there are any, long ranges default to weekly / monthly
+    bars, and all are capped at CHART_MAX_POINTS.
+    ?format=columnar / packed return the bars once as `columns` (see prediction.renderers).
+    """
     queryset = Stock.objects.all()
     serializer_class = StockSerializer
     permission_classes = [IsAuthenticated]
+    renderer_classes = COLUMNAR_RENDERERS
     lookup_field = 'symbol'
     
+    @method_decorator(conditional_on_bars)
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = self.get_serializer(instance)
-        range_param = (request.query_params.get('range') or '1M').upper()
-        range_days = {'1D': 1, '1W': 7, '1M': 30, '3M': 90, '1Y': 365}.get(range_param, 30)
-        price_history = StockPriceHistory.objects.filter(
-            stock=instance
-        ).order_by('-date')[:range_days]
-        price_history = list(reversed(price_history))
+        bars, resolution = _chart_bars(request, instance.id)
         data = serializer.data
-        data['price_history'] = StockPriceHistorySerializer(price_history, many=True).data
-        data['ohlc'] = [
-            {'date': ph.date.strftime('%Y-%m-%d'), 'o': float(ph.open_price), 'h': float(ph.high_price),
-             'l': float(ph.low_price), 'c': float(ph.close_price), 'v': ph.volume}
-            for ph in price_history
-        ]
-        data['candlestick_patterns'] = self._detect_patterns(price_history)
+        data['resolution'] = resolution
+        if wants_columns(request):
+            data['columns'] = bars.columns()
+        else:
+            data['price_history'] = bars.price_history()
+            data['ohlc'] = bars.ohlc()
+        data['candlestick_patterns'] = self._detect_patterns(instance.id, bars, resolution)
         return Response({'status': 'success', 'data': data})
     
-    def _detect_patterns(self, price_history):
-        """Simple candlestick pattern detection (hammer, doji, engulfing, shooting_star)"""
-        patterns = []
-        for i, ph in enumerate(price_history):
-            o, h, l, c = float(ph.open_price), float(ph.high_price), float(ph.low_price), float(ph.close_price)
-            body = abs(c - o)
-            full_range = h - l if h > l else 0.0001
-            lower_wick = min(o, c) - l
-            upper_wick = h - max(o, c)
-            # Hammer: small body at top, long lower wick
-            if full_range > 0 and body / full_range < 0.35 and lower_wick > 2 * body and upper_wick < body:
-                patterns.append({'date': ph.date.strftime('%Y-%m-%d'), 'pattern': 'hammer'})
-            # Doji: very small body
-            elif full_range > 0 and body / full_range < 0.1:
-                patterns.append({'date': ph.date.strftime('%Y-%m-%d'), 'pattern': 'doji'})
-            # Shooting star: small body at bottom, long upper wick
-            elif full_range > 0 and body / full_range < 0.35 and upper_wick > 2 * body and lower_wick < body:
-                patterns.append({'date': ph.date.strftime('%Y-%m-%d'), 'pattern': 'shooting_star'})
-        return patterns
+    def _detect_patterns(self, stock_id, bars, resolution):
+        """Candlestick patterns (see prediction.patterns) on the daily / weekly / monthly bars being returned"""
+        if not len(bars) or resolution in intraday.RESOLUTIONS:
+            return []
+        if resolution != 'daily':
+            return patterns.find_patterns(bars)
+        first = bars.date_strings()[0]
+        return [hit for hit in patterns.stock_patterns(price_store.get(stock_id)) if hit['date'] >= first]
 
 
 class MakePredictionView(generics.CreateAPIView):
@@ -193,39 +159,39 @@ class MakePredictionView(generics.CreateAPIView):
         # Generate AI prediction (pass model_type for explanation text)
         ai_prediction_data = self.generate_ai_prediction(stock, model_type)
         
-        # Build predicted 7-day (or horizon) price path for chart
+        # Build predicted 7-day (or horizon) price path for chart, plus Monte Carlo bands around it
         predicted_path = self._predict_price_path(stock, ai_prediction_data['prediction'], ai_prediction_data['confidence'], horizon)
+        price_bands = simulation.price_bands(stock, horizon)
         
-        # Create prediction
-        prediction = Prediction.objects.create(
-            user=request.user,
-            stock=stock,
-            user_prediction=user_prediction,
-            ai_prediction=ai_prediction_data['prediction'],
-            ai_confidence=ai_prediction_data['confidence'],
-            ai_explanation=ai_prediction_data['explanation'],
-            price_at_prediction=stock.current_price,
-            predicted_for_date=timezone.now().date() + timedelta(days=horizon)
-        )
+        with transaction.atomic():
+            # Create prediction
+            prediction = Prediction.objects.create(
+                user=request.user,
+                stock=stock,
+                user_prediction=user_prediction,
+                ai_prediction=ai_prediction_data['prediction'],
+                ai_confidence=ai_prediction_data['confidence'],
+                ai_explanation=ai_prediction_data['explanation'],
+                price_at_prediction=stock.current_price,
+                predicted_for_date=timezone.now().date() + timedelta(days=horizon)
+            )
 
-        # Record activity for prediction history
-        UserActivity.objects.create(
-            user=request.user,
-            activity_type='prediction',
-            description=f'Predicted {stock_symbol} would go {user_prediction}',
-            metadata={
-                'stock_symbol': stock_symbol,
-                'user_prediction': user_prediction,
-                'ai_prediction': ai_prediction_data['prediction'],
-                'prediction_id': prediction.id
-            }
-        )
+            # Record activity for prediction history
+            UserActivity.objects.create(
+                user=request.user,
+                activity_type='prediction',
+                description=f'Predicted {stock_symbol} would go {user_prediction}',
+                metadata={
+                    'stock_symbol': stock_symbol,
+                    'user_prediction': user_prediction,
+                    'ai_prediction': ai_prediction_data['prediction'],
+                    'prediction_id': prediction.id
+                }
+            )
 
-        # Update user profile (if profile exists)
-        profile = getattr(request.user, 'profile', None)
-        if profile is not None:
-            profile.total_predictions += 1
-            profile.save()
+            # Update user profile and stats row
+            UserProfile.objects.filter(user=request.user).update(total_predictions=F('total_predictions') + 1)
+            user_stats.record_created([prediction])
         
         return Response({
             'status': 'success',
@@ -236,6 +202,7 @@ class MakePredictionView(generics.CreateAPIView):
                 'ai_explanation': ai_prediction_data['explanation'],
                 'model_used': model_type,
                 'predicted_path': predicted_path,
+                'price_bands': price_bands,
                 'trend': 'bullish' if ai_prediction_data['prediction'] == 'up' else 'bearish'
             }
         }, status=status.HTTP_201_CREATED)
@@ -256,194 +223,95 @@ class MakePredictionView(generics.CreateAPIView):
     def generate_ai_prediction(self, stock, model_type='linear'):
         """
         Generate a richer AI prediction using recent price history + market indicators
-        (RSI, MACD, EMA/SMA, volume, sentiment) when available.
+        (RSI, MACD, EMA/SMA, volume, sentiment) when available. Memoized per data version
+        (see prediction.ai_signal).
         """
-        # --- Price history (last 10 days) ---
-        price_history = StockPriceHistory.objects.filter(
-            stock=stock
-        ).order_by('-date')[:10]
-
-        prices = [float(ph.close_price) for ph in price_history]
-        momentum = 0.0
-        trend_score = 0.0
-        volatility = 0.0
-        factors = []
-
-        if len(prices) >= 5:
-            # Simple short vs long moving-average comparison
-            recent_avg = sum(prices[:3]) / 3
-            older_avg = sum(prices[-3:]) / 3
-
-            if older_avg:
-                momentum = (prices[0] - prices[-1]) / prices[-1]
-
-            if recent_avg > older_avg * 1.01:
-                trend_score += 1.0
-                factors.append(
-                    f"short‑term price is trading above its recent average "
-                    f"({recent_avg:.2f} vs {older_avg:.2f}), indicating an upward trend"
-                )
-            elif recent_avg < older_avg * 0.99:
-                trend_score -= 1.0
-                factors.append(
-                    f"short‑term price is trading below its recent average "
-                    f"({recent_avg:.2f} vs {older_avg:.2f}), indicating a weakening trend"
-                )
+        return ai_signal.get_signal(stock, model_type)
 
-            # Price momentum
-            if momentum > 0.03:
-                trend_score += 2.0
-                factors.append(f"price momentum is strongly positive at {momentum:.2%}")
-            elif momentum < -0.03:
-                trend_score -= 2.0
-                factors.append(f"price momentum is strongly negative at {momentum:.2%}")
-            elif abs(momentum) > 0.01:
-                trend_score += 1.0 if momentum > 0 else -1.0
-                factors.append(f"price momentum is mildly {'positive' if momentum > 0 else 'negative'} at {momentum:.2%}")
-
-            # Volatility (standard deviation of returns)
-            if len(prices) >= 6:
-                returns = []
-                for i in range(1, len(prices)):
-                    if prices[i - 1]:
-                        returns.append((prices[i] - prices[i - 1]) / prices[i - 1])
-                if returns:
-                    mean_ret = sum(returns) / len(returns)
-                    var = sum((r - mean_ret) ** 2 for r in returns) / len(returns)
-                    volatility = var ** 0.5
-                    if volatility > 0.04:
-                        factors.append(
-                            f"recent volatility is elevated (~{volatility:.2%}), so short‑term moves can be sharp"
-                        )
-
-        # --- Market indicators (latest per type) ---
-        indicator_qs = MarketIndicator.objects.filter(stock=stock).order_by('-calculated_at')
-        latest_indicators = {}
-        for ind in indicator_qs:
-            if ind.indicator_type not in latest_indicators:
-                latest_indicators[ind.indicator_type] = ind
-
-        score = trend_score
-
-        # RSI: <30 oversold (bullish), >70 overbought (bearish)
-        rsi = latest_indicators.get('rsi')
-        if rsi is not None:
-            rsi_val = float(rsi.value)
-            if rsi_val < 30:
-                score += 1.5
-                factors.append(f"RSI is {rsi_val:.1f} (oversold), which is typically bullish")
-            elif rsi_val > 70:
-                score -= 1.5
-                factors.append(f"RSI is {rsi_val:.1f} (overbought), which is typically bearish")
-            else:
-                factors.append(f"RSI is neutral around {rsi_val:.1f}")
-
-        # MACD: positive vs negative
-        macd = latest_indicators.get('macd')
-        if macd is not None:
-            macd_val = float(macd.value)
-            if macd_val > 0:
-                score += 1.0
-                factors.append("MACD is above zero, supporting a bullish bias")
-            elif macd_val < 0:
-                score -= 1.0
-                factors.append("MACD is below zero, supporting a bearish bias")
-
-        # EMA/SMA: price vs moving average
-        ema = latest_indicators.get('ema') or latest_indicators.get('sma')
-        if ema is not None and prices:
-            ma_val = float(ema.value)
-            last_price = prices[0]
-            if last_price > ma_val * 1.01:
-                score += 1.0
-                factors.append(
-                    f"price is trading above its moving average ({last_price:.2f} vs {ma_val:.2f}), "
-                    f"a bullish technical signal"
-                )
-            elif last_price < ma_val * 0.99:
-                score -= 1.0
-                factors.append(
-                    f"price is trading below its moving average ({last_price:.2f} vs {ma_val:.2f}), "
-                    f"a bearish technical signal"
-                )
 
-        # Volume: unusually high volume can confirm moves
-        volume_ind = latest_indicators.get('volume')
-        if volume_ind is not None:
-            vol_val = float(volume_ind.value)
-            if vol_val > 1.2:
-                score += 0.5
-                factors.append("recent volume is above average, confirming the current move")
-            elif vol_val < 0.8:
-                factors.append("recent volume is below average, so signals are weaker")
-
-        # Sentiment: simple positive/negative tilt
-        sentiment_ind = latest_indicators.get('sentiment')
-        if sentiment_ind is not None:
-            sent_val = float(sentiment_ind.value)
-            if sent_val > 0.2:
-                score += 1.0
-                factors.append("news / sentiment data is moderately positive")
-            elif sent_val < -0.2:
-                score -= 1.0
-                factors.append("news / sentiment data is moderately negative")
-
-        # --- Final decision: map score to direction + confidence ---
-        if not prices and not latest_indicators:
-            # Not enough data, keep behaviour reasonable but transparent
-            prediction = 'up' if random.random() > 0.5 else 'down'
-            confidence = random.randint(60, 70)
-            explanation = (
-                f"There is very limited recent data available for {stock.symbol}. "
-                f"The AI is making a {prediction}ward guess with only moderate confidence. "
-                f"Treat this as a learning example, not as trading advice."
-            )
-        else:
-            if score >= 2.0:
-                prediction = 'up'
-            elif score <= -2.0:
-                prediction = 'down'
-            else:
-                # If score is small, fall back to momentum sign or neutral bias
-                if momentum > 0.0:
-                    prediction = 'up'
-                elif momentum < 0.0:
-                    prediction = 'down'
-                else:
-                    prediction = 'up' if random.random() > 0.5 else 'down'
-
-            strength = min(max(abs(score), 0.5), 4.0)
-            base_conf = 55
-            # Map strength 0.5‑4.0 roughly to +5‑30 points
-            confidence = base_conf + int((strength / 4.0) * 30)
-            confidence = max(55, min(confidence, 90))
-
-            explanation_parts = [
-                f"For {stock.symbol}, the AI sees a net {'bullish' if prediction == 'up' else 'bearish'} score of {score:.2f} "
-                f"based on recent price action and technical indicators."
-            ]
-            if factors:
-                explanation_parts.append("Key factors influencing this view include: " + "; ".join(factors) + ".")
-            if volatility > 0.04:
-                explanation_parts.append(
-                    "Because recent volatility is high, short‑term moves can be larger than usual. "
-                    "Position sizing and risk management are important."
+class BatchPredictionView(generics.CreateAPIView):
+    """Make up to 50 predictions in one request (contest mode / power users)"""
+    serializer_class = BatchPredictionSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['predictions']
+        
+        stocks = Stock.objects.in_bulk({item['stock_symbol'] for item in items}, field_name='symbol')
+        missing = sorted({item['stock_symbol'] for item in items} - set(stocks))
+        if missing:
+            return Response({
+                'status': 'error',
+                'message': f"Stock(s) not found: {', '.join(missing)}"
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        signals = ai_signal.get_signals(list(stocks.values()))
+        today = timezone.now().date()
+        rows = []
+        for item in items:
+            stock = stocks[item['stock_symbol']]
+            signal = ai_signal.with_model(signals[stock.id], item['model_type'])
+            rows.append((item, stock, signal))
+        
+        with transaction.atomic():
+            predictions = Prediction.objects.bulk_create([
+                Prediction(
+                    user=request.user,
+                    stock=stock,
+                    user_prediction=item['prediction'],
+                    ai_prediction=signal['prediction'],
+                    ai_confidence=signal['confidence'],
+                    ai_explanation=signal['explanation'],
+                    price_at_prediction=stock.current_price,
+                    predicted_for_date=today + timedelta(days=item['horizon'])
+                )
+                for item, stock, signal in rows
+            ])
+            UserActivity.objects.bulk_create([
+                UserActivity(
+                    user=request.user,
+                    activity_type='prediction',
+                    description=f"Predicted {stock.symbol} would go {item['prediction']}",
+                    metadata={
+                        'stock_symbol': stock.symbol,
+                        'user_prediction': item['prediction'],
+                        'ai_prediction': signal['prediction'],
+                        'prediction_id': prediction.id
+                    }
                 )
-            explanation_parts.append(
-                "This is an educational signal only and not personalized investment advice. "
-                f"Model: {model_type.upper()}."
+                for prediction, (item, stock, signal) in zip(predictions, rows)
+            ])
+            UserProfile.objects.filter(user=request.user).update(
+                total_predictions=F('total_predictions') + len(predictions)
             )
-            explanation = " ".join(explanation_parts)
-
-        return {
-            'prediction': prediction,
-            'confidence': confidence,
-            'explanation': explanation
-        }
+            user_stats.record_created(predictions)
+        
+        return Response({
+            'status': 'success',
+            'data': {
+                'count': len(predictions),
+                'predictions': [
+                    {
+                        'prediction': PredictionSerializer(prediction).data,
+                        'ai_prediction': signal['prediction'],
+                        'ai_confidence': signal['confidence'],
+                        'ai_explanation': signal['explanation'],
+                        'model_used': item['model_type'],
+                        'trend': 'bullish' if signal['prediction'] == 'up' else 'bearish'
+                    }
+                    for prediction, (item, stock, signal) in zip(predictions, rows)
+                ]
+            }
+        }, status=status.HTTP_201_CREATED)
 
 
 class PredictionHistoryView(generics.ListAPIView):
-    """Get user's prediction history"""
+    """
+    Get user's prediction history (latest 50). Reads only active predictions unless
+    ?include_archive=true, which merges in archived ones (see prediction.archive).
+    """
     serializer_class = PredictionSerializer
     permission_classes = [IsAuthenticated]
 
@@ -451,9 +319,9 @@ class PredictionHistoryView(generics.ListAPIView):
         return Prediction.objects.filter(user=self.request.user)
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()[:50]
-        resolve_predictions_from_history(queryset)
-        serializer = self.get_serializer(queryset, many=True)
+        include_archive = request.query_params.get('include_archive', '').lower() in ('1', 'true', 'yes')
+        predictions = archive.recent(request.user, limit=50, include_archive=include_archive)
+        serializer = self.get_serializer(predictions, many=True)
         return Response({
             'status': 'success',
             'data': serializer.data
@@ -463,30 +331,30 @@ class PredictionHistoryView(generics.ListAPIView):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def prediction_stats_view(request):
-    """Get user's prediction statistics"""
+    """Get user's prediction statistics (from the precomputed stats row)"""
     user = request.user
-
-    # Resolve any predictions that have price history for predicted_for_date
-    predictions = Prediction.objects.filter(user=user)
-    resolve_predictions_from_history(predictions)
-
-    # User stats
-    total = predictions.count()
-    correct = predictions.filter(is_correct=True).count()
-    accuracy = round((correct / total) * 100, 2) if total > 0 else 0
+    stats = user_stats.get_stats(user)
+    accuracy = round((stats.correct / stats.total) * 100, 2) if stats.total > 0 else 0
     
     # Recent predictions
-    recent = predictions.order_by('-created_at')[:10]
+    recent = Prediction.objects.filter(user=user).select_related('stock').order_by('-created_at')[:10]
     
-    # AI accuracy (mock)
-    ai_accuracy = random.randint(72, 85)
+    # AI accuracy from the latest offline evaluation of the served signal (evaluate_ai_signal)
+    ai_model = evaluation.active_model()
     
     data = {
-        'total_predictions': total,
-        'correct_predictions': correct,
+        'total_predictions': stats.total,
+        'correct_predictions': stats.correct,
         'accuracy_percentage': accuracy,
+        'resolved_predictions': stats.resolved,
+        'resolved_accuracy': stats.accuracy,
+        'current_streak': stats.current_streak,
+        'best_streak': stats.best_streak,
+        'by_horizon': stats.by_horizon,
+        'by_stock': user_stats.stock_breakdown(stats),
         'recent_predictions': PredictionSerializer(recent, many=True).data,
-        'ai_accuracy': ai_accuracy
+        'ai_accuracy': ai_model.accuracy_percentage if ai_model else None,
+        'ai_evaluated_predictions': ai_model.total_predictions if ai_model else 0,
     }
     
     return Response({
@@ -497,6 +365,7 @@ def prediction_stats_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_on_indicators
 def stock_indicators_view(request, symbol):
     """
     Get latest technical / sentiment indicators for a stock.
@@ -510,26 +379,153 @@ def stock_indicators_view(request, symbol):
             'message': 'Stock not found'
         }, status=status.HTTP_404_NOT_FOUND)
 
-    indicators_qs = MarketIndicator.objects.filter(stock=stock).order_by('-calculated_at')
-    latest = {}
-    for ind in indicators_qs:
-        if ind.indicator_type not in latest:
-            latest[ind.indicator_type] = {
-                'indicator_type': ind.indicator_type,
-                'value': float(ind.value),
-                'period': ind.period,
-                'calculated_at': ind.calculated_at,
-            }
+    latest = [
+        {
+            'indicator_type': ind.indicator_type,
+            'value': float(ind.value),
+            'period': ind.period,
+            'calculated_at': ind.calculated_at,
+        }
+        for ind in LatestIndicator.objects.filter(stock=stock)
+    ]
 
     return Response({
         'status': 'success',
         'data': {
             'symbol': stock.symbol,
-            'indicators': list(latest.values()),
+            'indicators': latest,
+        }
+    })
+
+
+class QuoteRateThrottle(UserRateThrottle):
+    """Quote polling runs every second or two, far above the default user rate"""
+    scope = 'quotes'
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([QuoteRateThrottle])
+def quotes_view(request):
+    """
+    Latest quotes for many symbols from the shared quote table (one cache read).
+    Query param: symbols (comma-separated, up to 200). Never calls the quote provider.
+    """
+    symbols = list(dict.fromkeys(
+        s.strip().upper() for s in (request.query_params.get('symbols') or '').split(',') if s.strip()
+    ))
+    if not symbols or len(symbols) > quotes.MAX_SYMBOLS:
+        return Response({
+            'status': 'error',
+            'message': f'symbols must list between 1 and {quotes.MAX_SYMBOLS} symbols'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    found, updated_at = quotes.get_quotes(symbols)
+    return Response({
+        'status': 'success',
+        'data': {
+            'quotes': {symbol: quotes.quote_payload(q) for symbol, q in found.items()},
+            'missing': [s for s in symbols if s not in found],
+            'updated_at': updated_at
         }
     })
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([QuoteRateThrottle])
+def stock_live_view(request, symbol):
+    """Latest quote for one symbol; falls back to the stored price when the quote table has none"""
+    symbol = symbol.upper()
+    found, _ = quotes.get_quotes([symbol])
+    if symbol in found:
+        data = quotes.quote_payload(found[symbol])
+        data['source'] = 'live'
+    else:
+        try:
+            stock = Stock.objects.get(symbol=symbol)
+        except Stock.DoesNotExist:
+            return Response({'status': 'error', 'message': 'Stock not found'}, status=status.HTTP_404_NOT_FOUND)
+        data = {
+            'symbol': stock.symbol,
+            'price': float(stock.current_price),
+            'change': float(stock.current_price - stock.previous_close) if stock.previous_close else 0,
+            'change_percent': float(stock.price_change),
+            'previous_close': float(stock.previous_close) if stock.previous_close else None,
+            'timestamp': stock.last_updated.isoformat(),
+            'source': 'stored',
+        }
+    return Response({'status': 'success', 'data': data})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def stream_ticket_view(request):
+    """Single-use ticket that opens the price stream (EventSource cannot send the bearer token)"""
+    return Response({
+        'status': 'success',
+        'data': {'ticket': stream.issue_ticket(request.user.id), 'expires_in': stream.TICKET_SECONDS}
+    })
+
+
+def _stream_user(request):
+    """User from a Bearer token header, a ?ticket= from stream_ticket_view, else the session"""
+    jwt = JWTAuthentication()
+    header = jwt.get_header(request)
+    if header is not None:
+        try:
+            return jwt.get_user(jwt.get_validated_token(jwt.get_raw_token(header)))
+        except (InvalidToken, TokenError):
+            return None
+    ticket = request.GET.get('ticket')
+    if ticket:
+        user_id = stream.redeem_ticket(ticket)
+        return User.objects.filter(id=user_id, is_active=True).first() if user_id is not None else None
+    user = request.user
+    return user if user.is_authenticated else None
+
+
+async def price_stream_view(request):
+    """
+    Server-Sent Events stream of `quote` events for the user's holdings plus
+    ?symbols= (comma-separated, up to 200) and `portfolio` events when the
+    holdings value changes. Resumes from the Last-Event-ID header (or
+    ?last_event_id=). Plain async view: DRF views cannot stream asynchronously.
+    Under WSGI (runserver) Django buffers an async stream to completion, so the
+    view answers 503 and clients fall back to polling or simulation.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'status': 'error', 'message': 'Method not allowed'}, status=405)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Live streaming needs the ASGI server (finance_ai.asgi)'
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    user = await sync_to_async(_stream_user)(request)
+    if user is None:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Authentication credentials were not provided.'
+        }, status=status.HTTP_401_UNAUTHORIZED)
+    symbols = list(dict.fromkeys(
+        s.strip().upper() for s in (request.GET.get('symbols') or '').split(',') if s.strip()
+    ))
+    if len(symbols) > quotes.MAX_SYMBOLS:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'symbols must list at most {quotes.MAX_SYMBOLS} symbols'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID') or request.GET.get('last_event_id') or 0)
+    except ValueError:
+        last_event_id = 0
+    response = StreamingHttpResponse(
+        stream.event_stream(user.id, symbols, last_event_id), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: flush each event
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def stock_sentiment_view(request, symbol):
@@ -538,7 +534,7 @@ def stock_sentiment_view(request, symbol):
         stock = Stock.objects.get(symbol=symbol)
     except Stock.DoesNotExist:
         return Response({'status': 'error', 'message': 'Stock not found'}, status=status.HTTP_404_NOT_FOUND)
-    sentiment_ind = MarketIndicator.objects.filter(stock=stock, indicator_type='sentiment').order_by('-calculated_at').first()
+    sentiment_ind = LatestIndicator.objects.filter(stock=stock, indicator_type='sentiment').first()
     if sentiment_ind:
         v = float(sentiment_ind.value)
         if v > 0.2:
@@ -564,22 +560,63 @@ def stock_sentiment_view(request, symbol):
     })
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def stock_simulation_view(request, symbol):
+    """
+    Monte Carlo projection: 5/25/50/75/95th percentile price bands per day.
+    Query params: horizon (days, 1-90, default 30), paths (100-20000, default 10000),
+    method (gbm or bootstrap, default gbm).
+    """
+    try:
+        stock = Stock.objects.get(symbol=symbol)
+    except Stock.DoesNotExist:
+        return Response({'status': 'error', 'message': 'Stock not found'}, status=status.HTTP_404_NOT_FOUND)
+    method = (request.query_params.get('method') or 'gbm').lower()
+    try:
+        horizon = int(request.query_params.get('horizon', 30))
+        n_paths = int(request.query_params.get('paths', simulation.DEFAULT_PATHS))
+    except ValueError:
+        horizon = n_paths = 0
+    if method not in simulation.METHODS or not 1 <= horizon <= simulation.MAX_HORIZON \
+            or not 100 <= n_paths <= simulation.MAX_PATHS:
+        return Response({
+            'status': 'error',
+            'message': f'method must be gbm or bootstrap, horizon 1-{simulation.MAX_HORIZON}, '
+                       f'paths 100-{simulation.MAX_PATHS}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    result = simulation.price_bands(stock, horizon, n_paths, method)
+    if result is None:
+        return Response({
+            'status': 'error',
+            'message': 'Not enough price history to simulate'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'status': 'success', 'data': {'symbol': stock.symbol, **result}})
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def stock_risk_view(request, symbol):
-    """Risk meter: volatility, risk_score (low/medium/high), beta, 52w high/low."""
+    """
+    Risk meter: volatility, risk_score (low/medium/high), beta, VaR/CVaR, max drawdown, 52w high/low.
+    Query param: window (daily bars, default RISK_WINDOW); served from the nightly risk batch.
+    """
     try:
         stock = Stock.objects.get(symbol=symbol)
     except Stock.DoesNotExist:
         return Response({'status': 'error', 'message': 'Stock not found'}, status=status.HTTP_404_NOT_FOUND)
-    history = StockPriceHistory.objects.filter(stock=stock).order_by('-date')[:30]
-    prices = [float(ph.close_price) for ph in history]
-    volatility_pct = 0
-    if len(prices) >= 2:
-        returns = [(prices[i] - prices[i+1]) / prices[i+1] for i in range(len(prices)-1)]
-        mean_ret = sum(returns) / len(returns)
-        var = sum((r - mean_ret)**2 for r in returns) / len(returns)
-        volatility_pct = round((var ** 0.5) * 100, 2)
+    try:
+        window = int(request.query_params.get('window') or risk.default_window())
+    except ValueError:
+        window = 0
+    if not risk.MIN_OBSERVATIONS < window <= risk.MAX_WINDOW:
+        return Response({
+            'status': 'error',
+            'message': f'window must be between {risk.MIN_OBSERVATIONS + 1} and {risk.MAX_WINDOW}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    metrics = risk.stock_risk(stock, window)
+    # Daily volatility over the last month of bars drives the meter
+    volatility_pct = round(metrics['rolling_volatility'], 2) if metrics['rolling_volatility'] is not None else 0
     if volatility_pct < 1.5:
         risk_score = 'low'
     elif volatility_pct < 3.5:
@@ -591,14 +628,28 @@ def stock_risk_view(request, symbol):
     current = float(stock.current_price)
     dist_high = round((fifty_two_high - current) / fifty_two_high * 100, 1) if fifty_two_high else 0
     dist_low = round((current - fifty_two_low) / fifty_two_low * 100, 1) if fifty_two_low else 0
-    beta = 1.0 + (volatility_pct / 100)
+    rounded = {name: (round(v, 2) if v is not None else None) for name, v in metrics.items() if name in risk.METRICS}
     return Response({
         'status': 'success',
         'data': {
             'symbol': stock.symbol,
             'volatility_percent': volatility_pct,
+            'annualized_volatility_percent': rounded['volatility'],
             'risk_score': risk_score,
-            'beta': round(beta, 2),
+            'beta': rounded['beta'],
+            'benchmark': metrics['benchmark'],
+            'window': metrics['window'],
+            'observations': metrics['observations'],
+            'as_of': metrics['as_of'],
+            'var_percent': {
+                'historical': {'95': rounded['var_95'], '99': rounded['var_99']},
+                'parametric': {'95': rounded['parametric_var_95'], '99': rounded['parametric_var_99']},
+            },
+            'cvar_percent': {
+                'historical': {'95': rounded['cvar_95'], '99': rounded['cvar_99']},
+                'parametric': {'95': rounded['parametric_cvar_95'], '99': rounded['parametric_cvar_99']},
+            },
+            'max_drawdown_percent': rounded['max_drawdown'],
             'fifty_two_week_high': fifty_two_high,
             'fifty_two_week_low': fifty_two_low,
             'distance_from_52w_high_percent': dist_high,
@@ -609,191 +660,206 @@ def stock_risk_view(request, symbol):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def stock_compare_view(request):
-    """Compare two stocks: a=SYM1&b=SYM2. Returns aligned series + stats + multiple metrics."""
-    import statistics
-    a = (request.query_params.get('a') or '').strip().upper()
-    b = (request.query_params.get('b') or '').strip().upper()
-    if not a or not b:
-        return Response({'status': 'error', 'message': 'Query params a and b required'}, status=status.HTTP_400_BAD_REQUEST)
-    try:
-        stock_a = Stock.objects.get(symbol=a)
-        stock_b = Stock.objects.get(symbol=b)
-    except Stock.DoesNotExist:
-        return Response({'status': 'error', 'message': 'One or both stocks not found'}, status=status.HTTP_404_NOT_FOUND)
-    
-    days = 30
-    hist_a = list(StockPriceHistory.objects.filter(stock=stock_a).order_by('date')[:days])
-    hist_b = list(StockPriceHistory.objects.filter(stock=stock_b).order_by('date')[:days])
-    dates_a = {ph.date: float(ph.close_price) for ph in hist_a}
-    dates_b = {ph.date: float(ph.close_price) for ph in hist_b}
-    all_dates = sorted(set(dates_a) | set(dates_b))[-days:]
-    prices_a = [dates_a.get(d) for d in all_dates]
-    prices_b = [dates_b.get(d) for d in all_dates]
-    
-    # Calculate overall returns
-    ret_a = ((prices_a[-1] / prices_a[0]) - 1) * 100 if prices_a and prices_a[0] else 0
-    ret_b = ((prices_b[-1] / prices_b[0]) - 1) * 100 if prices_b and prices_b[0] else 0
-    
-    # Calculate daily returns (percentage change)
-    daily_returns_a = []
-    daily_returns_b = []
-    for i in range(1, len(prices_a)):
-        if prices_a[i-1] and prices_a[i]:
-            daily_returns_a.append(((prices_a[i] - prices_a[i-1]) / prices_a[i-1]) * 100)
-        else:
-            daily_returns_a.append(0)
-        if prices_b[i-1] and prices_b[i]:
-            daily_returns_b.append(((prices_b[i] - prices_b[i-1]) / prices_b[i-1]) * 100)
-        else:
-            daily_returns_b.append(0)
-    
-    # Calculate volatility (standard deviation of daily returns)
-    vol_a = round(statistics.stdev(daily_returns_a), 2) if len(daily_returns_a) > 1 else 0
-    vol_b = round(statistics.stdev(daily_returns_b), 2) if len(daily_returns_b) > 1 else 0
-    
-    # Calculate moving averages (7-day and 14-day)
-    def moving_avg(prices, window):
-        ma = []
-        for i in range(len(prices)):
-            if i < window - 1:
-                ma.append(None)
-            else:
-                avg = sum([p for p in prices[i-window+1:i+1] if p]) / window
-                ma.append(round(avg, 2))
-        return ma
-    
-    ma7_a = moving_avg(prices_a, 7)
-    ma7_b = moving_avg(prices_b, 7)
-    ma14_a = moving_avg(prices_a, 14)
-    ma14_b = moving_avg(prices_b, 14)
-    
-    # Normalized price (start at 100)
-    norm_a = [100 * (p / prices_a[0]) if prices_a[0] else None for p in prices_a]
-    norm_b = [100 * (p / prices_b[0]) if prices_b[0] else None for p in prices_b]
-    
-    # Price ratio (A/B)
-    ratio = [round(prices_a[i] / prices_b[i], 4) if prices_b[i] and prices_a[i] else None for i in range(len(prices_a))]
-    
+def pattern_scan_view(request):
+    """
+    Stocks whose latest daily bar shows a candlestick pattern.
+    Query params: pattern (required), date (YYYY-MM-DD, exact bar instead of each stock's latest),
+    symbols (comma-separated, default: every stock).
+    """
+    pattern = (request.query_params.get('pattern') or '').strip().lower()
+    if pattern not in patterns.PATTERNS:
+        return Response({
+            'status': 'error',
+            'message': f"pattern must be one of: {', '.join(patterns.PATTERNS)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    day = request.query_params.get('date') or None
+    if day:
+        try:
+            day = datetime.strptime(day, '%Y-%m-%d').date().isoformat()
+        except ValueError:
+            return Response({
+                'status': 'error',
+                'message': 'date must be YYYY-MM-DD'
+            }, status=status.HTTP_400_BAD_REQUEST)
+    stocks = Stock.objects.order_by('symbol')
+    symbols = [s.strip().upper() for s in (request.query_params.get('symbols') or '').split(',') if s.strip()]
+    if symbols:
+        stocks = stocks.filter(symbol__in=symbols)
+    by_id = {s.id: s for s in stocks.only('id', 'symbol', 'name', 'current_price', 'previous_close')}
+    matches = patterns.scan(pattern, list(by_id), day)
     return Response({
         'status': 'success',
         'data': {
-            'labels': [d.strftime('%b %d') for d in all_dates],
-            'stock_a': {
-                'symbol': a,
-                'name': stock_a.name,
-                'prices': prices_a,
-                'normalized': norm_a,
-                'ma7': ma7_a,
-                'ma14': ma14_a,
-                'return_percent': round(ret_a, 2),
-                'volatility': vol_a
-            },
-            'stock_b': {
-                'symbol': b,
-                'name': stock_b.name,
-                'prices': prices_b,
-                'normalized': norm_b,
-                'ma7': ma7_b,
-                'ma14': ma14_b,
-                'return_percent': round(ret_b, 2),
-                'volatility': vol_b
-            },
-            'daily_returns_a': [round(r, 2) for r in daily_returns_a],
-            'daily_returns_b': [round(r, 2) for r in daily_returns_b],
-            'price_ratio': ratio
+            'pattern': pattern,
+            'date': day,
+            'matches': [
+                {
+                    'symbol': by_id[sid].symbol,
+                    'name': by_id[sid].name,
+                    'date': bar_date,
+                    'current_price': float(by_id[sid].current_price),
+                    'change': by_id[sid].price_change,
+                }
+                for sid, bar_date in matches
+            ],
         }
     })
 
 
-@api_view(['POST'])
+@api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def backtest_view(request):
-    """Backtest: strategy (ma_crossover), start_date, end_date, initial_capital. Returns equity curve + metrics."""
-    strategy = request.data.get('strategy', 'ma_crossover')
-    initial_capital = float(request.data.get('initial_capital', 100000))
-    symbol = (request.data.get('symbol') or 'AAPL').upper()
-    try:
-        stock = Stock.objects.get(symbol=symbol)
-    except Stock.DoesNotExist:
-        return Response({'status': 'error', 'message': 'Stock not found'}, status=status.HTTP_404_NOT_FOUND)
-    history = list(StockPriceHistory.objects.filter(stock=stock).order_by('date')[:365])
-    if len(history) < 50:
-        return Response({'status': 'success', 'data': {'equity_curve': [], 'total_return': 0, 'max_drawdown': 0, 'sharpe_ratio': 0}})
-    prices = [float(ph.close_price) for ph in history]
-    def sma(arr, n):
-        out = []
-        for i in range(len(arr)):
-            if i < n - 1:
-                out.append(None)
-            else:
-                out.append(sum(arr[i-n+1:i+1]) / n)
-        return out
-    fast = sma(prices, 10)
-    slow = sma(prices, 20)
-    equity = [initial_capital]
-    for i in range(20, len(prices)):
-        if fast[i] and slow[i] and fast[i] > slow[i] and (i == 20 or fast[i-1] <= slow[i-1]):
-            shares = equity[-1] / prices[i]
-            equity.append(shares * prices[i] if i + 1 < len(prices) else equity[-1])
-        elif fast[i] and slow[i] and fast[i] < slow[i]:
-            equity.append(equity[-1])
-        else:
-            equity.append(equity[-1] * (prices[i] / prices[i-1]) if prices[i-1] else equity[-1])
-    total_return = (equity[-1] / initial_capital - 1) * 100 if equity else 0
-    peak = initial_capital
-    max_dd = 0
-    for e in equity:
-        if e > peak:
-            peak = e
-        dd = (peak - e) / peak * 100 if peak else 0
-        if dd > max_dd:
-            max_dd = dd
-    returns_bt = []
-    for i in range(1, len(equity)):
-        if equity[i-1]:
-            returns_bt.append((equity[i] - equity[i-1]) / equity[i-1])
-    sharpe = (sum(returns_bt) / len(returns_bt) * (252 ** 0.5) / ((sum((r - sum(returns_bt)/len(returns_bt))**2 for r in returns_bt) / len(returns_bt)) ** 0.5)) if returns_bt else 0
+def stock_compare_view(request):
+    """
+    Compare stocks over a range (1D ... MAX, default 1M).
+    symbols=SYM1,SYM2,... (up to 100): aligned series, stats and the full return correlation /
+    covariance matrices. a=SYM1&b=SYM2: the original two-stock payload.
+    """
+    range_param = (request.query_params.get('range') or '1M').upper()
+    if request.query_params.get('symbols'):
+        symbols = list(dict.fromkeys(
+            s.strip().upper() for s in request.query_params['symbols'].split(',') if s.strip()
+        ))
+        if len(symbols) > compare.MAX_SYMBOLS:
+            return Response({
+                'status': 'error',
+                'message': f'At most {compare.MAX_SYMBOLS} symbols'
+            }, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        symbols = [(request.query_params.get(k) or '').strip().upper() for k in ('a', 'b')]
+        if not all(symbols):
+            return Response({'status': 'error', 'message': 'Query params symbols, or a and b, required'}, status=status.HTTP_400_BAD_REQUEST)
+    found = {s.symbol: s for s in Stock.objects.filter(symbol__in=symbols).only('id', 'symbol', 'name')}
+    missing = [sym for sym in symbols if sym not in found]
+    if missing:
+        return Response({'status': 'error', 'message': f"Stock(s) not found: {', '.join(missing)}"}, status=status.HTTP_404_NOT_FOUND)
+    result = compare.cached_compare([(found[sym].id, sym, found[sym].name) for sym in symbols], range_param)
+    if request.query_params.get('symbols'):
+        return Response({'status': 'success', 'data': result})
+
+    # Two-stock payload used by the compare panel
+    sa, sb = result['stocks']
+    ratio = [
+        round(pa / pb, 4) if pa and pb else None
+        for pa, pb in zip(sa['prices'], sb['prices'])
+    ]
+    legacy = {}
+    for key, st in (('stock_a', sa), ('stock_b', sb)):
+        legacy[key] = {k: st[k] for k in ('symbol', 'name', 'prices', 'normalized', 'ma7', 'ma14', 'return_percent', 'volatility')}
     return Response({
         'status': 'success',
         'data': {
-            'equity_curve': [round(e, 2) for e in equity],
-            'labels': [history[i].date.strftime('%b %d') for i in range(20, len(history))],
-            'total_return': round(total_return, 2),
-            'max_drawdown': round(max_dd, 2),
-            'sharpe_ratio': round(sharpe, 2)
+            'labels': [datetime.strptime(d, '%Y-%m-%d').strftime('%b %d') for d in result['labels']],
+            **legacy,
+            'daily_returns_a': [r or 0 for r in sa['daily_returns'][1:]],
+            'daily_returns_b': [r or 0 for r in sb['daily_returns'][1:]],
+            'price_ratio': ratio,
+            'correlation': result['correlation'][0][1],
         }
     })
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def backtest_view(request):
+    """
+    Backtest: strategy (ma_crossover, rsi_reversion, momentum, buy_and_hold), params,
+    symbol or symbols, start_date, end_date, initial_capital, cost_bps.
+    Returns equity curve + metrics (one entry per symbol under `results` for symbols).
+    With mode=async the job is queued and a job id returned; poll backtest/jobs/<id>/.
+    Identical requests over unchanged price history are served from stored results.
+    """
+    serializer = BacktestSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    opts = serializer.validated_data
+    try:
+        params = normalize_params(opts['strategy'], opts['params'])
+    except ValueError as e:
+        return Response({'status': 'error', 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    symbols = list(dict.fromkeys(s.upper() for s in opts.get('symbols') or [opts['symbol']]))
+    stock_ids = dict(Stock.objects.filter(symbol__in=symbols).values_list('symbol', 'id'))
+    if len(stock_ids) != len(symbols):
+        return Response({'status': 'error', 'message': 'Stock not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    job_request = backtest_jobs.job_request(opts, params, symbols)
+    key = backtest_jobs.cache_key(job_request, [stock_ids[sym] for sym in symbols])
+
+    if opts['mode'] == 'async':
+        job = backtest_jobs.get_or_queue(job_request, key, request.user)
+        backtest_jobs.submit(job)
+        if job.status == 'done':
+            return Response({'status': 'success', 'data': {'job_id': job.id, 'job_status': job.status, 'result': job.result}})
+        return Response(
+            {'status': 'success', 'data': {'job_id': job.id, 'job_status': job.status}},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    data = backtest_jobs.run_sync(job_request, key, request.user)
+    return Response({'status': 'success', 'data': data})
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def leaderboard_view(request):
-    """Leaderboard: users by prediction accuracy (min 5 resolved predictions)."""
-    from django.contrib.auth.models import User
-    from django.db.models import Count, Q
-    resolved = Prediction.objects.filter(is_correct__isnull=False).values('user_id').annotate(
-        total=Count('id'),
-        correct=Count('id', filter=Q(is_correct=True))
-    ).filter(total__gte=5)
-    user_ids = [x['user_id'] for x in resolved]
-    users = User.objects.filter(id__in=user_ids)
-    by_id = {u.id: {'username': u.username, 'total': 0, 'correct': 0} for u in users}
-    for x in resolved:
-        if x['user_id'] in by_id:
-            by_id[x['user_id']]['total'] = x['total']
-            by_id[x['user_id']]['correct'] = x['correct']
-    leaderboard = []
-    for u in users:
-        d = by_id.get(u.id, {})
-        total = d.get('total', 0)
-        correct = d.get('correct', 0)
-        acc = round((correct / total) * 100, 1) if total else 0
-        leaderboard.append({'username': u.username, 'total': total, 'correct': correct, 'accuracy': acc})
-    leaderboard.sort(key=lambda x: x['accuracy'], reverse=True)
-    return Response({'status': 'success', 'data': leaderboard[:20]})
+def backtest_job_view(request, job_id):
+    """
+    Status of a queued backtest; includes the result once done. Jobs are not
+    per-user: identical requests share one job and result (see backtest_jobs),
+    so any authenticated user may read a job by id.
+    """
+    try:
+        job = BacktestResult.objects.get(id=job_id)
+    except BacktestResult.DoesNotExist:
+        return Response({'status': 'error', 'message': 'Backtest job not found'}, status=status.HTTP_404_NOT_FOUND)
+    data = {
+        'job_id': job.id,
+        'job_status': job.status,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at,
+    }
+    if job.status == 'done':
+        data['result'] = job.result
+    elif job.status == 'failed':
+        data['error'] = job.error
+    return Response({'status': 'success', 'data': data})
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def leaderboard_view(request):
+    """
+    Leaderboard: users by prediction accuracy.
+    Query params: window (daily/weekly/monthly/all, default all), period (YYYY-MM-DD, any day
+    in the period; default today), limit (default 20, max 100), min_total (default 5).
+    """
+    window = (request.query_params.get('window') or 'all').lower()
+    if window not in leaderboard.WINDOWS:
+        return Response({
+            'status': 'error',
+            'message': f"window must be one of: {', '.join(leaderboard.WINDOWS)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        day = datetime.strptime(request.query_params['period'], '%Y-%m-%d').date() \
+            if request.query_params.get('period') else None
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        min_total = max(int(request.query_params.get('min_total', 5)), 1)
+    except ValueError:
+        return Response({
+            'status': 'error',
+            'message': 'Invalid period, limit or min_total'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    entries = leaderboard.top(window, day, limit=limit, min_total=min_total)
+    data = [
+        {
+            'rank': rank,
+            'username': e.user.username,
+            'total': e.total,
+            'correct': e.correct,
+            'accuracy': e.accuracy,
+        }
+        for rank, e in enumerate(entries, start=1)
+    ]
+    return Response({'status': 'success', 'data': data})
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def resolve_prediction_view(request, prediction_id):
@@ -804,6 +870,15 @@ def resolve_prediction_view(request, prediction_id):
             user=request.user
         )
     except Prediction.DoesNotExist:
+        archived = ArchivedPrediction.objects.filter(id=prediction_id, user=request.user).first()
+        if archived is not None:
+            return Response({
+                'status': 'success',
+                'data': {
+                    'prediction': PredictionSerializer(archived).data,
+                    'message': 'Prediction already resolved and archived'
+                }
+            })
         return Response({
             'status': 'error',
             'message': 'Prediction not found'
@@ -811,21 +886,27 @@ def resolve_prediction_view(request, prediction_id):
     
     # Get actual price (mock - would fetch from API)
     actual_price = prediction.stock.current_price
-    prediction.resolve(actual_price)
+    resolved = prediction.resolve(actual_price)
     
     return Response({
         'status': 'success',
         'data': {
             'prediction': PredictionSerializer(prediction).data,
-            'message': 'Prediction resolved successfully'
+            'message': 'Prediction resolved successfully' if resolved else 'Prediction already resolved'
         }
     })
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes(COLUMNAR_RENDERERS)
+@conditional_on_bars
 def stock_chart_data_view(request, symbol):
-    """Get stock chart data with optional range (1D, 1W, 1M, 1Y). Returns line + OHLC."""
+    """
+    Get stock chart data with optional range (1D, 1W, 1M, 3M, 1Y, 2Y, 5Y, 10Y, MAX) and
+    resolution (1m, 5m for 1D / 1W, daily, weekly, monthly). Returns line + OHLC, or with ?format=columnar / packed
+    the bars once as `columns` (see prediction.renderers).
+    """
     try:
         stock = Stock.objects.get(symbol=symbol)
     except Stock.DoesNotExist:
@@ -833,26 +914,21 @@ def stock_chart_data_view(request, symbol):
             'status': 'error',
             'message': 'Stock not found'
         }, status=status.HTTP_404_NOT_FOUND)
-    range_param = (request.query_params.get('range') or '1M').upper()
-    days = {'1D': 1, '1W': 7, '1M': 30, '3M': 90, '1Y': 365}.get(range_param, 30)
-    price_history = StockPriceHistory.objects.filter(stock=stock).order_by('date')[:days]
-    price_history = list(price_history)
-    labels = [ph.date.strftime('%b %d') for ph in price_history]
-    prices = [float(ph.close_price) for ph in price_history]
-    ohlc = [
-        {'date': ph.date.strftime('%Y-%m-%d'), 'o': float(ph.open_price), 'h': float(ph.high_price),
-         'l': float(ph.low_price), 'c': float(ph.close_price), 'v': ph.volume}
-        for ph in price_history
-    ]
-    return Response({
-        'status': 'success',
-        'data': {
-            'symbol': symbol,
-            'name': stock.name,
-            'labels': labels,
-            'prices': prices,
-            'ohlc': ohlc,
-            'current_price': float(stock.current_price),
-            'change': stock.price_change
-        }
-    })
+    bars, resolution = _chart_bars(request, stock.id)
+    data = {
+        'symbol': symbol,
+        'name': stock.name,
+        'resolution': resolution,
+        'current_price': float(stock.current_price),
+        'change': stock.price_change
+    }
+    if wants_columns(request):
+        data['columns'] = bars.columns()
+    else:
+        if resolution in intraday.RESOLUTIONS:
+            data['labels'] = intraday.labels(bars, (request.query_params.get('range') or '1M').upper())
+        else:
+            data['labels'] = bars.date_strings({'daily': '%b %d', 'weekly': "%b %d '%y", 'monthly': '%b %Y'}[resolution])
+        data['prices'] = bars.close.tolist()
+        data['ohlc'] = bars.ohlc()
+    return Response({'status': 'success', 'data': data})
@@ -385,6 +385,64 @@ async function apiRequest(endpoint, options = {}) {
     }
 }
 
+// Seconds to wait for the stream to open before falling back (a WSGI server or buffering
+// proxy holds the response back instead of failing it)
+const PRICE_STREAM_OPEN_TIMEOUT = 10;
+const PRICE_STREAM_RETRY_MS = 3000;
+
+// Open the live price stream (Server-Sent Events). EventSource cannot send headers, so each
+// connection is opened with a single-use ticket from an authenticated POST. After a drop it
+// reconnects with a fresh ticket, resuming from the last event. handlers: { quote, portfolio,
+// error }; returns a handle with close(), or null if unsupported.
+function openPriceStream(symbols, handlers = {}) {
+    if (typeof EventSource === 'undefined') return null;
+    const stream = { source: null, closed: false, lastEventId: null };
+    stream.close = function() {
+        stream.closed = true;
+        if (stream.source) stream.source.close();
+    };
+    function fail() {
+        if (stream.closed) return;
+        stream.close();
+        if (handlers.error) handlers.error();
+    }
+    function connect() {
+        apiRequest('/prediction/stream/ticket/', { method: 'POST' }).then(function(result) {
+            if (stream.closed) return;
+            if (!result || result.status !== 'success') return fail();
+            const params = new URLSearchParams();
+            params.set('ticket', result.data.ticket);
+            if (symbols && symbols.length) params.set('symbols', symbols.join(','));
+            if (stream.lastEventId) params.set('last_event_id', stream.lastEventId);
+            const source = stream.source = new EventSource(`${API_BASE_URL}/prediction/stream/?${params.toString()}`);
+            let opened = false;
+            ['quote', 'portfolio'].forEach(function(name) {
+                source.addEventListener(name, function(event) {
+                    if (event.lastEventId) stream.lastEventId = event.lastEventId;
+                    if (handlers[name]) handlers[name](JSON.parse(event.data));
+                });
+            });
+            const openTimer = setTimeout(function() {
+                if (!opened) fail();
+            }, PRICE_STREAM_OPEN_TIMEOUT * 1000);
+            source.onopen = function() {
+                opened = true;
+                clearTimeout(openTimer);
+            };
+            source.onerror = function() {
+                // The ticket is spent, so the browser's own retry would be refused: reconnect with a
+                // new one if this connection worked, otherwise give up (e.g. 401, or 503 under WSGI)
+                clearTimeout(openTimer);
+                source.close();
+                if (opened && !stream.closed) setTimeout(connect, PRICE_STREAM_RETRY_MS);
+                else fail();
+            };
+        }).catch(fail);
+    }
+    connect();
+    return stream;
+}
+
 // Initialize auth on page load
 document.addEventListener('DOMContentLoaded', function() {
     // Update user name if authenticated
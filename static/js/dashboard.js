@@ -24,8 +24,7 @@ document.addEventListener('DOMContentLoaded', function() {
     var valueEl = document.getElementById('portfolio-value');
     var changeEl = document.getElementById('portfolio-change');
     if (valueEl && changeEl) {
-        updatePortfolioValueAndChange();
-        setInterval(updatePortfolioValueAndChange, PORTFOLIO_UPDATE_INTERVAL_MS);
+        startPortfolioStream();
     }
 
     try {
@@ -377,24 +376,35 @@ function initSentimentChart() {
     });
 }
 
-// Portfolio value – update every second; value and percentage turn green when up, red when down
-function updatePortfolioValueAndChange() {
+// Portfolio value pushed by the price stream; falls back to the simulated ticker when the stream is unavailable
+let portfolioSimulationTimer = null;
+
+function startPortfolioSimulation() {
+    if (portfolioSimulationTimer) return;
+    updatePortfolioValueAndChange();
+    portfolioSimulationTimer = setInterval(updatePortfolioValueAndChange, PORTFOLIO_UPDATE_INTERVAL_MS);
+}
+
+function startPortfolioStream() {
+    var source = openPriceStream([], {
+        portfolio: function(data) {
+            renderPortfolioValue(data.total_value, data.day_gain_loss, data.day_gain_loss_percentage);
+        },
+        error: startPortfolioSimulation
+    });
+    if (!source) startPortfolioSimulation();
+}
+
+// Value and percentage turn green when up, red when down
+function renderPortfolioValue(value, changeDollar, pctChange) {
     var valueEl = document.getElementById('portfolio-value');
     var changeEl = document.getElementById('portfolio-change');
     var arrowEl = document.getElementById('portfolio-change-arrow');
     var textEl = document.getElementById('portfolio-change-text');
     if (!valueEl || !changeEl) return;
 
-    var prev = currentPortfolioValue;
-    var pctMove = (Math.random() - 0.5) * 0.6;
-    currentPortfolioValue = prev * (1 + pctMove / 100);
-    currentPortfolioValue = Math.max(80000, Math.min(180000, currentPortfolioValue));
-
-    var changeDollar = currentPortfolioValue - prev;
-    var pctChange = prev !== 0 ? (changeDollar / prev) * 100 : 0;
     var isUp = pctChange >= 0;
-
-    valueEl.textContent = '$' + currentPortfolioValue.toLocaleString('en-US', { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+    valueEl.textContent = '$' + value.toLocaleString('en-US', { minimumFractionDigits: 2, maximumFractionDigits: 2 });
     valueEl.classList.remove('positive', 'negative', 'portfolio-value-positive', 'portfolio-value-negative');
     valueEl.classList.add(isUp ? 'positive' : 'negative');
     valueEl.style.color = isUp ? '#22c55e' : '#ef4444';
@@ -406,7 +416,19 @@ function updatePortfolioValueAndChange() {
     changeEl.style.color = isUp ? '#22c55e' : '#ef4444';
 }
 
-// Load dashboard data – legacy; portfolio now updated by updatePortfolioValueAndChange
+// Simulated portfolio value – random walk, one step per second
+function updatePortfolioValueAndChange() {
+    var prev = currentPortfolioValue;
+    var pctMove = (Math.random() - 0.5) * 0.6;
+    currentPortfolioValue = prev * (1 + pctMove / 100);
+    currentPortfolioValue = Math.max(80000, Math.min(180000, currentPortfolioValue));
+
+    var changeDollar = currentPortfolioValue - prev;
+    var pctChange = prev !== 0 ? (changeDollar / prev) * 100 : 0;
+    renderPortfolioValue(currentPortfolioValue, changeDollar, pctChange);
+}
+
+// Load dashboard data – legacy; portfolio now updated by the price stream
 async function loadDashboardData() {
     updatePortfolioValueAndChange();
 }
@@ -26,8 +26,8 @@ document.addEventListener('DOMContentLoaded', function() {
     updatePortfolioTable();
     updatePortfolioSummary();
     
-    // Continuously update summary every 2 seconds to simulate live changes
-    setInterval(updatePortfolioSummary, 2000);
+    // Live prices from the price stream; simulated moves every 2 seconds if it is unavailable
+    startPriceStream();
     
     // Setup add stock form
     const addStockForm = document.getElementById('add-stock-form');
@@ -413,6 +413,46 @@ function updatePortfolioTable() {
     }).join('');
 }
 
+let priceStream = null;
+let priceSimulationTimer = null;
+
+// (Re)open the price stream for the current holdings; called again when holdings change
+function startPriceStream() {
+    if (priceSimulationTimer) return;
+    if (priceStream) priceStream.close();
+    priceStream = openPriceStream(portfolio.map(s => s.symbol), {
+        quote: applyLiveQuote,
+        error: startPriceSimulation
+    });
+    if (!priceStream) startPriceSimulation();
+}
+
+function applyLiveQuote(quote) {
+    const stock = portfolio.find(s => s.symbol === quote.symbol);
+    if (!stock) return;
+    stock.currentPrice = quote.price;
+    stock.dayChange = quote.change;
+    updatePortfolioTable();
+    updatePortfolioSummary();
+}
+
+function startPriceSimulation() {
+    if (priceSimulationTimer) return;
+    if (priceStream) priceStream.close();
+    priceStream = null;
+    priceSimulationTimer = setInterval(simulatePriceMoves, 2000);
+}
+
+// Apply simulated intraday price moves
+function simulatePriceMoves() {
+    portfolio.forEach(stock => {
+        const dailyChange = (Math.random() - 0.5) * (stock.currentPrice * 0.02); // simulate daily move
+        stock.dayChange = dailyChange;
+        stock.currentPrice = Math.max(0.01, stock.currentPrice + dailyChange);
+    });
+    updatePortfolioSummary();
+}
+
 // Update the summary cards at the top of the portfolio page
 function updatePortfolioSummary() {
     // Calculate totals from current portfolio data
@@ -421,16 +461,9 @@ function updatePortfolioSummary() {
     let dayGain = 0;
 
     portfolio.forEach(stock => {
-        const marketValue = stock.shares * stock.currentPrice;
-        const costBasis = stock.shares * stock.avgPrice;
-        const dailyChange = (Math.random() - 0.5) * (stock.currentPrice * 0.02); // simulate daily move
-
-        totalValue += marketValue;
-        totalCost += costBasis;
-        dayGain += dailyChange * stock.shares;
-
-        // Apply simulated intraday price move
-        stock.currentPrice = Math.max(0.01, stock.currentPrice + dailyChange);
+        totalValue += stock.shares * stock.currentPrice;
+        totalCost += stock.shares * stock.avgPrice;
+        dayGain += (stock.dayChange || 0) * stock.shares;
     });
 
     const totalGain = totalValue - totalCost;
@@ -558,6 +591,7 @@ async function handleAddStock(e) {
     
     // Update UI
     updatePortfolioTable();
+    startPriceStream();
     
     // Reinitialize charts
     const allocationChart = Chart.getChart(document.getElementById('allocationChart'));
@@ -588,12 +622,8 @@ async function fetchAndSetLivePurchasePrice(symbol) {
     if (!priceInput) return;
 
     try {
-        const response = await fetch(`/api/prediction/stocks/${symbol}/live/`);
-        if (!response.ok) {
-            return;
-        }
-        const payload = await response.json();
-        const data = payload && payload.data;
+        const payload = await apiRequest(`/prediction/stocks/${symbol}/live/`, { method: 'GET' });
+        const data = payload && payload.status === 'success' && payload.data;
         if (!data || typeof data.price !== 'number') {
             return;
         }
@@ -73,7 +73,7 @@ var HARDCODED_STOCK_STATS = {
 
 // Hardcoded OHLC data for line and candlestick when API has no data (realistic pattern)
 function getHardcodedChartData() {
-    var days = chartRange === '1D' ? 1 : chartRange === '1W' ? 7 : chartRange === '3M' ? 90 : chartRange === '1Y' ? 365 : 30;
+    var days = chartRange === '1D' ? 1 : chartRange === '1W' ? 7 : chartRange === '3M' ? 90 : chartRange === '1Y' ? 365 : (chartRange === '5Y' || chartRange === 'MAX') ? 365 : 30;
     var n = Math.max(2, Math.min(days + 1, 31));
     var base = 175;
     var ohlc = [
@@ -566,7 +566,7 @@ async function loadStocksAndInit() {
     }
 
     try {
-        const response = await apiRequest('/prediction/stocks/', {
+        const response = await apiRequest('/prediction/stocks/?page_size=500', {
             method: 'GET'
         });
         if (response && response.status === 'success' && Array.isArray(response.data) && response.data.length) {
@@ -679,7 +679,7 @@ async function loadStockDetailAndChart() {
         if (labels.length === 0 && data.current_price != null) {
             var cp = Number(data.current_price);
             var prev = Number(data.previous_close || data.current_price);
-            var days = rangeParam === '1D' ? 1 : rangeParam === '1W' ? 7 : rangeParam === '3M' ? 90 : rangeParam === '1Y' ? 365 : 30;
+            var days = rangeParam === '1D' ? 1 : rangeParam === '1W' ? 7 : rangeParam === '3M' ? 90 : rangeParam === '1Y' ? 365 : (rangeParam === '5Y' || rangeParam === 'MAX') ? 365 : 30;
             var synthetic = [];
             var base = prev;
             for (var i = days; i >= 0; i--) {
@@ -1158,7 +1158,7 @@ async function loadPredictionStats() {
         if (totalEl) totalEl.textContent = total;
         if (correctEl) correctEl.textContent = correct;
         if (accEl) accEl.textContent = accuracy + '%';
-        if (aiAccEl) aiAccEl.textContent = (data && data.ai_accuracy != null ? data.ai_accuracy : 76) + '%';
+        if (aiAccEl) aiAccEl.textContent = (data && data.ai_accuracy != null ? data.ai_accuracy : '--') + '%';
 
         if (tbody) {
             const rows = recent.map(function(p, index) {
@@ -1853,7 +1853,7 @@ async function loadLeaderboard() {
 
 async function populateCompareAndBacktestSelects() {
     try {
-        const r = await apiRequest('/prediction/stocks/', { method: 'GET' });
+        const r = await apiRequest('/prediction/stocks/?page_size=500', { method: 'GET' });
         console.log('populateCompareAndBacktestSelects API response', r);
         let data = [];
         if (r && r.status === 'success' && Array.isArray(r.data)) {